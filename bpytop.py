@@ -17,19 +17,21 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-import os, sys, threading, signal, re, subprocess, logging, logging.handlers
-import urllib.request
+import os, sys, threading, signal, re, logging, logging.handlers, json, struct, mmap
 from time import time, sleep, strftime, localtime
 from datetime import timedelta
 from _thread import interrupt_main
-from collections import defaultdict
+from collections import defaultdict, deque
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
 from select import select
-from distutils.util import strtobool
 from string import Template
 from math import ceil, floor
-from random import randint
+from random import randint, Random
 from shutil import which
-from typing import List, Set, Dict, Tuple, Optional, Union, Any, Callable, ContextManager, Iterable, Type, NamedTuple
+from types import MappingProxyType
+from typing import List, Set, Dict, Tuple, Optional, Union, Any, Callable, ContextManager, Iterable, Type, NamedTuple, Deque, Mapping
 
 errors: List[str] = []
 try: import fcntl, termios, tty
@@ -40,6 +42,16 @@ except Exception as e: errors.append(f'{e}')
 
 SELF_START = time()
 
+#* Taken before --benchmark or --proc-root can redirect psutil away from the live process,
+#* psutil keeps the proc path a Process was created with
+SELF_PROCESS: Any = None
+SELF_CREATED: float = SELF_START
+if not errors:
+	try:
+		SELF_PROCESS = psutil.Process()
+		if "--startup-profile" in sys.argv: SELF_CREATED = SELF_PROCESS.create_time()
+	except Exception: pass
+
 SYSTEM: str
 if "linux" in sys.platform: SYSTEM = "Linux"
 elif "bsd" in sys.platform: SYSTEM = "BSD"
@@ -61,7 +73,7 @@ VERSION: str = "1.0.16"
 #? Argument parser ------------------------------------------------------------------------------->
 if len(sys.argv) > 1:
 	for arg in sys.argv[1:]:
-		if not arg in ["-m", "--mini", "-v", "--version", "-h", "--help", "--debug"]:
+		if not arg in ["-m", "--mini", "-v", "--version", "-h", "--help", "--debug", "--stats-json", "--startup-profile", "--benchmark"] and not arg.startswith(("--benchmark=", "--proc-root=", "--record=", "--replay=", "--daemon=", "--share=", "--hosts=")):
 			print(f'Unrecognized argument: {arg}\n'
 				f'Use argument -h or --help for help')
 			raise SystemExit(1)
@@ -73,6 +85,23 @@ if "-h" in sys.argv or "--help" in sys.argv:
 		f'    -v, --version         Show version info and exit\n'
 		f'    -h, --help            Show this help message and exit\n'
 		f'    --debug               Start with loglevel set to DEBUG overriding value set in config\n'
+		f'    --stats-json          Write performance stats to stats.json in config folder at exit\n'
+		f'    --startup-profile     Print time spent in each startup phase up to the first frame at exit\n'
+		f'    --proc-root=DIR       Read proc and sys from DIR/proc and DIR/sys instead of the live system, Linux only\n'
+		f'                          Can also be set with environment variable BPYTOP_PROC_ROOT\n'
+		f'    --benchmark[=opts]    Run collectors and boxes headless on a synthetic system with default config, print timings and exit\n'
+		f'                          opts: threads, procs, depth, tree, disks, nics, frames, width, height, seed\n'
+		f'                          i.e. --benchmark=threads:256,procs:10000,tree:1\n'
+		f'    --record=FILE         Append collected samples to FILE in a compact binary format\n'
+		f'    --replay=FILE         Replay samples recorded with --record, ([) (]) seeks and (<) (>) sets speed\n'
+		f'    --daemon=ADDR         Run without ui and serve metrics over http on a unix socket path or [host:]port\n'
+		f'                          GET /metrics for Prometheus, /json for latest sample and /stream for json lines\n'
+		f'                          host defaults to 127.0.0.1, there is no authentication and all processes with their\n'
+		f'                          command lines are sent to anyone who connects, only bind other hosts on trusted networks\n'
+		f'    --share=SOCKET        Share one collection between instances, the first instance serves samples on SOCKET\n'
+		f'                          and later instances attach to it with their own sorting, filtering and selections,\n'
+		f'                          [host:]port attaches to a --daemon on another host\n'
+		f'    --hosts=ADDR,...      Show a summary grid of hosts running --daemon=[host:]port, (enter) shows full view\n'
 	)
 	raise SystemExit(0)
 elif "-v" in sys.argv or "--version" in sys.argv:
@@ -80,6 +109,325 @@ elif "-v" in sys.argv or "--version" in sys.argv:
 		f'psutil version: {".".join(str(x) for x in psutil.version_info)}')
 	raise SystemExit(0)
 
+#? Alternate /proc and /sys root ----------------------------------------------------------------->
+
+class ProcRoot:
+	'''Readers for a captured /proc and /sys tree set with --proc-root or BPYTOP_PROC_ROOT, Linux only
+	* .setup(path) : Point psutil at path/proc and replace the psutil functions that reads /sys or the live system
+	* .loadavg() : Returns load average from path/proc/loadavg
+	'''
+	path: str = ""			#* Normalized without trailing slash, empty for --proc-root=/
+	active: bool = False	#* Set by setup(), use this and not the truthiness of path or PROC_ROOT
+
+	class CpuFreq(NamedTuple):
+		current: float
+		min: float
+		max: float
+
+	class Temp(NamedTuple):
+		label: str
+		current: float
+		high: Optional[float]
+		critical: Optional[float]
+
+	class Partition(NamedTuple):
+		device: str
+		mountpoint: str
+		fstype: str
+		opts: str
+
+	class DiskUsage(NamedTuple):
+		total: int
+		used: int
+		free: int
+		percent: float
+
+	class NicStats(NamedTuple):
+		isup: bool
+
+	@classmethod
+	def setup(cls, path: str):
+		cls.path = os.path.abspath(path).rstrip("/")
+		cls.active = True
+		psutil.PROCFS_PATH = f'{cls.path}/proc'
+		psutil.cpu_count = cls.cpu_count
+		psutil.cpu_freq = cls.cpu_freq
+		psutil.sensors_temperatures = cls.sensors_temperatures
+		psutil.disk_partitions = cls.disk_partitions
+		psutil.disk_usage = cls.disk_usage
+		psutil.net_if_stats = cls.net_if_stats
+		psutil.pid_exists = cls.pid_exists
+
+	@classmethod
+	def read(cls, path: str) -> str:
+		'''Returns stripped content of path under root or an empty string if not readable'''
+		try:
+			with open(f'{cls.path}{path}', "r") as f:
+				return f.read().strip()
+		except (OSError, UnicodeDecodeError):
+			return ""
+
+	@classmethod
+	def cpu_count(cls, logical: bool = True) -> Optional[int]:
+		count: int
+		if logical:
+			count = sum(1 for line in cls.read("/proc/stat").splitlines() if line.startswith("cpu") and line[3:4].isdigit())
+		else:
+			cores: Set[Tuple[str, str]] = set()
+			physical: str = ""
+			for line in cls.read("/proc/cpuinfo").splitlines():
+				if line.startswith("physical id"): physical = line.split(":")[1].strip()
+				elif line.startswith("core id"): cores.add((physical, line.split(":")[1].strip()))
+			count = len(cores)
+		return count or None
+
+	@classmethod
+	def cpu_freq(cls, percpu: bool = False) -> Optional[CpuFreq]:
+		freq: str = cls.read("/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq")
+		if freq.isdigit():
+			return cls.CpuFreq(int(freq) / 1000, int(cls.read("/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_min_freq") or 0) / 1000,
+				int(cls.read("/sys/devices/system/cpu/cpu0/cpufreq/cpuinfo_max_freq") or 0) / 1000)
+		mhz: List[float] = [float(line.split(":")[1]) for line in cls.read("/proc/cpuinfo").splitlines() if line.startswith("cpu MHz")]
+		if not mhz: return None
+		return cls.CpuFreq(sum(mhz) / len(mhz), 0.0, 0.0)
+
+	@classmethod
+	def sensors_temperatures(cls, fahrenheit: bool = False) -> Dict[str, List[Temp]]:
+		temps: Dict[str, List[ProcRoot.Temp]] = {}
+		base: str = "/sys/class/hwmon"
+		try:
+			hwmons: List[str] = sorted(os.listdir(f'{cls.path}{base}'))
+		except OSError:
+			return temps
+		for hwmon in hwmons:
+			try:
+				files: List[str] = sorted(os.listdir(f'{cls.path}{base}/{hwmon}'))
+			except OSError:
+				continue
+			name: str = cls.read(f'{base}/{hwmon}/name') or hwmon
+			for file in files:
+				if not file.startswith("temp") or not file.endswith("_input"): continue
+				sensor: str = f'{base}/{hwmon}/{file[:-6]}'
+				current: str = cls.read(f'{sensor}_input')
+				if not current.lstrip("-").isdigit(): continue
+				high: str = cls.read(f'{sensor}_max')
+				crit: str = cls.read(f'{sensor}_crit')
+				temps.setdefault(name, []).append(cls.Temp(cls.read(f'{sensor}_label'), int(current) / 1000,
+					int(high) / 1000 if high.isdigit() else None, int(crit) / 1000 if crit.isdigit() else None))
+		return temps
+
+	@classmethod
+	def disk_partitions(cls, all: bool = False) -> List[Partition]:
+		physical: Set[str] = { line.strip() for line in cls.read("/proc/filesystems").splitlines() if not line.startswith("nodev") }
+		partitions: List[ProcRoot.Partition] = []
+		for line in (cls.read("/proc/mounts") or cls.read("/proc/1/mounts")).splitlines():
+			fields: List[str] = line.split()
+			if len(fields) < 4 or (not all and (fields[2] not in physical or fields[0] == "none")): continue
+			partitions.append(cls.Partition(fields[0], fields[1].replace("\\040", " "), fields[2], fields[3]))
+		return partitions
+
+	@classmethod
+	def disk_usage(cls, path: str) -> DiskUsage:
+		'''Usage of captured filesystems isn't available from proc or sys'''
+		return cls.DiskUsage(0, 0, 0, 0.0)
+
+	@classmethod
+	def net_if_stats(cls) -> Dict[str, NicStats]:
+		nics: List[str] = [line.split(":")[0].strip() for line in cls.read("/proc/net/dev").splitlines() if ":" in line]
+		return { nic : cls.NicStats(cls.read(f'/sys/class/net/{nic}/operstate') in ["up", "unknown", ""]) for nic in nics }
+
+	@classmethod
+	def pid_exists(cls, pid: int) -> bool:
+		return os.path.isdir(f'{cls.path}/proc/{pid}')
+
+	@classmethod
+	def loadavg(cls) -> Tuple[float, float, float]:
+		try:
+			return tuple(float(v) for v in cls.read("/proc/loadavg").split()[:3]) # type: ignore
+		except ValueError:
+			return 0.0, 0.0, 0.0
+
+PROC_ROOT: str = os.environ.get("BPYTOP_PROC_ROOT", "")
+for arg in sys.argv[1:]:
+	if arg.startswith("--proc-root="): PROC_ROOT = arg[12:]
+if PROC_ROOT:
+	if SYSTEM != "Linux":
+		print("ERROR!\nAlternate proc root is only supported on Linux!")
+		raise SystemExit(1)
+	if not os.path.isfile(f'{PROC_ROOT}/proc/stat'):
+		print(f'ERROR!\nNo proc/stat found in proc root: {PROC_ROOT}')
+		raise SystemExit(1)
+	ProcRoot.setup(PROC_ROOT)
+	PROC_ROOT = ProcRoot.path
+
+#? Synthetic system for benchmarking ------------------------------------------------------------->
+
+class SyntheticProcess:
+	'''Process with fixed pid, parent and name and an info dict updated by SyntheticPsutil.tick()'''
+	def __init__(self, pid: int, ppid: int, info: Dict[str, Any]):
+		self.pid = pid
+		self._ppid = ppid
+		self.info = info
+
+	def ppid(self) -> int:
+		return self._ppid
+
+	def name(self) -> str:
+		return self.info["name"]
+
+class SyntheticPsutil:
+	'''Deterministic stand-in for the parts of psutil used by the collectors, replaces psutil when running --benchmark
+	* .tick() : Advance counters and usage values one sample, called between frames to keep it out of the timings
+	'''
+	Error = psutil.Error
+	NoSuchProcess = psutil.NoSuchProcess
+	ZombieProcess = psutil.ZombieProcess
+	STATUS_RUNNING = psutil.STATUS_RUNNING
+	STATUS_DEAD = psutil.STATUS_DEAD
+	STATUS_STOPPED = psutil.STATUS_STOPPED
+	STATUS_ZOMBIE = psutil.STATUS_ZOMBIE
+	version_info = psutil.version_info
+
+	class Freq(NamedTuple):
+		current: float
+		min: float
+		max: float
+
+	class Memory(NamedTuple):
+		total: int
+		available: int
+		used: int
+		free: int
+		cached: int
+
+	class Usage(NamedTuple):
+		total: int
+		used: int
+		free: int
+		percent: float
+
+	class Partition(NamedTuple):
+		device: str
+		mountpoint: str
+		fstype: str
+		opts: str
+
+	class DiskIO(NamedTuple):
+		read_bytes: int
+		write_bytes: int
+
+	class NetIO(NamedTuple):
+		bytes_sent: int
+		bytes_recv: int
+
+	class NetStat(NamedTuple):
+		isup: bool
+
+	class MemInfo(NamedTuple):
+		rss: int
+
+	def __init__(self, threads: int = 64, procs: int = 1000, depth: int = 6, disks: int = 4, nics: int = 2, seed: int = 1, **_):
+		self.rand = Random(seed)
+		self.threads: int = max(1, threads)
+		self.boot: float = time() - 86400 * 3
+		self.usage: List[float] = [float(self.rand.randint(0, 100)) for _ in range(self.threads)]
+		self.mem_total: int = 64 << 30
+		self.mem_used: int = 16 << 30
+		self.partitions: List[SyntheticPsutil.Partition] = [self.Partition(f'/dev/sd{chr(97 + n)}1', "/" if n == 0 else f'/mnt/disk{n}', "ext4", "rw") for n in range(disks)]
+		self.disk_io: Dict[str, List[int]] = { part.device.rsplit("/", 1)[-1] : [0, 0] for part in self.partitions }
+		self.net_io: Dict[str, List[int]] = { f'eth{n}' : [0, 0] for n in range(nics) }
+		self.processes: Dict[int, SyntheticProcess] = {}
+		users: List[str] = ["root", "www-data", "postgres", "nobody", "user"]
+		levels: List[List[int]] = [[1]]
+		ppid: int = 0
+		for pid in range(1, max(1, procs) + 1):
+			if pid > 1:
+				d = self.rand.randint(1, min(len(levels), max(1, depth - 1)))
+				if d == len(levels): levels.append([])
+				levels[d].append(pid)
+				ppid = self.rand.choice(levels[d - 1])
+			name = "init" if pid == 1 else f'worker{pid % 97}'
+			self.processes[pid] = SyntheticProcess(pid, ppid, {
+				"pid" : pid, "name" : name, "cmdline" : [f'/usr/bin/{name}', "--id", str(pid)], "num_threads" : self.rand.randint(1, 32),
+				"username" : self.rand.choice(users), "memory_percent" : self.rand.random() * 2, "cpu_percent" : 0.0,
+				"cpu_times" : (0.0, 0.0), "create_time" : self.boot + pid, "memory_info" : self.MemInfo(self.rand.randint(1 << 20, 1 << 30)) })
+		self.tick()
+
+	def tick(self):
+		rand = self.rand
+		self.usage = [min(100.0, max(0.0, u + rand.uniform(-20, 20))) for u in self.usage]
+		self.mem_used = min(self.mem_total, max(1 << 30, self.mem_used + rand.randint(-1 << 28, 1 << 28)))
+		for io in self.disk_io.values():
+			io[0] += rand.randint(0, 200 << 20); io[1] += rand.randint(0, 100 << 20)
+		for io in self.net_io.values():
+			io[0] += rand.randint(0, 10 << 20); io[1] += rand.randint(0, 50 << 20)
+		for p in self.processes.values():
+			cpu = rand.random() * 100 if rand.random() < 0.05 else rand.random()
+			p.info["cpu_percent"] = cpu
+			p.info["cpu_times"] = (p.info["cpu_times"][0] + cpu / 100, p.info["cpu_times"][1] + cpu / 400)
+
+	def cpu_count(self, logical: bool = True) -> int:
+		return self.threads if logical else max(1, self.threads // 2)
+
+	def cpu_percent(self, interval = None, percpu: bool = False) -> Union[float, List[float]]:
+		if percpu: return self.usage
+		return sum(self.usage) / self.threads
+
+	def cpu_freq(self, percpu: bool = False) -> Freq:
+		return self.Freq(2400.0 + self.usage[0] * 10, 800.0, 3600.0)
+
+	def boot_time(self) -> float:
+		return self.boot
+
+	def getloadavg(self) -> Tuple[float, float, float]:
+		return (sum(self.usage) / self.threads / 25, 1.0, 0.5)
+
+	def virtual_memory(self) -> Memory:
+		return self.Memory(self.mem_total, self.mem_total - self.mem_used, self.mem_used, (self.mem_total - self.mem_used) // 2, (self.mem_total - self.mem_used) // 3)
+
+	def swap_memory(self) -> Usage:
+		return self.Usage(8 << 30, 1 << 30, 7 << 30, 12.5)
+
+	def disk_partitions(self, all: bool = False) -> List[Partition]:
+		return self.partitions
+
+	def disk_usage(self, path: str) -> Usage:
+		n = sum(map(ord, path)) % 90
+		return self.Usage(1 << 40, (1 << 40) * n // 100, (1 << 40) * (100 - n) // 100, float(n))
+
+	def disk_io_counters(self, perdisk: bool = False, nowrap: bool = True) -> Union[DiskIO, Dict[str, DiskIO]]:
+		if perdisk: return { name : self.DiskIO(*io) for name, io in self.disk_io.items() }
+		return self.DiskIO(sum(io[0] for io in self.disk_io.values()), sum(io[1] for io in self.disk_io.values()))
+
+	def net_io_counters(self, pernic: bool = False, nowrap: bool = True) -> Dict[str, NetIO]:
+		return { name : self.NetIO(*io) for name, io in self.net_io.items() }
+
+	def net_if_stats(self) -> Dict[str, NetStat]:
+		return { name : self.NetStat(True) for name in self.net_io }
+
+	def process_iter(self, attrs = None, ad_value = None) -> Iterable[SyntheticProcess]:
+		return iter(self.processes.values())
+
+	def pid_exists(self, pid: int) -> bool:
+		return pid in self.processes
+
+	def Process(self, pid: int = 0) -> SyntheticProcess:
+		if pid not in self.processes: raise self.NoSuchProcess(pid)
+		return self.processes[pid]
+
+BENCHMARK: Dict[str, int] = {}
+if "--benchmark" in sys.argv or any(arg.startswith("--benchmark=") for arg in sys.argv):
+	BENCHMARK = { "threads" : 64, "procs" : 1000, "depth" : 6, "tree" : 0, "disks" : 4, "nics" : 2, "frames" : 100, "width" : 200, "height" : 50, "seed" : 1 }
+	for arg in sys.argv[1:]:
+		if not arg.startswith("--benchmark="): continue
+		for opt in arg[12:].split(","):
+			key, _, value = opt.partition(":")
+			if not key in BENCHMARK or not value.isdigit():
+				print(f'Unrecognized benchmark option: {opt}\n'
+					f'Use argument -h or --help for help')
+				raise SystemExit(1)
+			BENCHMARK[key] = int(value)
+	psutil = SyntheticPsutil(**BENCHMARK) # type: ignore
 
 #? Variables ------------------------------------------------------------------------------------->
 
@@ -136,6 +484,13 @@ background_update=$background_update
 #* Custom cpu model name, empty string to disable.
 custom_cpu_name="$custom_cpu_name"
 
+#* Layout of the per core list in cpu box, "auto" "list" "heatmap". "heatmap" shows one colored cell per thread,
+#* "auto" switches to heatmap when all threads doesn't fit in the list.
+cpu_layout="$cpu_layout"
+
+#* Show aggregated usage rows above the heatmap, "none" "socket" "numa" "ccx" (cpus sharing a L3 cache), Linux only.
+cpu_grouping="$cpu_grouping"
+
 #* Optional filter for shown disks, should be last folder in path of a mountpoint, "root" replaces "/", separate multiple values with comma.
 #* Begin line with "exclude=" to change to exclude filter, oterwise defaults to "most include" filter. Example: disks_filter="exclude=boot, home"
 disks_filter="$disks_filter"
@@ -165,6 +520,14 @@ net_color_fixed=$net_color_fixed
 #* Show init screen at startup, the init screen is purely cosmetical
 show_init=$show_init
 
+#* Keep cpu, memory and network graph history in memory mapped files in "~/.config/bpytop/history",
+#* graphs starts filled with the last hour of history after a restart.
+persistent_history=$persistent_history
+
+#* Wrap each frame in synchronized output mode to prevent tearing, "auto" "on" "off".
+#* "auto" asks the terminal at start if it supports synchronized output.
+sync_output="$sync_output"
+
 #* Enable check for new version from github.com/aristocratos/bpytop at start.
 update_check=$update_check
 
@@ -202,6 +565,42 @@ if "--debug" in sys.argv:
 else:
 	DEBUG = False
 
+STATS_JSON: bool = "--stats-json" in sys.argv
+STARTUP_PROFILE: bool = "--startup-profile" in sys.argv
+
+RECORD_FILE: str = ""
+REPLAY_FILE: str = ""
+DAEMON: str = ""
+SHARE: str = ""
+HOSTS: List[str] = []
+for arg in sys.argv[1:]:
+	if arg.startswith("--record="): RECORD_FILE = os.path.abspath(os.path.expanduser(arg[9:]))
+	elif arg.startswith("--replay="): REPLAY_FILE = os.path.abspath(os.path.expanduser(arg[9:]))
+	elif arg.startswith("--daemon="): DAEMON = arg[9:]
+	elif arg.startswith("--share="): SHARE = os.path.abspath(os.path.expanduser(arg[8:])) if "/" in arg[8:] else arg[8:]
+	elif arg.startswith("--hosts="): HOSTS = [addr.strip() for addr in arg[8:].split(",") if addr.strip()]
+if REPLAY_FILE and (RECORD_FILE or BENCHMARK or ProcRoot.active or DAEMON or SHARE):
+	print("ERROR!\nReplay can't be combined with --record, --proc-root, --benchmark, --daemon or --share!")
+	raise SystemExit(1)
+if SHARE and (BENCHMARK or ProcRoot.active or DAEMON):
+	print("ERROR!\nShare can't be combined with --proc-root, --benchmark or --daemon!")
+	raise SystemExit(1)
+if HOSTS and (RECORD_FILE or REPLAY_FILE or BENCHMARK or ProcRoot.active or DAEMON or SHARE):
+	print("ERROR!\nHosts can't be combined with --record, --replay, --proc-root, --benchmark, --daemon or --share!")
+	raise SystemExit(1)
+
+REMOTE: Dict[str, Any] = {}
+if SHARE and not "/" in SHARE:
+	#* Attaching to another host, the number of threads sizes the cpu box and collectors before they are created
+	import urllib.request
+	try:
+		with urllib.request.urlopen(f'http://{SHARE if ":" in SHARE else "127.0.0.1:" + SHARE}/json', timeout=5) as response:
+			REMOTE = json.loads(response.read())["host"]
+	except Exception as e:
+		print(f'ERROR!\nUnable to get host info from {SHARE}: {e}')
+		raise SystemExit(1)
+	CORES, THREADS = REMOTE["cores"], REMOTE["threads"]
+
 DEFAULT_THEME: Dict[str, str] = {
 	"main_bg" : "",
 	"main_fg" : "#cc",
@@ -335,12 +734,658 @@ def timeit_decorator(func):
 		return out
 	return timed
 
+class Stats:
+	'''Rolling performance samples shown in the stats overlay and written by --stats-json
+	* .add(name, value) : Add a sample to named series, keeps the last Stats.size samples
+	* .summary(name) : Returns p50, p95 and max of named series
+	* .key_press() : Mark time of a keypress, measured up to the first frame written after it
+	* .toggle() : Show or hide the stats overlay
+	* .draw() : Draw the stats overlay if shown
+	* .dump() : Write summary of all series to stats.json in config folder
+	'''
+	samples: Dict[str, Deque[float]] = {}
+	size: int = 300
+	shown: bool = False
+	active: bool = STATS_JSON	#* Set when overlay is shown or stats will be dumped, enables the more costly byte counting
+	key_ts: float = 0.0
+	process: Any = None
+	width: int = 44
+	rows: List[Tuple[str, str, str]] = [
+		("cpu collect", "cpu_collect", "time"), ("cpu draw", "cpu_draw", "time"),
+		("mem collect", "mem_collect", "time"), ("mem draw", "mem_draw", "time"),
+		("net collect", "net_collect", "time"), ("net draw", "net_draw", "time"),
+		("proc collect", "proc_collect", "time"), ("proc draw", "proc_draw", "time"),
+		("frame write", "frame_write", "time"), ("key to screen", "key_latency", "time"),
+		("cpu bytes", "cpu_bytes", "bytes"), ("mem bytes", "mem_bytes", "bytes"),
+		("net bytes", "net_bytes", "bytes"), ("proc bytes", "proc_bytes", "bytes"),
+		("frame bytes", "frame_bytes", "bytes"), ("self cpu", "self_cpu", "percent"),
+		("self rss", "self_rss", "bytes")]
+
+	@classmethod
+	def add(cls, name: str, value: float):
+		if name not in cls.samples: cls.samples[name] = deque(maxlen=cls.size)
+		cls.samples[name].append(value)
+
+	@classmethod
+	def summary(cls, name: str) -> Tuple[float, float, float]:
+		if not cls.samples.get(name): return 0.0, 0.0, 0.0
+		values: List[float] = sorted(cls.samples[name])
+		return values[len(values) // 2], values[min(len(values) - 1, (len(values) * 95) // 100)], values[-1]
+
+	@classmethod
+	def key_press(cls, ts: float = 0.0):
+		if not cls.key_ts: cls.key_ts = ts or time()
+
+	@classmethod
+	def sample_self(cls):
+		'''Sample cpu usage and resident memory of this process'''
+		if SELF_PROCESS is None: return
+		try:
+			if cls.process is None:
+				cls.process = SELF_PROCESS
+				cls.process.cpu_percent()
+				return
+			with cls.process.oneshot():
+				cls.add("self_cpu", cls.process.cpu_percent())
+				cls.add("self_rss", cls.process.memory_info().rss)
+		except psutil.Error:
+			pass
+
+	@classmethod
+	def toggle(cls):
+		cls.shown = not cls.shown
+		cls.active = cls.shown or STATS_JSON
+		if not cls.shown:
+			Draw.clear("stats", saved=True)
+			Term.refresh(force=True)
+		else:
+			Collector.collect(draw_now=True, only_draw=True)
+
+	@classmethod
+	def draw(cls):
+		if not cls.shown: return
+		x: int = Term.width - cls.width - 1
+		y: int = Term.height - len(cls.rows) - 4
+		out: str = (f'{create_box(x, y, cls.width, len(cls.rows) + 3, "stats", line_color=THEME.div_line)}'
+					f'{Mv.to(y + 1, x + 2)}{THEME.title}{Fx.b}{"":<14}{"p50":>9}{"p95":>9}{"max":>9}{Fx.ub}')
+		for n, (label, name, kind) in enumerate(cls.rows, start=2):
+			out += f'{Mv.to(y + n, x + 2)}{THEME.title}{label:<14}{THEME.main_fg}'
+			for value in cls.summary(name):
+				if kind == "time": out += f'{value * 1000:>7.2f}ms'
+				elif kind == "bytes": out += f'{floating_humanizer(value, short=True):>9}'
+				else: out += f'{value:>8.1f}%'
+		Draw.buffer("stats", f'{out}{Term.fg}', z=5, only_save=Menu.active)
+
+	@classmethod
+	def dump(cls):
+		'''Write summary of all series and writer totals as json'''
+		out: Dict[str, Any] = {
+			"version" : VERSION,
+			"runtime" : round(time() - SELF_START, 3),
+			"writer" : { "frames" : Writer.frames, "bytes" : Writer.bytes_out, "dropped" : Writer.dropped, "latency_max" : Writer.latency_max },
+			"series" : {} }
+		for name in sorted(cls.samples):
+			p50, p95, vmax = cls.summary(name)
+			out["series"][name] = { "p50" : p50, "p95" : p95, "max" : vmax, "samples" : len(cls.samples[name]) }
+		try:
+			with open(f'{CONFIG_DIR}/stats.json', "w") as f:
+				json.dump(out, f, indent=2)
+		except Exception as e:
+			errlog.exception(f'Unable to write stats.json: {e}')
+
+class Startup:
+	'''Time spent in each startup phase, from process start to first frame, printed at exit with --startup-profile
+	* .mark(name) : End the named phase at current time
+	* .report() : Returns all phases as a table of milliseconds
+	'''
+	zero: float = SELF_CREATED
+	marks: List[Tuple[str, float]] = [("python and imports", SELF_START)]
+
+	@classmethod
+	def mark(cls, name: str):
+		if STARTUP_PROFILE: cls.marks.append((name, time()))
+
+	@classmethod
+	def report(cls) -> str:
+		last: float = min(cls.zero, cls.marks[0][1])
+		out: List[str] = [f'Startup profile (ms):', f'  {"phase":<22}{"took":>9}{"total":>9}']
+		for name, ts in cls.marks:
+			out.append(f'  {name:<22}{(ts - last) * 1000:>9.1f}{(ts - cls.zero) * 1000:>9.1f}')
+			last = ts
+		return "\n".join(out)
+
+class Recording:
+	'''Compact binary log of collected samples, written with --record=FILE and played back with --replay=FILE
+	* File: magic, format version, number of threads and cpu name, followed by one record per full collection
+	* Record: header (kind, timestamp, number of values, number of new strings, strings size, values size), new strings and values
+	* Values are ints, floats are scaled by 100 and strings stored as index in a string table that is built from the new strings of each record
+	* Values are delta encoded against the previous record, except in key records, and packed with array in blocks of the smallest fitting type
+	* .start(path) : Open file for appending, writes file header to new files
+	* .record() : Append collector output as a record, called by Collector._runner after each full collection
+	* .load(path) : Read file header and index all records for replay
+	* .advance() : Apply records up to current replay position, returns True if any records was applied
+	* .seek(seconds) : Move replay position, graphs are rebuilt from the records before new position
+	* .set_speed(key) : Change replay speed, lowest speed pauses
+	'''
+	magic: bytes = b"BPYTOPR\0"
+	version: int = 1
+	file_header: struct.Struct = struct.Struct("<HHH")
+	header: struct.Struct = struct.Struct("<BdIIII")
+	DELTA, KEY, RESET = 0, 1, 2
+	key_interval: int = 60
+	strings_max: int = 100000
+	block: int = 32
+	types: List[Tuple[str, int]] = [("b", 1 << 7), ("h", 1 << 15), ("i", 1 << 31), ("q", 1 << 63)]
+	proc_rows: int = 100
+	file: Any = None
+	count: int = 0
+	last: List[int] = []
+	strings: Dict[str, int] = {}
+	new_strings: List[str] = []
+	#* Replay
+	data: Any = None
+	threads: int = 0
+	cpu_name: str = ""
+	got_sensors: bool = False
+	times: List[float] = []
+	index: List[Tuple[int, int, int, int, int]] = []
+	keys: List[int] = []
+	tables: List[List[str]] = []
+	decoded: int = -1
+	values: List[int] = []
+	applied: int = -1
+	position: float = 0.0
+	wall: float = 0.0
+	seek_offset: float = 0.0
+	gap: float = 60.0
+	speeds: List[float] = [0, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64]
+	speed_i: int = 3
+
+	@classmethod
+	def start(cls, path: str):
+		'''Open recording for appending, checks that an existing recording is from a system with the same number of threads'''
+		try:
+			cls.file = open(path, "ab")
+			if cls.file.tell() == 0:
+				name: bytes = CPU_NAME.encode()
+				cls.file.write(cls.magic + cls.file_header.pack(cls.version, THREADS, len(name)) + name)
+				cls.file.flush()
+			else:
+				with open(path, "rb") as f:
+					head: bytes = f.read(len(cls.magic) + cls.file_header.size)
+				if not head.startswith(cls.magic): raise ValueError("not a bpytop recording")
+				version, threads, _ = cls.file_header.unpack_from(head, len(cls.magic))
+				if version != cls.version: raise ValueError(f'unsupported recording version {version}')
+				if threads != THREADS: raise ValueError(f'recorded with {threads} threads, this system has {THREADS}')
+		except (OSError, ValueError, struct.error) as e:
+			print(f'ERROR!\nUnable to record to {path}: {e}')
+			raise SystemExit(1)
+		errlog.info(f'Recording samples to {path}')
+
+	@classmethod
+	def stop(cls):
+		if cls.file is None: return
+		try:
+			cls.file.close()
+		except OSError:
+			pass
+		cls.file = None
+
+	@classmethod
+	def _string(cls, string: str) -> int:
+		if string not in cls.strings:
+			cls.strings[string] = len(cls.strings)
+			cls.new_strings.append(string)
+		return cls.strings[string]
+
+	@classmethod
+	def _pack(cls, values: List[int]) -> bytes:
+		'''Pack values in blocks, each block is prefixed with the array type used, or a zero byte if all values in the block are 0'''
+		out: List[bytes] = []
+		chunk: List[int]
+		for i in range(0, len(values), cls.block):
+			chunk = values[i:i + cls.block]
+			low, high = min(chunk), max(chunk)
+			if low == high == 0:
+				out.append(b"\0")
+				continue
+			for typecode, limit in cls.types:
+				if -limit <= low and high < limit: break
+			packed = array(typecode, chunk)
+			if sys.byteorder == "big": packed.byteswap()
+			out.append(typecode.encode() + packed.tobytes())
+		return b"".join(out)
+
+	@classmethod
+	def _unpack(cls, data: bytes, count: int) -> List[int]:
+		out: List[int] = []
+		pos: int = 0
+		n: int
+		while len(out) < count:
+			typecode: str = chr(data[pos])
+			pos += 1
+			n = min(cls.block, count - len(out))
+			if typecode == "\0":
+				out.extend([0] * n)
+				continue
+			unpacked = array(typecode)
+			unpacked.frombytes(data[pos:pos + unpacked.itemsize * n])
+			if sys.byteorder == "big": unpacked.byteswap()
+			pos += unpacked.itemsize * n
+			out.extend(unpacked)
+		return out
+
+	@classmethod
+	def _values(cls) -> List[int]:
+		'''Flatten collector output to a list of ints'''
+		cpu, mem, net, proc = CpuCollector, MemCollector, NetCollector, ProcCollector
+		sid = cls._string
+		out: List[int] = [cpu.cpu_usage[n][-1] if cpu.cpu_usage[n] else 0 for n in range(THREADS + 1)]
+		if cpu.got_sensors and CONFIG.check_temp and cpu.cpu_temp[0]:
+			out.append(1)
+			out.extend(cpu.cpu_temp[n][-1] if cpu.cpu_temp[n] else 0 for n in range(THREADS + 1))
+			out.extend([cpu.cpu_temp_high, cpu.cpu_temp_crit])
+		else:
+			out.append(0)
+		out.append(cpu.cpu_freq)
+		out.extend(round(lavg * 100) for lavg in (cpu.load_avg + [0.0, 0.0, 0.0])[:3])
+		out.append(sid(cpu.uptime))
+
+		out.extend(mem.values.get(key, 0) for key in ["total", "free", "available", "cached", "used"])
+		if MemBox.swap_on:
+			out.append(1)
+			out.extend(mem.swap_values.get(key, 0) for key in ["total", "free", "used"])
+		else:
+			out.append(0)
+		disks: Dict[str, Dict] = getattr(mem, "disks", {}) if CONFIG.show_disks else {}
+		out.append(len(disks))
+		for device, disk in disks.items():
+			out.extend([sid(device), sid(disk["name"]), disk["used_percent"], disk["free_percent"]])
+			out.extend(sid(disk[name]) for name in ["total", "used", "free", "io"])
+
+		if net.nic and net.nic in net.stats and net.stats[net.nic]["download"]["speed"]:
+			out.extend([1, sid(net.nic)])
+			for direction in ["download", "upload"]:
+				stat = net.stats[net.nic][direction]
+				out.extend([stat["speed"][-1], stat["total"], stat["offset"], stat["top"], stat["graph_top"]])
+		else:
+			out.append(0)
+
+		rows: List[Tuple[int, ProcCollector.Row]] = list(proc.snapshot.processes.items())[:cls.proc_rows]
+		out.append(len(rows))
+		for pid, p in rows:
+			out.extend([pid, sid(p.name), sid(p.cmd), int(p.threads), sid(p.username), round(p.mem * 100),
+				int(p.mem_b), round(p.cpu * 100), sid(p.indent), p.depth])
+		return out
+
+	@classmethod
+	def record(cls):
+		if cls.file is None: return
+		kind: int = cls.DELTA
+		if not cls.count or len(cls.strings) >= cls.strings_max:
+			#* Each session in a file and every strings_max strings starts a new string table
+			kind = cls.RESET
+			cls.strings = {}
+		elif not cls.count % cls.key_interval:
+			kind = cls.KEY
+		cls.new_strings = []
+		try:
+			values: List[int] = cls._values()
+			if kind == cls.DELTA:
+				payload: bytes = cls._pack([value - last for value, last in zip(values, cls.last)] + values[len(cls.last):])
+			else:
+				payload = cls._pack(values)
+			strings: bytes = "\0".join(s.replace("\0", " ") for s in cls.new_strings).encode("utf-8", "surrogateescape")
+			cls.file.write(cls.header.pack(kind, time(), len(values), len(cls.new_strings), len(strings), len(payload)) + strings + payload)
+			cls.file.flush()
+		except Exception as e:
+			errlog.exception(f'Recording stopped: {e}')
+			cls.stop()
+			return
+		cls.last = values
+		cls.count += 1
+
+	@classmethod
+	def load(cls, path: str):
+		'''Index records in recording, a truncated last record from an interrupted recording is skipped'''
+		try:
+			with open(path, "rb") as f:
+				cls.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+			if not cls.data[:len(cls.magic)] == cls.magic: raise ValueError("not a bpytop recording")
+			pos: int = len(cls.magic)
+			version, cls.threads, name_len = cls.file_header.unpack_from(cls.data, pos)
+			if version != cls.version: raise ValueError(f'unsupported recording version {version}')
+			pos += cls.file_header.size
+			cls.cpu_name = cls.data[pos:pos + name_len].decode("utf-8", "replace")
+			pos += name_len
+			while pos + cls.header.size <= len(cls.data):
+				kind, ts, count, new, strings_len, payload_len = cls.header.unpack_from(cls.data, pos)
+				pos += cls.header.size
+				if pos + strings_len + payload_len > len(cls.data): break
+				if kind == cls.RESET: cls.tables.append([])
+				if not cls.tables: raise ValueError("missing string table")
+				if new: cls.tables[-1].extend(cls.data[pos:pos + strings_len].decode("utf-8", "surrogateescape").split("\0"))
+				pos += strings_len
+				if kind != cls.DELTA: cls.keys.append(len(cls.index))
+				cls.times.append(ts)
+				cls.index.append((kind, pos, pos + payload_len, count, len(cls.tables) - 1))
+				pos += payload_len
+			if not cls.index: raise ValueError("no samples in recording")
+			cls.got_sensors = bool(cls._decode(0)[cls.threads + 1])
+		except (OSError, ValueError, struct.error) as e:
+			print(f'ERROR!\nUnable to replay {path}: {e}')
+			raise SystemExit(1)
+
+	@classmethod
+	def _decode(cls, i: int) -> List[int]:
+		'''Decode record i, continues from last decoded record if possible, otherwise from closest key record before i'''
+		key: int = cls.keys[bisect_right(cls.keys, i) - 1]
+		start: int = cls.decoded + 1 if key <= cls.decoded < i else key
+		for n in range(start, i + 1):
+			kind, pos, end, count, _ = cls.index[n]
+			deltas: List[int] = cls._unpack(cls.data[pos:end], count)
+			if kind == cls.DELTA:
+				cls.values = [delta + value for delta, value in zip(deltas, cls.values)] + deltas[len(cls.values):]
+			else:
+				cls.values = deltas
+		cls.decoded = i
+		return cls.values
+
+	@classmethod
+	def _apply(cls, i: int):
+		'''Write record i to collectors output'''
+		cpu, mem, net, proc = CpuCollector, MemCollector, NetCollector, ProcCollector
+		table: List[str] = cls.tables[cls.index[i][4]]
+		v = iter(cls._decode(i))
+		for n in range(THREADS + 1):
+			cpu.cpu_usage[n].append(next(v))
+			if len(cpu.cpu_usage[n]) > Term.width * 2:
+				del cpu.cpu_usage[n][0]
+		got_sensors: bool = bool(next(v))
+		if got_sensors:
+			for n in range(THREADS + 1):
+				cpu.cpu_temp[n].append(next(v))
+				if len(cpu.cpu_temp[n]) > 5:
+					del cpu.cpu_temp[n][0]
+			cpu.cpu_temp_high, cpu.cpu_temp_crit = next(v), next(v)
+		if got_sensors != cpu.got_sensors:
+			cpu.got_sensors = got_sensors
+			CpuBox._calc_size()
+		cpu.cpu_freq = next(v)
+		cpu.load_avg = [next(v) / 100 for _ in range(3)]
+		cpu.uptime = table[next(v)]
+
+		for key in ["total", "free", "available", "cached", "used"]:
+			mem.values[key] = next(v)
+		mem._calc_values(mem.values, mem.string, mem.percent, mem.vlist)
+		swap_on: bool = bool(next(v))
+		if swap_on:
+			for key in ["total", "free", "used"]:
+				mem.swap_values[key] = next(v)
+			mem._calc_values(mem.swap_values, mem.swap_string, mem.swap_percent, mem.swap_vlist)
+		if swap_on != MemBox.swap_on:
+			MemBox.swap_on = swap_on
+			MemBox.redraw = True
+		disks: Dict[str, Dict] = {}
+		for _ in range(next(v)):
+			disk = disks[table[next(v)]] = {}
+			disk["name"] = table[next(v)]
+			disk["used_percent"], disk["free_percent"] = next(v), next(v)
+			for name in ["total", "used", "free", "io"]:
+				disk[name] = table[next(v)]
+		if list(disks) != list(getattr(mem, "disks", {})):
+			MemBox.redraw = True
+		mem.disks = disks
+
+		if next(v):
+			nic: str = table[next(v)]
+			if not nic in net.stats:
+				net.stats[nic] = {}
+				net.strings[nic] = { "download" : {}, "upload" : {}}
+				for direction in ["download", "upload"]:
+					net.stats[nic][direction] = { "total" : 0, "last" : 0, "top" : 0, "graph_top" : 0, "offset" : 0, "speed" : [], "redraw" : True, "graph_raise" : 0, "graph_lower" : 7 }
+			if nic != net.nic:
+				net.nic = nic
+				NetBox.redraw = True
+			for direction in ["download", "upload"]:
+				stat = net.stats[nic][direction]
+				strings = net.strings[nic][direction]
+				speed, stat["total"], offset, stat["top"], graph_top = next(v), next(v), next(v), next(v), next(v)
+				stat["speed"].append(speed)
+				if len(stat["speed"]) > NetBox.width * 2:
+					del stat["speed"][0]
+				if bool(offset) != bool(stat["offset"]):
+					NetBox.redraw = True
+				stat["offset"] = offset
+				if graph_top != stat["graph_top"]:
+					stat["graph_top"] = graph_top
+					stat["redraw"] = True
+				strings["total"] = floating_humanizer(stat["total"] - stat["offset"])
+				strings["byte_ps"] = floating_humanizer(speed, per_second=True)
+				strings["bit_ps"] = floating_humanizer(speed, bit=True, per_second=True)
+				strings["top"] = floating_humanizer(stat["top"], bit=True, per_second=True)
+				strings["graph_top"] = floating_humanizer(stat["graph_top"], short=True)
+
+		processes: Dict[int, ProcCollector.Row] = {}
+		pid: int
+		for _ in range(next(v)):
+			pid = next(v)
+			processes[pid] = proc.Row(table[next(v)], table[next(v)], next(v), table[next(v)], next(v) / 100, next(v), next(v) / 100, table[next(v)], next(v))
+		proc.snapshot = proc.Snapshot(MappingProxyType(processes), len(processes), cls.times[i])
+		Rollup.collect(cls.times[i])
+
+	@classmethod
+	def _clear(cls):
+		'''Clear collected history before rebuilding it after a seek'''
+		for n in range(THREADS + 1):
+			CpuCollector.cpu_usage[n].clear()
+			CpuCollector.cpu_temp[n].clear()
+		MemCollector.vlist.clear()
+		MemCollector.swap_vlist.clear()
+		NetCollector.stats.clear()
+		NetCollector.strings.clear()
+		NetCollector.nic = ""
+		Rollup.series.clear()
+
+	@classmethod
+	def advance(cls) -> bool:
+		now: float = time()
+		first: int
+		last: int
+		if cls.applied < 0:
+			cls.position = cls.times[0]
+		elif cls.seek_offset:
+			cls.position = min(max(cls.position + cls.seek_offset, cls.times[0]), cls.times[-1])
+			cls.seek_offset = 0.0
+			cls.applied = -1
+			cls._clear()
+		else:
+			cls.position = min(cls.position + (now - cls.wall) * cls.speeds[cls.speed_i], cls.times[-1])
+		cls.wall = now
+		last = bisect_right(cls.times, cls.position)
+		if last == cls.applied + 1 and cls.speed_i and last < len(cls.times) and cls.times[last] - cls.position > cls.gap:
+			#* Skip pauses in recording, like between two recording sessions
+			cls.position = cls.times[last]
+			last += 1
+		first = max(cls.applied + 1, last - Term.width * 2)
+		if first >= last: return False
+		for i in range(first, last):
+			cls._apply(i)
+		if last - first > 1 or cls.applied < 0: Collector.redraw = True
+		cls.applied = last - 1
+		return True
+
+	@classmethod
+	def seek(cls, seconds: float):
+		cls.seek_offset += seconds
+		Timer.finish()
+
+	@classmethod
+	def set_speed(cls, key: str):
+		cls.speed_i = min(max(cls.speed_i + (1 if key == ">" else -1), 0), len(cls.speeds) - 1)
+		Timer.finish()
+
+	@classmethod
+	def clock(cls) -> str:
+		speed: float = cls.speeds[cls.speed_i]
+		return f'{"Paused" if not speed else f"x{speed:g}"} {strftime(CONFIG.draw_clock, localtime(cls.position or cls.times[0]))}'
+
+if REPLAY_FILE:
+	Recording.load(REPLAY_FILE)
+	THREADS = Recording.threads
+
+class History:
+	'''Graph history kept in fixed size memory mapped ring files in CONFIG_DIR/history, enabled with config option persistent_history
+	* File: header (magic, sequence, rows, capacity, head, count, timestamp) followed by rows * capacity int64 slots
+	* One instance at a time holds writer.lock and writes the new values in place after each full collection,
+	* the sequence is odd while writing, so other instances can copy a consistent ring at start without locking
+	* .restore() : Fill cpu and memory graph values from history, called once at start
+	* .restore_net(nic) : Returns download and upload speed history for nic
+	* .write() : Write last collected values
+	'''
+	magic: bytes = b"BPYHIST\0"
+	header: struct.Struct = struct.Struct("<8sIIIIId")
+	offset: int = 64
+	capacity: int = 1024
+	max_age: int = 3600
+	path: str = f'{CONFIG_DIR}/history'
+	lock: Any = None
+	writer: bool = False
+	error: bool = False
+	maps: Dict[str, Tuple[Any, mmap.mmap, memoryview]] = {}
+	mem_keys: List[str] = ["free", "available", "cached", "used"]
+	swap_keys: List[str] = ["used", "free"]
+
+	@staticmethod
+	def enabled() -> bool:
+		return CONFIG.persistent_history and not ProcRoot.active and not REPLAY_FILE and not REMOTE
+
+	@classmethod
+	def _file(cls, name: str) -> str:
+		return f'{cls.path}/{re.sub(r"[^0-9A-Za-z_.-]", "_", name)}.ring'
+
+	@classmethod
+	def _read(cls, name: str, rows: int) -> List[List[int]]:
+		'''Returns all rows with oldest value first, rows are empty if the file is missing, too old or of another layout'''
+		out: List[List[int]] = [[] for _ in range(rows)]
+		slots = array("q")
+		try:
+			with open(cls._file(name), "rb") as f:
+				fcntl.flock(f, fcntl.LOCK_SH)
+				with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+					for _ in range(100):
+						magic, seq, file_rows, capacity, head, count, stamp = cls.header.unpack_from(mm)
+						if magic != cls.magic or file_rows != rows or capacity != cls.capacity or len(mm) < cls.offset + rows * capacity * 8: return out
+						if not seq % 2:
+							data: bytes = mm[cls.offset:cls.offset + rows * capacity * 8]
+							if cls.header.unpack_from(mm)[1] == seq: break
+						sleep(0.001)
+					else:
+						return out
+		except (OSError, ValueError, struct.error):
+			return out
+		if not count or time() - stamp > cls.max_age: return out
+		slots.frombytes(data)
+		for row in range(rows):
+			ring: List[int] = slots[row * capacity:(row + 1) * capacity].tolist()
+			out[row] = (ring[head:] + ring[:head])[capacity - count:]
+		return out
+
+	@classmethod
+	def _map(cls, name: str, rows: int) -> Tuple[mmap.mmap, memoryview]:
+		'''Open and map file for writing, files with another layout are cleared'''
+		if name not in cls.maps:
+			size: int = cls.offset + rows * cls.capacity * 8
+			valid: bool = False
+			f = os.fdopen(os.open(cls._file(name), os.O_RDWR | os.O_CREAT, 0o644), "r+b")
+			fcntl.flock(f, fcntl.LOCK_EX)
+			head: bytes = f.read(cls.header.size)
+			if len(head) == cls.header.size:
+				magic, _, file_rows, capacity, *_ = cls.header.unpack(head)
+				valid = magic == cls.magic and file_rows == rows and capacity == cls.capacity and os.fstat(f.fileno()).st_size == size
+			if not valid:
+				f.truncate(0)
+				f.truncate(size)
+				f.seek(0)
+				f.write(cls.header.pack(cls.magic, 0, rows, cls.capacity, 0, 0, 0.0))
+				f.flush()
+			fcntl.flock(f, fcntl.LOCK_UN)
+			mm = mmap.mmap(f.fileno(), size)
+			cls.maps[name] = (f, mm, memoryview(mm)[cls.offset:].cast("q"))
+		return cls.maps[name][1:]
+
+	@classmethod
+	def _append(cls, name: str, values: List[int]):
+		mm, slots = cls._map(name, len(values))
+		magic, seq, rows, capacity, head, count, _ = cls.header.unpack_from(mm)
+		cls.header.pack_into(mm, 0, magic, (seq + 1) % (1 << 32), rows, capacity, head, count, 0.0)
+		for row, value in enumerate(values):
+			slots[row * capacity + head] = value
+		cls.header.pack_into(mm, 0, magic, (seq + 2) % (1 << 32), rows, capacity, (head + 1) % capacity, min(count + 1, capacity), time())
+
+	@classmethod
+	def write(cls):
+		if cls.error or not cls.enabled(): return
+		cpu, mem, net = CpuCollector, MemCollector, NetCollector
+		try:
+			if not cls.writer:
+				if cls.lock is None:
+					os.makedirs(cls.path, exist_ok=True)
+					cls.lock = open(f'{cls.path}/writer.lock', "a")
+				try:
+					fcntl.flock(cls.lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+				except OSError:
+					return
+				cls.writer = True
+			cls._append("cpu", [cpu.cpu_usage[n][-1] if cpu.cpu_usage[n] else 0 for n in range(THREADS + 1)])
+			if mem.percent: cls._append("mem", [mem.percent.get(key, 0) for key in cls.mem_keys])
+			if MemBox.swap_on and mem.swap_percent: cls._append("swap", [mem.swap_percent.get(key, 0) for key in cls.swap_keys])
+			if net.nic and net.nic in net.stats and net.stats[net.nic]["download"]["speed"]:
+				cls._append(f'net_{net.nic}', [net.stats[net.nic][direction]["speed"][-1] for direction in ["download", "upload"]])
+		except Exception as e:
+			errlog.exception(f'Persistent history stopped: {e}')
+			cls.error = True
+			cls.stop()
+
+	@classmethod
+	def restore(cls):
+		if not cls.enabled(): return
+		cpu, mem = CpuCollector, MemCollector
+		#* Restored values goes in front of the primed first sample, which is kept as the latest value
+		for n, values in enumerate(cls._read("cpu", THREADS + 1)):
+			if values: cpu.cpu_usage[n] = (values + cpu.cpu_usage[n])[-Term.width * 2:]
+		if not CONFIG.mem_graphs: return
+		for key, values in zip(cls.mem_keys, cls._read("mem", len(cls.mem_keys))):
+			if values: mem.vlist[key] = (values + mem.vlist.get(key, []))[-MemBox.width:]
+		for key, values in zip(cls.swap_keys, cls._read("swap", len(cls.swap_keys))):
+			if values: mem.swap_vlist[key] = (values + mem.swap_vlist.get(key, []))[-MemBox.width:]
+
+	@classmethod
+	def restore_net(cls, nic: str) -> List[List[int]]:
+		if not cls.enabled(): return [[], []]
+		return [values[-NetBox.width * 2:] for values in cls._read(f'net_{nic}', 2)]
+
+	@classmethod
+	def stop(cls):
+		for f, mm, slots in cls.maps.values():
+			try:
+				slots.release()
+				mm.close()
+				f.close()
+			except (OSError, BufferError):
+				pass
+		cls.maps = {}
+		if cls.lock is not None:
+			cls.lock.close()
+			cls.lock = None
+		cls.writer = False
+
 #? Set up config class and load config ----------------------------------------------------------->
 
 class Config:
 	'''Holds all config variables and functions for loading from and saving to disk'''
 	keys: List[str] = ["color_theme", "update_ms", "proc_sorting", "proc_reversed", "proc_tree", "check_temp", "draw_clock", "background_update", "custom_cpu_name", "proc_colors", "proc_gradient", "proc_per_core", "proc_mem_bytes",
-						"disks_filter", "update_check", "log_level", "mem_graphs", "show_swap", "swap_disk", "show_disks", "net_download", "net_upload", "net_auto", "net_color_fixed", "show_init", "mini_mode"]
+						"disks_filter", "update_check", "log_level", "mem_graphs", "show_swap", "swap_disk", "show_disks", "net_download", "net_upload", "net_auto", "net_color_fixed", "show_init", "mini_mode", "sync_output", "cpu_layout", "cpu_grouping", "persistent_history"]
 	conf_dict: Dict[str, Union[str, int, bool]] = {}
 	color_theme: str = "Default"
 	update_ms: int = 2000
@@ -368,12 +1413,19 @@ class Config:
 	show_init: bool = True
 	mini_mode: bool = False
 	log_level: str = "WARNING"
+	sync_output: str = "auto"
+	cpu_layout: str = "auto"
+	cpu_grouping: str = "none"
+	persistent_history: bool = False
 
 	warnings: List[str] = []
 	info: List[str] = []
 
 	sorting_options: List[str] = ["pid", "program", "arguments", "threads", "user", "memory", "cpu lazy", "cpu responsive"]
 	log_levels: List[str] = ["ERROR", "WARNING", "INFO", "DEBUG"]
+	sync_options: List[str] = ["auto", "on", "off"]
+	cpu_layouts: List[str] = ["auto", "list", "heatmap"]
+	cpu_groupings: List[str] = ["none", "socket", "numa", "ccx"]
 
 	changed: bool = False
 	recreate: bool = False
@@ -432,9 +1484,11 @@ class Config:
 								except ValueError:
 									self.warnings.append(f'Config key "{key}" should be an integer!')
 							if type(getattr(self, key)) == bool:
-								try:
-									new_config[key] = bool(strtobool(line))
-								except ValueError:
+								if line.lower() in ["true", "t", "yes", "y", "on", "1"]:
+									new_config[key] = True
+								elif line.lower() in ["false", "f", "no", "n", "off", "0"]:
+									new_config[key] = False
+								else:
 									self.warnings.append(f'Config key "{key}" can only be True or False!')
 							if type(getattr(self, key)) == str:
 									new_config[key] = str(line)
@@ -446,6 +1500,15 @@ class Config:
 		if "log_level" in new_config and not new_config["log_level"] in self.log_levels:
 			new_config["log_level"] = "_error_"
 			self.warnings.append(f'Config key "log_level" didn\'t get an acceptable value!')
+		if "sync_output" in new_config and not new_config["sync_output"] in self.sync_options:
+			new_config["sync_output"] = "_error_"
+			self.warnings.append(f'Config key "sync_output" didn\'t get an acceptable value!')
+		if "cpu_layout" in new_config and not new_config["cpu_layout"] in self.cpu_layouts:
+			new_config["cpu_layout"] = "_error_"
+			self.warnings.append(f'Config key "cpu_layout" didn\'t get an acceptable value!')
+		if "cpu_grouping" in new_config and not new_config["cpu_grouping"] in self.cpu_groupings:
+			new_config["cpu_grouping"] = "_error_"
+			self.warnings.append(f'Config key "cpu_grouping" didn\'t get an acceptable value!')
 		if isinstance(new_config["update_ms"], int) and new_config["update_ms"] < 100:
 			new_config["update_ms"] = 100
 			self.warnings.append(f'Config key "update_ms" can\'t be lower than 100!')
@@ -483,13 +1546,17 @@ except Exception as e:
 	errlog.exception(f'{e}')
 	raise SystemExit(1)
 
+Startup.mark("config")
 
 #? Classes --------------------------------------------------------------------------------------->
 
 class Term:
 	"""Terminal info and commands"""
-	width: int = os.get_terminal_size().columns	#* Current terminal width in columns
-	height: int = os.get_terminal_size().lines	#* Current terminal height in lines
+	try:
+		width: int = os.get_terminal_size().columns	#* Current terminal width in columns
+		height: int = os.get_terminal_size().lines	#* Current terminal height in lines
+	except OSError:
+		width, height = 80, 24						#* Not a terminal, set from options when running --benchmark
 	resized: bool = False
 	_w : int = 0
 	_h : int = 0
@@ -504,6 +1571,11 @@ class Term:
 	mouse_off			= "\033[?1002l" 						#* Disable mouse reporting
 	mouse_direct_on		= "\033[?1003h"							#* Enable reporting of mouse position at any movement
 	mouse_direct_off	= "\033[?1003l"							#* Disable direct mouse reporting
+	sync_start			= "\033[?2026h"							#* Begin synchronized update, terminal holds drawing until end
+	sync_end			= "\033[?2026l"							#* End synchronized update
+	sync_query			= "\033[?2026$p\033[c"					#* Request synchronized update mode status followed by primary device attributes
+	sync_supported: bool = False
+	sync_timeout: float = 3.0		#* Max wait for the reply, the wait ends at the device attributes reply so only slow links waits longer
 	winch = threading.Event()
 
 	@classmethod
@@ -519,12 +1591,12 @@ class Term:
 			cls.resized = True
 			Collector.collect_interrupt = True
 			cls.width, cls.height = cls._w, cls._h
-			Draw.now(Term.clear)
+			Draw.now(Term.clear, full=True)
 			Draw.now(f'{create_box(cls._w // 2 - 25, cls._h // 2 - 2, 50, 3, "resizing", line_color=Colors.green, title_color=Colors.white)}',
 				f'{Mv.r(12)}{Colors.default}{Colors.black_bg}{Fx.b}Width : {cls._w}   Height: {cls._h}{Fx.ub}{Term.bg}{Term.fg}')
 			if cls._w < 80 or cls._h < 24:
 				while cls._w < 80 or cls._h < 24:
-					Draw.now(Term.clear)
+					Draw.now(Term.clear, full=True)
 					Draw.now(f'{create_box(cls._w // 2 - 25, cls._h // 2 - 2, 50, 4, "warning", line_color=Colors.red, title_color=Colors.white)}',
 						f'{Mv.r(12)}{Colors.default}{Colors.black_bg}{Fx.b}Width: {Colors.red if cls._w < 80 else Colors.green}{cls._w}   ',
 						f'{Colors.default}Height: {Colors.red if cls._h < 24 else Colors.green}{cls._h}{Term.bg}{Term.fg}',
@@ -537,7 +1609,7 @@ class Term:
 				cls.winch.clear()
 			cls._w, cls._h = os.get_terminal_size()
 
-		Key.mouse = {}
+		Key.mouse_clear()
 		Box.calc_sizes()
 		if Init.running: cls.resized = False; return
 		if Menu.active: Menu.resized = True
@@ -556,6 +1628,37 @@ class Term:
 		new_attr = [iflag, oflag, cflag, lflag, ispeed, ospeed, cc]
 		termios.tcsetattr(sys.stdin.fileno(), termios.TCSANOW, new_attr)
 
+	@classmethod
+	def detect_sync(cls):
+		"""Ask terminal if synchronized output (DEC private mode 2026) is supported, needs to run before input reader is started.
+		Device attributes are always answered, so a missing mode report after it means the mode isn't supported."""
+		reply: str = ""
+		cls.sync_supported = False
+		try:
+			with Raw(sys.stdin):
+				Draw.now(cls.sync_query)
+				Writer.flush()
+				timeout: float = time() + cls.sync_timeout
+				while not re.search(r"\033\[\?[\d;]*c", reply) and time() < timeout:
+					if select([sys.stdin], [], [], timeout - time())[0]:
+						reply += os.read(sys.stdin.fileno(), 1024).decode("utf-8", "ignore")
+		except Exception as e:
+			errlog.exception(f'{e}')
+		#* Keys typed while waiting for the reply are handed over to the input reader
+		Key.buffer += re.sub(r"\033\[\?[\d;]*(\$y|c)", "", reply)
+		if not re.search(r"\033\[\?[\d;]*c", reply):
+			errlog.warning(f'No reply from terminal within {cls.sync_timeout} seconds, synchronized output disabled, set sync_output="on" to force')
+		#* 1 set, 2 reset, 3 permanently set, 0 unknown and 4 permanently reset counts as unsupported
+		report = re.search(r"\033\[\?2026;(\d)\$y", reply)
+		if report and report.group(1) in ["1", "2", "3"]:
+			cls.sync_supported = True
+		errlog.debug(f'Synchronized output {"supported" if cls.sync_supported else "not supported"} by terminal')
+
+	@classmethod
+	def set_sync(cls):
+		"""Set synchronized output for the writer from config and detection"""
+		Writer.sync = CONFIG.sync_output == "on" or (CONFIG.sync_output == "auto" and cls.sync_supported)
+
 	@staticmethod
 	def title(text: str = "") -> str:
 		if text: text = f' {text}'
@@ -600,21 +1703,10 @@ class Raw(object):
 		self.fd = self.stream.fileno()
 	def __enter__(self):
 		self.original_stty = termios.tcgetattr(self.stream)
-		tty.setcbreak(self.stream)
+		tty.setcbreak(self.stream, termios.TCSANOW)
 	def __exit__(self, type, value, traceback):
 		termios.tcsetattr(self.stream, termios.TCSANOW, self.original_stty)
 
-class Nonblocking(object):
-	"""Set nonblocking mode for device"""
-	def __init__(self, stream):
-		self.stream = stream
-		self.fd = self.stream.fileno()
-	def __enter__(self):
-		self.orig_fl = fcntl.fcntl(self.fd, fcntl.F_GETFL)
-		fcntl.fcntl(self.fd, fcntl.F_SETFL, self.orig_fl | os.O_NONBLOCK)
-	def __exit__(self, *args):
-		fcntl.fcntl(self.fd, fcntl.F_SETFL, self.orig_fl)
-
 class Mv:
 	"""Class with collection of cursor movement functions: .t[o](line, column) | .r[ight](columns) | .l[eft](columns) | .u[p](lines) | .d[own](lines) | .save() | .restore()"""
 	@staticmethod
@@ -644,7 +1736,8 @@ class Mv:
 class Key:
 	"""Handles the threaded input reader for keypresses and mouse events"""
 	list: List[str] = []
-	mouse: Dict[str, List[List[int]]] = {}
+	mouse: Dict[str, List[Tuple[int, int]]] = {}	#* Clickable positions per key name, set with mouse_set()
+	hits: Dict[Tuple[int, int], str] = {}			#* Key name per clickable position, cleared on resize
 	mouse_pos: Tuple[int, int] = (0, 0)
 	escape: Dict[Union[str, Tuple[str, str]], str] = {
 		"\n" :					"enter",
@@ -675,16 +1768,31 @@ class Key:
 		"[24" :					"f12"
 		}
 	new = threading.Event()
-	idle = threading.Event()
 	mouse_move = threading.Event()
 	mouse_report: bool = False
-	idle.set()
 	stopping: bool = False
 	started: bool = False
 	reader: threading.Thread
+	times: List[float] = []		#* Read timestamps for the keys in list
+	lock = threading.Lock()		#* Guards list and times, appended to by the reader thread and popped by the main thread
+	list_max: int = 100			#* Repeated navigation keys are coalesced by process_keys, so a full queue is still handled quickly
+	ts: float = 0.0				#* Read timestamp of the key last returned by get() or last()
+	buffer: str = ""
+	trie: Dict[str, Any] = {}
+	original_stty: Any = None
+	wake: List[int] = []		#* Pipe written to by stop() to wake the reader
+	escape_timeout: float = 0.05	#* Time to wait for the rest of an escape sequence before a lone escape counts as the escape key
+	mouse_re = re.compile(r"\033\[<(\d+);(\d+);(\d+)([mM])")
+	mouse_prefix_re = re.compile(r"\033\[<[\d;]*")
+
 	@classmethod
 	def start(cls):
 		cls.stopping = False
+		if not cls.trie: cls._build_trie()
+		if not cls.wake: cls.wake = list(os.pipe())
+		#* Set cbreak mode once for the lifetime of the reader, TCSANOW to not flush input typed while switching
+		cls.original_stty = termios.tcgetattr(sys.stdin)
+		tty.setcbreak(sys.stdin, termios.TCSANOW)
 		cls.reader = threading.Thread(target=cls._get_key)
 		cls.reader.start()
 		cls.started = True
@@ -692,20 +1800,59 @@ class Key:
 	def stop(cls):
 		if cls.started and cls.reader.is_alive():
 			cls.stopping = True
+			os.write(cls.wake[1], b"\0")
 			try:
 				cls.reader.join()
 			except:
 				pass
+		if cls.original_stty:
+			termios.tcsetattr(sys.stdin, termios.TCSANOW, cls.original_stty)
+			cls.original_stty = None
+
+	@classmethod
+	def mouse_set(cls, name: str, x: int, y: int, width: int):
+		'''Make width columns from x on line y clickable as key name, replaces any earlier area of name'''
+		cls.mouse_del(name)
+		cls.mouse[name] = [(x + i, y) for i in range(width)]
+		for pos in cls.mouse[name]:
+			cls.hits[pos] = name
+
+	@classmethod
+	def mouse_del(cls, *names: str):
+		for name in names:
+			for pos in cls.mouse.pop(name, []):
+				if cls.hits.get(pos) == name: del cls.hits[pos]
+
+	@classmethod
+	def mouse_clear(cls):
+		cls.mouse = {}
+		cls.hits = {}
+
+	@classmethod
+	def _build_trie(cls):
+		'''Build a trie of the escape sequences in Key.escape, each node is a dict of next characters and "" holds the key name'''
+		for codes, name in cls.escape.items():
+			for code in (codes if isinstance(codes, tuple) else (codes,)):
+				node: Dict[str, Any] = cls.trie
+				for c in code:
+					node = node.setdefault(c, {})
+				node[""] = name
 
 	@classmethod
 	def last(cls) -> str:
-		if cls.list: return cls.list.pop()
-		else: return ""
+		with cls.lock:
+			if cls.list:
+				cls.ts = cls.times.pop()
+				return cls.list.pop()
+			else: return ""
 
 	@classmethod
 	def get(cls) -> str:
-		if cls.list: return cls.list.pop(0)
-		else: return ""
+		with cls.lock:
+			if cls.list:
+				cls.ts = cls.times.pop(0)
+				return cls.list.pop(0)
+			else: return ""
 
 	@classmethod
 	def get_mouse(cls) -> Tuple[int, int]:
@@ -726,9 +1873,29 @@ class Key:
 		if cls.list: return True
 		else: return False
 
+	@classmethod
+	def repeats(cls, key: str) -> int:
+		'''Remove keys equal to key from start of queue and return how many was removed'''
+		n: int = 0
+		with cls.lock:
+			while cls.list and cls.list[0] == key:
+				cls.ts = cls.times.pop(0)
+				cls.list.pop(0)
+				n += 1
+		return n
+
+	@classmethod
+	def put_back(cls, key: str):
+		'''Put key first in queue, to be returned by the next get()'''
+		with cls.lock:
+			cls.list.insert(0, key)
+			cls.times.insert(0, cls.ts)
+
 	@classmethod
 	def clear(cls):
-		cls.list = []
+		with cls.lock:
+			cls.list = []
+			cls.times = []
 
 	@classmethod
 	def input_wait(cls, sec: float = 0.0, mouse: bool = False) -> bool:
@@ -746,109 +1913,272 @@ class Key:
 
 	@classmethod
 	def break_wait(cls):
-		cls.list.append("_null")
+		with cls.lock:
+			cls.list.append("_null")
+			cls.times.append(time())
 		cls.new.set()
-		sleep(0.01)
-		cls.new.clear()
+
+	@classmethod
+	def _add(cls, key: str, ts: float):
+		Stats.key_press(ts)
+		with cls.lock:
+			cls.list.append(key)					#* Store up to list_max keys in input queue for later processing
+			cls.times.append(ts)
+			if len(cls.list) > cls.list_max:
+				del cls.list[0]
+				del cls.times[0]
 
 	@classmethod
 	def _get_key(cls):
-		"""Get a key or escape sequence from stdin, convert to readable format and save to keys list. Meant to be run in it's own thread."""
-		input_key: str = ""
-		clean_key: str = ""
+		"""Read all available input from stdin and decode it to key names in keys list. Meant to be run in it's own thread."""
+		import codecs
+		decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+		fd: int = sys.stdin.fileno()
+		ts: float = 0.0
 		try:
 			while not cls.stopping:
-				with Raw(sys.stdin):
-					if not select([sys.stdin], [], [], 0.1)[0]:			#* Wait 100ms for input on stdin then restart loop to check for stop flag
-						continue
-					input_key += sys.stdin.read(1)						#* Read 1 key safely with blocking on
-					if input_key == "\033":								#* If first character is a escape sequence keep reading
-						cls.idle.clear()								#* Report IO block in progress to prevent Draw functions from getting a IO Block error
-						Draw.idle.wait()								#* Wait for Draw function to finish if busy
-						with Nonblocking(sys.stdin): 					#* Set non blocking to prevent read stall
-							input_key += sys.stdin.read(20)
-							if input_key.startswith("\033[<"):
-								_ = sys.stdin.read(1000)
-						cls.idle.set()									#* Report IO blocking done
-					#errlog.debug(f'{repr(input_key)}')
-					if input_key == "\033":	clean_key = "escape"		#* Key is "escape" key if only containing \033
-					elif input_key.startswith(("\033[<0;", "\033[<35;", "\033[<64;", "\033[<65;")): #* Detected mouse event
-						try:
-							cls.mouse_pos = (int(input_key.split(";")[1]), int(input_key.split(";")[2].rstrip("mM")))
-						except:
-							pass
-						else:
-							if input_key.startswith("\033[<35;"):		#* Detected mouse move in mouse direct mode
-									cls.mouse_move.set()
-									cls.new.set()
-							elif input_key.startswith("\033[<64;"):		#* Detected mouse scroll up
-								clean_key = "mouse_scroll_up"
-							elif input_key.startswith("\033[<65;"):		#* Detected mouse scroll down
-								clean_key = "mouse_scroll_down"
-							elif input_key.startswith("\033[<0;") and input_key.endswith("m"): #* Detected mouse click release
-								if Menu.active:
-									clean_key = "mouse_click"
-								else:
-									for key_name, positions in cls.mouse.items(): #* Check if mouse position is clickable
-										if list(cls.mouse_pos) in positions:
-											clean_key = key_name
-											break
-									else:
-										clean_key = "mouse_click"
-					elif input_key == "\\": clean_key = "\\"			#* Clean up "\" to not return escaped
-					else:
-						for code in cls.escape.keys():					#* Go trough dict of escape codes to get the cleaned key name
-							if input_key.lstrip("\033").startswith(code):
-								clean_key = cls.escape[code]
-								break
-						else:											#* If not found in escape dict and length of key is 1, assume regular character
-							if len(input_key) == 1:
-								clean_key = input_key
-					if clean_key:
-						cls.list.append(clean_key)						#* Store up to 10 keys in input queue for later processing
-						if len(cls.list) > 10: del cls.list[0]
-						clean_key = ""
-						cls.new.set()									#* Set threading event to interrupt main thread sleep
-					input_key = ""
-
+				#* Sleep until input on stdin or a wake up from stop(), a started escape sequence only waits for escape_timeout
+				ready = select([fd, cls.wake[0]], [], [], cls.escape_timeout if cls.buffer else None)[0]
+				if not ready:
+					if cls._parse(ts, flush=True): cls.new.set()
+					continue
+				if cls.wake[0] in ready:
+					os.read(cls.wake[0], 64)
+					continue
+				data: bytes = os.read(fd, 4096)
+				if not data: break
+				ts = time()
+				cls.buffer += decoder.decode(data)
+				if cls._parse(ts): cls.new.set()	#* Set threading event to interrupt main thread sleep
 
 		except Exception as e:
 			errlog.exception(f'Input thread failed with exception: {e}')
+			cls.clear()
+			clean_quit(1, thread=True)
+
+	@classmethod
+	def _parse(cls, ts: float, flush: bool = False) -> bool:
+		'''Decode keys and mouse events from start of buffer, stops at an incomplete escape sequence unless flush is set.
+		Returns True if any key was added.'''
+		added: bool = False
+		buf: str = cls.buffer
+		i: int = 0
+		while i < len(buf):
+			c: str = buf[i]
+			if c != "\033":
+				i += 1
+				if c in cls.trie and "" in cls.trie[c]: c = cls.trie[c][""]
+				cls._add(c, ts); added = True
+				continue
+			rest: str = buf[i + 1:i + 2]
+			if rest and rest.isprintable() and not rest in "[O":
+				i += 2											#* Alt/meta + key, dropped as an unknown sequence instead of escape followed by key
+				continue
+			if not rest or rest == "\033" or not rest in "[O":
+				if not rest and not flush: break				#* Lone escape, might be the start of a sequence still being read
+				cls._add("escape", ts); added = True			#* Escape key if not followed by a sequence
+				i += 1
+				continue
+			if rest == "O":										#* SS3 sequence, escape O and one character
+				if len(buf) < i + 3:
+					if not flush: break
+					i = len(buf)
+					continue
+				end = i + 3
+			elif buf.startswith("\033[<", i):					#* SGR mouse report
+				mouse = cls.mouse_re.match(buf, i)
+				if not mouse:
+					#* Incomplete report waits for more input, a malformed one is dropped up to the first character that can't be part of it
+					prefix: int = cls.mouse_prefix_re.match(buf, i).end() # type: ignore
+					if prefix == len(buf) and not flush: break
+					i = prefix
+					continue
+				i = mouse.end()
+				key = cls._mouse(int(mouse.group(1)), int(mouse.group(2)), int(mouse.group(3)), mouse.group(4) == "m")
+				if key: cls._add(key, ts); added = True
+				continue
+			else:												#* CSI sequence, ends at first character in range @ to ~
+				end = i + 2
+				while end < len(buf) and not "@" <= buf[end] <= "~": end += 1
+				if end >= len(buf):
+					if not flush: break
+					i = len(buf)
+					continue
+				end += 1
+			#* Walk trie for longest matching escape code, unknown sequences like terminal replies are dropped
+			node: Dict[str, Any] = cls.trie
+			name: str = ""
+			for ch in buf[i + 1:end]:
+				if not ch in node: break
+				node = node[ch]
+				name = node.get("", name)
+			if name: cls._add(name, ts); added = True
+			i = end
+		cls.buffer = buf[i:]
+		return added
+
+	@classmethod
+	def _mouse(cls, button: int, x: int, y: int, release: bool) -> str:
+		'''Returns key name for a SGR mouse report'''
+		if not button in (0, 35, 64, 65): return ""
+		cls.mouse_pos = (x, y)
+		if button == 35:						#* Detected mouse move in mouse direct mode
+			cls.mouse_move.set()
+			cls.new.set()
+		elif button == 64:						#* Detected mouse scroll up
+			return "mouse_scroll_up"
+		elif button == 65:						#* Detected mouse scroll down
+			return "mouse_scroll_down"
+		elif release:							#* Detected mouse click release
+			if Menu.active: return "mouse_click"
+			return cls.hits.get(cls.mouse_pos, "mouse_click")	#* Key name if mouse position is clickable
+		return ""
+
+class Writer:
+	'''Handles the threaded terminal writer, frames are double buffered and written with os.write in large chunks
+	* .start() : Starts writer thread
+	* .stop() : Writes any pending frames and stops writer thread
+	* .put(string, full=False) : Queue a frame, full=True drops pending frames not yet written since the new frame covers the whole screen
+	* .flush(timeout=None) : Wait for all pending frames to be written
+	'''
+	pending: List[str] = []
+	pending_ts: float = 0.0
+	lock = threading.Lock()
+	new = threading.Event()
+	idle = threading.Event()
+	idle.set()
+	stopping: bool = False
+	started: bool = False
+	thread: threading.Thread
+	chunk_size: int = 65536
+	frames: int = 0
+	dropped: int = 0
+	bytes_out: int = 0
+	latency: float = 0.0	#* Time from queueing of last frame to it being fully written
+	latency_max: float = 0.0
+	sync: bool = False		#* Wrap frames in synchronized output mode, set by Term.set_sync()
+	headless: bool = False	#* Only count bytes instead of writing, set when running --benchmark
+
+	#* Precompiled regex for finding private mode set/reset and window title escape sequences
+	mode_re = re.compile(r"\033\[\?\d+[hl]|\033\][^\a]*\a")
+
+	@classmethod
+	def start(cls):
+		cls.stopping = False
+		cls.thread = threading.Thread(target=cls._runner)
+		cls.thread.start()
+		cls.started = True
+
+	@classmethod
+	def stop(cls):
+		if cls.started and cls.thread.is_alive():
+			cls.stopping = True
+			cls.new.set()
+			try:
+				cls.thread.join()
+			except:
+				pass
+		cls.started = False
+		if cls.pending: cls._write_pending()
+
+	@classmethod
+	def put(cls, string: str, full: bool = False):
+		if not string: return
+		if not cls.started:
+			cls._write(string.encode())
+			return
+		with cls.lock:
+			if full and cls.pending:
+				#* Keep terminal mode switches and title from the dropped frames, drawing is covered by the new frame
+				cls.dropped += len(cls.pending)
+				cls.pending = cls.mode_re.findall("".join(cls.pending))
+			if not cls.pending: cls.pending_ts = time()
+			cls.pending.append(string)
+			cls.idle.clear()
+			cls.new.set()
+
+	@classmethod
+	def flush(cls, timeout: Union[float, None] = None) -> bool:
+		if not cls.started: return True
+		return cls.idle.wait(timeout)
+
+	@classmethod
+	def _runner(cls):
+		'''This is meant to run in it's own thread, writing out frames when new is set'''
+		try:
+			while not cls.stopping:
+				cls.new.wait()
+				cls._write_pending()
+		except Exception as e:
+			errlog.exception(f'Writer thread failed with exception: {e}')
 			cls.idle.set()
-			cls.list.clear()
 			clean_quit(1, thread=True)
 
+	@classmethod
+	def _write_pending(cls):
+		with cls.lock:
+			cls.new.clear()
+			if not cls.pending:
+				cls.idle.set()
+				return
+			frame: str = "".join(cls.pending)
+			queued: float = cls.pending_ts
+			cls.pending = []
+		if cls.sync: frame = f'{Term.sync_start}{frame}{Term.sync_end}'
+		data: bytes = frame.encode()
+		cls._write(data)
+		cls.frames += 1
+		cls.latency = time() - queued
+		if cls.latency > cls.latency_max: cls.latency_max = cls.latency
+		Stats.add("frame_write", cls.latency)
+		Stats.add("frame_bytes", len(data))
+		if Stats.key_ts and Stats.key_ts <= queued:
+			Stats.add("key_latency", time() - Stats.key_ts)
+			Stats.key_ts = 0.0
+		with cls.lock:
+			if not cls.pending: cls.idle.set()
+
+	@classmethod
+	def _write(cls, data: bytes):
+		'''Write all of data to stdout, waiting for the terminal if stdout is set to nonblocking'''
+		if cls.headless:
+			cls.bytes_out += len(data)
+			return
+		fd: int = sys.stdout.fileno()
+		view = memoryview(data)
+		while view:
+			try:
+				n = os.write(fd, view[:cls.chunk_size])
+			except (BlockingIOError, InterruptedError):
+				select([], [fd], [], 0.1)
+				continue
+			view = view[n:]
+			cls.bytes_out += n
+
 class Draw:
-	'''Holds the draw buffer and manages IO blocking queue
+	'''Holds the draw buffer and hands finished frames to the Writer
 	* .buffer([+]name[!], *args, append=False, now=False, z=100) : Add *args to buffer
 	* - Adding "+" prefix to name sets append to True and appends to name's current string
 	* - Adding "!" suffix to name sets now to True and print name's current string
-	* .out(clear=False) : Print all strings in buffer, clear=True clear all buffers after
-	* .now(*args) : Prints all arguments as a string
+	* .out(clear=False, changed=False) : Print all strings in buffer, clear=True clear all buffers after, changed=True only print buffers changed since last print
+	* .now(*args, full=False) : Prints all arguments as a string, full=True if the string redraws the whole screen
 	* .clear(*names) : Clear named buffers, all if no argument
-	* .last_screen() : Prints all saved buffers
+	* .saved_buffer(uncolored=False) : Returns all saved buffers as a string, uncolored=True strips colors for dimmed menu backgrounds
 	'''
 	strings: Dict[str, str] = {}
 	z_order: Dict[str, int] = {}
+	order: List[str] = []		#* Buffer names kept sorted by z value, highest first, equal z in order of creation
+	order_z: List[int] = []		#* Negated z values matching order, used for bisect
+	changed: Set[str] = set()
 	saved: Dict[str, str] = {}
+	saved_uncolored: Dict[str, Tuple[str, str]] = {}	#* Saved string and its uncolored version, only redone when saved string is replaced
 	save: Dict[str, bool] = {}
 	once: Dict[str, bool] = {}
-	idle = threading.Event()
-	idle.set()
 
 	@classmethod
-	def now(cls, *args):
-		'''Wait for input reader and self to be idle then print to screen'''
-		Key.idle.wait()
-		cls.idle.wait()
-		cls.idle.clear()
-		try:
-			print(*args, sep="", end="", flush=True)
-		except BlockingIOError:
-			pass
-			Key.idle.wait()
-			print(*args, sep="", end="", flush=True)
-		cls.idle.set()
+	def now(cls, *args, full: bool = False):
+		'''Queue a frame for the writer thread, or write directly if writer isn't running'''
+		Writer.put("".join(map(str, args)), full=full)
 
 	@classmethod
 	def buffer(cls, name: str, *args: str, append: bool = False, now: bool = False, z: int = 100, only_save: bool = False, no_save: bool = False, once: bool = False):
@@ -861,7 +2191,7 @@ class Draw:
 			now = True
 		cls.save[name] = not no_save
 		cls.once[name] = once
-		if not name in cls.z_order or z != 100: cls.z_order[name] = z
+		if not name in cls.z_order or (z != 100 and cls.z_order[name] != z): cls._set_z(name, z)
 		if args: string = "".join(args)
 		if only_save:
 			if name not in cls.saved or not append: cls.saved[name] = ""
@@ -869,42 +2199,57 @@ class Draw:
 		else:
 			if name not in cls.strings or not append: cls.strings[name] = ""
 			cls.strings[name] += string
+			cls.changed.add(name)
 			if now:
 				cls.out(name)
 
 	@classmethod
-	def out(cls, *names: str, clear = False):
-		out: str = ""
-		if not cls.strings: return
-		if names:
-			for name in sorted(cls.z_order, key=cls.z_order.get, reverse=True):
-				if name in names and name in cls.strings:
-					out += cls.strings[name]
-					if cls.save[name]:
-						cls.saved[name] = cls.strings[name]
-					if clear or cls.once[name]:
-						cls.clear(name)
-			cls.now(out)
-		else:
-			for name in sorted(cls.z_order, key=cls.z_order.get, reverse=True):
-				if name in cls.strings:
-					out += cls.strings[name]
-					if cls.save[name]:
-						cls.saved[name] = out
-					if cls.once[name] and not clear:
-						cls.clear(name)
-			if clear:
-				cls.clear()
-			cls.now(out)
+	def _set_z(cls, name: str, z: int):
+		'''Insert or move name in the ordered buffer list'''
+		if name in cls.z_order:
+			i = cls.order.index(name)
+			del cls.order[i], cls.order_z[i]
+		i = bisect_right(cls.order_z, -z)
+		cls.order.insert(i, name)
+		cls.order_z.insert(i, -z)
+		cls.z_order[name] = z
 
 	@classmethod
-	def saved_buffer(cls) -> str:
-		out: str = ""
-		for name in sorted(cls.z_order, key=cls.z_order.get, reverse=True):
-			if name in cls.saved:
-				out += cls.saved[name]
-		return out
+	def out(cls, *names: str, clear = False, changed: bool = False):
+		out: List[str] = []
+		if not cls.strings: return
+		if changed:
+			names = tuple(cls.changed)
+			if not names: return
+		box_bytes: Dict[str, int] = {}
+		for name in cls.order:
+			if name not in cls.strings or (names and name not in names): continue
+			out.append(cls.strings[name])
+			if Stats.active and name.split("_")[0] in Box.buffers:
+				box_bytes[name.split("_")[0]] = box_bytes.get(name.split("_")[0], 0) + len(cls.strings[name].encode())
+			cls.changed.discard(name)
+			if cls.save[name]:
+				cls.saved[name] = cls.strings[name]
+			if (names and clear) or (cls.once[name] and not clear):
+				cls.clear(name)
+		if clear and not names:
+			cls.clear()
+		for box, n in box_bytes.items():
+			Stats.add(f'{box}_bytes', n)
+		cls.now("".join(out))
 
+	@classmethod
+	def saved_buffer(cls, uncolored: bool = False) -> str:
+		if not uncolored:
+			return "".join(cls.saved[name] for name in cls.order if name in cls.saved)
+		out: List[str] = []
+		for name in cls.order:
+			if name not in cls.saved: continue
+			string = cls.saved[name]
+			if name not in cls.saved_uncolored or cls.saved_uncolored[name][0] is not string:
+				cls.saved_uncolored[name] = (string, Fx.uncolor(string))
+			out.append(cls.saved_uncolored[name][1])
+		return "".join(out)
 
 	@classmethod
 	def clear(cls, *names, saved: bool = False):
@@ -916,18 +2261,26 @@ class Draw:
 					del cls.save[name]
 				if name in cls.once:
 					del cls.once[name]
+				cls.changed.discard(name)
 				if saved:
 					if name in cls.saved:
 						del cls.saved[name]
+					if name in cls.saved_uncolored:
+						del cls.saved_uncolored[name]
 					if name in cls.z_order:
-						del cls.z_order[name]
+						i = cls.order.index(name)
+						del cls.order[i], cls.order_z[i], cls.z_order[name]
 		else:
 			cls.strings = {}
 			cls.save = {}
 			cls.once = {}
+			cls.changed = set()
 			if saved:
 				cls.saved = {}
+				cls.saved_uncolored = {}
 				cls.z_order = {}
+				cls.order = []
+				cls.order_z = []
 
 class Color:
 	'''Holds representations for a 24-bit color value
@@ -1041,10 +2394,14 @@ class Colors:
 	null = Color("")
 
 class Theme:
-	'''__init__ accepts a dict containing { "color_element" : "color" }'''
+	'''__init__ accepts a dict containing { "color_element" : "color" }
+	Theme colors and gradients are compiled once and kept in json files in CONFIG_DIR/theme_cache,
+	a cached file is used while theme file path, modification time and bpytop version matches'''
 
 	themes: Dict[str, str] = {}
 	cached: Dict[str, Dict[str, str]] = { "Default" : DEFAULT_THEME }
+	compiled: Dict[str, Dict[str, Any]] = {}
+	cache_dir: str = f'{CONFIG_DIR}/theme_cache'
 	current: str = ""
 
 	main_bg = main_fg = title = hi_fg = selected_bg = selected_fg = inactive_fg = proc_misc = cpu_box = mem_box = net_box = proc_box = div_line = temp_start = temp_mid = temp_end = cpu_start = cpu_mid = cpu_end = free_start = free_mid = free_end = cached_start = cached_mid = cached_end = available_start = available_mid = available_end = used_start = used_mid = used_end = download_start = download_mid = download_end = upload_start = upload_mid = upload_end = graph_text = meter_bg = process_start = process_mid = process_end = NotImplemented
@@ -1072,16 +2429,19 @@ class Theme:
 
 	def _load_theme(self, theme: str):
 		tdict: Dict[str, str]
+		if not theme in self.cached and not theme in self.themes:
+			errlog.warning(f'No theme named "{theme}" found!')
+			theme = "Default"
+			CONFIG.color_theme = theme
+		compiled: Dict[str, Any] = self._cache_load(theme)
 		if theme in self.cached:
 			tdict = self.cached[theme]
-		elif theme in self.themes:
-			tdict = self._load_file(self.themes[theme])
+		elif compiled:
+			tdict = compiled["theme"]
 			self.cached[theme] = tdict
 		else:
-			errlog.warning(f'No theme named "{theme}" found!')
-			theme = "Default"
-			CONFIG.color_theme = theme
-			tdict = DEFAULT_THEME
+			tdict = self._load_file(self.themes[theme])
+			self.cached[theme] = tdict
 		self.current = theme
 		#if CONFIG.color_theme != theme: CONFIG.color_theme = theme
 		if not "graph_text" in tdict and "inactive_fg" in tdict:
@@ -1110,6 +2470,9 @@ class Theme:
 		rgb: Dict[str, Tuple[int, int, int]]
 		colors: List[List[int]] = []
 		for name in self.gradient:
+			if compiled:
+				self.gradient[name] = list(compiled["gradient"][name])
+				continue
 			rgb = { "start" : getattr(self, f'{name}_start').dec, "mid" : getattr(self, f'{name}_mid').dec, "end" : getattr(self, f'{name}_end').dec }
 			colors = [ list(getattr(self, f'{name}_start')) ]
 			if rgb["end"][0] >= 0:
@@ -1125,6 +2488,7 @@ class Theme:
 				c = Color.fg(*rgb["start"])
 				for _ in range(101):
 					self.gradient[name] += [c]
+		if not compiled: self._cache_save(theme, tdict)
 		#* Set terminal colors
 		Term.fg, Term.bg = self.main_fg, self.main_bg
 		Draw.now(self.main_fg, self.main_bg)
@@ -1142,6 +2506,43 @@ class Theme:
 		except Exception as e:
 			errlog.exception(str(e))
 
+	@classmethod
+	def _cache_stamp(cls, theme: str) -> List[Any]:
+		path: str = cls.themes.get(theme, "Default")
+		try:
+			mtime: float = 0.0 if path == "Default" else os.path.getmtime(path)
+		except OSError:
+			mtime = -1.0
+		return [path, mtime, VERSION]
+
+	@classmethod
+	def _cache_load(cls, theme: str) -> Dict[str, Any]:
+		'''Returns compiled theme from memory or theme cache file, empty dict if missing or out of date'''
+		stamp: List[Any] = cls._cache_stamp(theme)
+		compiled: Dict[str, Any] = cls.compiled.get(theme, {})
+		if not compiled:
+			try:
+				with open(f'{cls.cache_dir}/{theme}.json') as f:
+					compiled = json.load(f)
+			except (OSError, ValueError):
+				return {}
+		if compiled.get("stamp") != stamp or set(compiled.get("gradient", {})) != set(cls.gradient):
+			return {}
+		cls.compiled[theme] = compiled
+		return compiled
+
+	def _cache_save(self, theme: str, tdict: Dict[str, str]):
+		'''Store theme dict and gradient escape sequences in memory and theme cache file'''
+		compiled: Dict[str, Any] = { "stamp" : self._cache_stamp(theme), "theme" : tdict, "gradient" : { name : list(value) for name, value in self.gradient.items() } }
+		self.compiled[theme] = compiled
+		try:
+			os.makedirs(self.cache_dir, exist_ok=True)
+			with open(f'{self.cache_dir}/{theme}.json.tmp', "w") as f:
+				json.dump(compiled, f, separators=(",", ":"))
+			os.replace(f'{self.cache_dir}/{theme}.json.tmp', f'{self.cache_dir}/{theme}.json')
+		except OSError as e:
+			errlog.warning(f'Unable to write theme cache: {e}')
+
 	@staticmethod
 	def _load_file(path: str) -> Dict[str, str]:
 		'''Load a bashtop formatted theme file and return a dict'''
@@ -1430,6 +2831,78 @@ class Meters:
 	disks_used: Dict[str, Meter] = {}
 	disks_free: Dict[str, Meter] = {}
 
+class Rollup:
+	'''Min, max and average of a series in 10 second, 1 minute and 10 minute buckets, shown in graphs when zoomed out with (v)
+	__init__() : creates empty buckets for each resolution, finished buckets are kept in deques of at most Rollup.size
+	.add(value, timestamp) : adds value to the current bucket of each resolution, returns True if a bucket shown at current zoom was finished
+	.values(level, kind) : returns list of "min", "max" or "avg" values of the finished buckets at resolution level
+	'''
+	size: int = 1024
+	seconds: List[int] = [10, 60, 600]
+	names: List[str] = ["raw", "10s", "1m", "10m"]
+	kinds: Dict[str, int] = { "min" : 0, "max" : 1, "avg" : 2 }
+	zoom: int = 0
+	series: Dict[str, 'Rollup'] = {}
+
+	def __init__(self):
+		self.buckets: List[Deque[Tuple[int, int, int]]] = [deque(maxlen=self.size) for _ in self.seconds]
+		#* Current bucket as [bucket number, min, max, sum, count]
+		self.current: List[List[int]] = [[-1, 0, 0, 0, 0] for _ in self.seconds]
+
+	def add(self, value: int, timestamp: float) -> bool:
+		finished: bool = False
+		for level, seconds in enumerate(self.seconds):
+			bucket: int = int(timestamp // seconds)
+			current = self.current[level]
+			if current[0] != bucket:
+				if current[4]:
+					self.buckets[level].append((current[1], current[2], round(current[3] / current[4])))
+					if level == Rollup.zoom - 1: finished = True
+				self.current[level] = [bucket, value, value, value, 1]
+			else:
+				if value < current[1]: current[1] = value
+				if value > current[2]: current[2] = value
+				current[3] += value
+				current[4] += 1
+		return finished
+
+	def values(self, level: int, kind: str = "avg") -> List[int]:
+		i: int = self.kinds[kind]
+		return [bucket[i] for bucket in self.buckets[level]]
+
+	@classmethod
+	def collect(cls, timestamp: float = 0.0):
+		'''Add last collected cpu, memory and network values, called after each full collection'''
+		cpu, mem, net = CpuCollector, MemCollector, NetCollector
+		if not timestamp: timestamp = time()
+		if cpu.cpu_usage[0] and cls.get("cpu").add(cpu.cpu_usage[0][-1], timestamp):
+			CpuBox.redraw = True
+		for name, value in mem.percent.items():
+			if cls.get(f'mem_{name}').add(value, timestamp): MemBox.redraw = True
+		if MemBox.swap_on:
+			for name, value in mem.swap_percent.items():
+				if cls.get(f'swap_{name}').add(value, timestamp): MemBox.redraw = True
+		if net.nic in net.stats:
+			for direction in ["download", "upload"]:
+				stat = net.stats[net.nic][direction]
+				if stat["speed"] and cls.get(f'net_{net.nic}_{direction}').add(stat["speed"][-1], timestamp): stat["redraw"] = True
+
+	@classmethod
+	def get(cls, name: str) -> 'Rollup':
+		if not name in cls.series: cls.series[name] = Rollup()
+		return cls.series[name]
+
+	@classmethod
+	def data(cls, name: str, raw: List[int], kind: str = "avg") -> List[int]:
+		'''Returns raw if not zoomed, else the bucket values for series name at current zoom'''
+		if not cls.zoom: return raw
+		return cls.get(name).values(cls.zoom - 1, kind)
+
+	@classmethod
+	def cycle(cls):
+		cls.zoom = (cls.zoom + 1) % len(cls.names)
+		Term.refresh(force=True)
+
 class Box:
 	'''Box class with all needed attributes for create_box() function'''
 	name: str
@@ -1449,6 +2922,7 @@ class Box:
 	clock_on: bool = False
 	clock: str = ""
 	resized: bool = False
+	chrome: Dict[str, Tuple[Tuple, str]] = {}
 
 	@classmethod
 	def calc_sizes(cls):
@@ -1457,13 +2931,25 @@ class Box:
 			sub._calc_size() # type: ignore
 			sub.resized = True # type: ignore
 
+	@classmethod
+	def cached(cls, name: str, key: Tuple) -> str:
+		'''Returns static box chrome saved with Box.cache() if key is unchanged, else an empty string'''
+		if name in Box.chrome and Box.chrome[name][0] == key: return Box.chrome[name][1]
+		return ""
+
+	@classmethod
+	def cache(cls, name: str, key: Tuple, string: str) -> str:
+		'''Save static box chrome together with the values it was created from and return it'''
+		Box.chrome[name] = (key, string)
+		return string
+
 	@classmethod
 	def draw_update_ms(cls, now: bool = True):
 		update_string: str = f'{CONFIG.update_ms}ms'
 		xpos: int = CpuBox.x + CpuBox.width - len(update_string) - 14
 		if not "+" in Key.mouse:
-			Key.mouse["+"] = [[xpos + 7 + i, CpuBox.y] for i in range(3)]
-			Key.mouse["-"] = [[CpuBox.x + CpuBox.width - 4 + i, CpuBox.y] for i in range(3)]
+			Key.mouse_set("+", xpos + 7, CpuBox.y, 3)
+			Key.mouse_set("-", CpuBox.x + CpuBox.width - 4, CpuBox.y, 3)
 		Draw.buffer("update_ms!" if now and not Menu.active else "update_ms",
 			f'{Mv.to(CpuBox.y, xpos)}{THEME.cpu_box(Symbol.h_line * 7, Symbol.title_left)}{Fx.b}{THEME.hi_fg("+")} ',
 			f'{THEME.title(update_string)} {THEME.hi_fg("-")}{Fx.ub}{THEME.cpu_box(Symbol.title_right)}', only_save=Menu.active, once=True)
@@ -1471,15 +2957,23 @@ class Box:
 
 	@classmethod
 	def draw_clock(cls, force: bool = False):
+		clock: str = Recording.clock() if REPLAY_FILE else strftime(CONFIG.draw_clock)
 		if force: pass
-		elif not cls.clock_on or Term.resized or strftime(CONFIG.draw_clock) == cls.clock: return
-		cls.clock = strftime(CONFIG.draw_clock)
+		elif not cls.clock_on or Term.resized or clock == cls.clock: return
+		cls.clock = clock
 		clock_len = len(cls.clock[:(CpuBox.width-58)])
 		now: bool = False if Menu.active else not force
 		Draw.buffer("clock", (f'{Mv.to(CpuBox.y, ((CpuBox.width-2)//2)-(clock_len//2)-5)}{Fx.ub}{THEME.cpu_box}{Symbol.h_line * 4}'
 			f'{Symbol.title_left}{Fx.b}{THEME.title(cls.clock[:clock_len])}{Fx.ub}{THEME.cpu_box}{Symbol.title_right}{Symbol.h_line * 4}{Term.fg}'),
 		z=1, now=now, once=not force, only_save=Menu.active)
 
+	@classmethod
+	def clock_wait(cls) -> Optional[float]:
+		'''Returns seconds until the clock string can change next, None if no clock is shown'''
+		if not CONFIG.draw_clock: return None
+		step: float = 1.0 if REPLAY_FILE or any(f in CONFIG.draw_clock for f in ("%S", "%X", "%T", "%r", "%c", "%s")) else 60.0
+		return step - time() % step + 0.001
+
 	@classmethod
 	def draw_bg(cls, now: bool = True):
 		'''Draw all boxes outlines and titles'''
@@ -1505,6 +2999,16 @@ class CpuBox(Box, SubBox):
 	redraw: bool = False
 	buffer: str = "cpu"
 	clock_block: bool = True
+	heatmap: bool = False
+	heat_half: bool = False
+	heat_cols: int = 0
+	heat_rows: int = 0
+	heat_bg: List[str] = []
+	heat_bg_src: List[str] = []
+	groups: Tuple[Tuple[str, Tuple[int, ...]], ...] = ()
+	group_cols: int = 0
+	group_rows: int = 0
+	group_label: int = 3		#* Width of group labels, prefix letter and up to the number of digits in THREADS
 	Box.buffers.append(buffer)
 
 	@classmethod
@@ -1535,14 +3039,89 @@ class CpuBox(Box, SubBox):
 		cls.box_height = ceil(THREADS / cls.box_columns) + 4
 
 		if cls.box_height > cls.height - 2: cls.box_height = cls.height - 2
+
+		cls.heatmap = CONFIG.cpu_layout == "heatmap" or (CONFIG.cpu_layout == "auto" and cls.box_columns * (cls.box_height - 3) < THREADS)
+		if cls.heatmap: cls._calc_heatmap()
+
 		cls.box_x = (cls.width - 1) - cls.box_width
 		cls.box_y = cls.y + ceil((cls.height - 2) / 2) - ceil(cls.box_height / 2) + 1
 
+	@classmethod
+	def _calc_heatmap(cls):
+		'''Find the narrowest inner box width that fits one cell per thread, tries two threads per cell before growing
+		wider than a third of the box and at last cuts rows to what fits'''
+		cls.groups = get_cpu_groups(CONFIG.cpu_grouping)
+		cls.group_label = max(3, 1 + len(str(THREADS)))
+		cls.column_size = 0
+		cls.box_columns = 1
+		min_w: int = 26 if CpuCollector.got_sensors else 19
+		max_w: int = max(min_w, cls.width - cls.width // 3 - 2)
+		rows: int = max(1, cls.height - 6)
+		bw: int = max_w
+		fits: bool = False
+		for limit, half in [(max(min_w, cls.width // 3 - 2), False), (max(min_w, cls.width // 3 - 2), True), (max_w, False), (max_w, True)]:
+			cls.heat_half = half
+			for bw in range(min_w, limit + 1):
+				cls.group_cols = bw // (cls.group_label + 6)
+				cls.group_rows = ceil(len(cls.groups) / cls.group_cols)
+				cls.heat_rows = ceil(THREADS / (bw * (2 if half else 1)))
+				if cls.group_rows + cls.heat_rows <= rows:
+					fits = True
+					break
+			if fits: break
+		if not fits:
+			cls.group_rows = min(cls.group_rows, rows // 2)
+			cls.heat_rows = rows - cls.group_rows
+		cls.heat_cols = min(bw, ceil(THREADS / (cls.heat_rows * (2 if cls.heat_half else 1))))
+		cls.box_width = bw + 2
+		cls.box_height = cls.group_rows + cls.heat_rows + 4
+
+	@classmethod
+	def _draw_heatmap(cls, x: int, y: int) -> str:
+		'''Returns group rows and thread heatmap, a cell is a "■" colored by usage or a "▀" with foreground and
+		background set by two threads if cls.heat_half'''
+		cpu = CpuCollector
+		out: str = ""
+		grad: List[str] = THEME.gradient["cpu"]
+		if cls.heat_bg_src is not grad:
+			cls.heat_bg = [c.replace("\033[38;", "\033[48;", 1) for c in grad]
+			cls.heat_bg_src = grad
+		usage: List[int] = [cpu.cpu_usage[n][-1] for n in range(1, THREADS + 1)]
+		value: int
+
+		for i, (label, cores) in enumerate(cls.groups[:cls.group_rows * cls.group_cols]):
+			if i % cls.group_cols == 0: out += f'{Mv.to(y + i // cls.group_cols, x)}'
+			value = sum(usage[n] for n in cores) // len(cores)
+			out += f'{THEME.main_fg}{label:<{cls.group_label + 1}}{grad[value]}{value:>3}{THEME.main_fg}% '
+
+		cols: int = cls.heat_cols
+		step: int = cols * 2 if cls.heat_half else cols
+		reset: str = f'{Term.bg}' or "\033[49m"
+		cell: str = "▀" if cls.heat_half else "■"
+		color: str
+		last: str
+		for row in range(cls.heat_rows):
+			out += f'{Mv.to(y + cls.group_rows + row, x)}'
+			last = ""
+			for n in range(row * step, min(row * step + cols, THREADS)):
+				if cls.heat_half:
+					color = grad[usage[n]] + (cls.heat_bg[usage[n + cols]] if n + cols < THREADS else reset)
+				else:
+					color = grad[usage[n]]
+				if color != last:
+					out += color
+					last = color
+				out += cell
+			if cls.heat_half: out += reset
+		return out
+
 	@classmethod
 	def _draw_bg(cls) -> str:
 		if not "M" in Key.mouse:
-			Key.mouse["M"] = [[cls.x + 10 + i, cls.y] for i in range(6)]
-		return (f'{create_box(box=cls, line_color=THEME.cpu_box)}'
+			Key.mouse_set("M", cls.x + 10, cls.y, 6)
+		key: Tuple = (cls.x, cls.y, cls.width, cls.height, cls.box_x, cls.box_y, cls.box_width, cls.box_height, CONFIG.custom_cpu_name, CPU_NAME,
+					f'{THEME.cpu_box}{THEME.div_line}{THEME.title}{THEME.hi_fg}{Term.fg}{Term.bg}')
+		return Box.cached("cpu_bg", key) or Box.cache("cpu_bg", key, f'{create_box(box=cls, line_color=THEME.cpu_box)}'
 		f'{Mv.to(cls.y, cls.x + 10)}{THEME.cpu_box(Symbol.title_left)}{Fx.b}{THEME.hi_fg("M")}{THEME.title("enu")}{Fx.ub}{THEME.cpu_box(Symbol.title_right)}'
 		f'{create_box(x=cls.box_x, y=cls.box_y, width=cls.box_width, height=cls.box_height, line_color=THEME.div_line, fill=False, title=CPU_NAME[:cls.box_width - 14] if not CONFIG.custom_cpu_name else CONFIG.custom_cpu_name[:cls.box_width - 14])}')
 
@@ -1559,10 +3138,12 @@ class CpuBox(Box, SubBox):
 
 		if cls.resized or cls.redraw:
 			if not "m" in Key.mouse:
-				Key.mouse["m"] = [[cls.x + 16 + i, cls.y] for i in range(6)]
-			out_misc += f'{Mv.to(cls.y, cls.x + 16)}{THEME.cpu_box(Symbol.title_left)}{Fx.b if Box.mini_mode else ""}{THEME.hi_fg("m")}{THEME.title("ini")}{Fx.ub}{THEME.cpu_box(Symbol.title_right)}'
-			Graphs.cpu["up"] = Graph(w - bw - 3, hh, THEME.gradient["cpu"], cpu.cpu_usage[0])
-			Graphs.cpu["down"] = Graph(w - bw - 3, h - hh, THEME.gradient["cpu"], cpu.cpu_usage[0], invert=True)
+				Key.mouse_set("m", cls.x + 16, cls.y, 6)
+			key: Tuple = (cls.x, cls.y, Box.mini_mode, f'{THEME.cpu_box}{THEME.hi_fg}{THEME.title}')
+			out_misc += Box.cached("cpu_buttons", key) or Box.cache("cpu_buttons", key,
+				f'{Mv.to(cls.y, cls.x + 16)}{THEME.cpu_box(Symbol.title_left)}{Fx.b if Box.mini_mode else ""}{THEME.hi_fg("m")}{THEME.title("ini")}{Fx.ub}{THEME.cpu_box(Symbol.title_right)}')
+			Graphs.cpu["up"] = Graph(w - bw - 3, hh, THEME.gradient["cpu"], Rollup.data("cpu", cpu.cpu_usage[0]))
+			Graphs.cpu["down"] = Graph(w - bw - 3, h - hh, THEME.gradient["cpu"], Rollup.data("cpu", cpu.cpu_usage[0]), invert=True)
 			Meters.cpu = Meter(cpu.cpu_usage[0][-1], bw - (21 if cpu.got_sensors else 9), "cpu")
 			if cls.column_size > 0:
 				for n in range(THREADS):
@@ -1579,7 +3160,7 @@ class CpuBox(Box, SubBox):
 		if cpu.cpu_freq:
 			freq: str = f'{cpu.cpu_freq} Mhz' if cpu.cpu_freq < 1000 else f'{float(cpu.cpu_freq / 1000):.1f} GHz'
 			out += f'{Mv.to(by - 1, bx + bw - 9)}{THEME.div_line(Symbol.title_left)}{Fx.b}{THEME.title(freq)}{Fx.ub}{THEME.div_line(Symbol.title_right)}'
-		out += (f'{Mv.to(y, x)}{Graphs.cpu["up"](None if cls.resized else cpu.cpu_usage[0][-1])}{Mv.to(y + hh, x)}{Graphs.cpu["down"](None if cls.resized else cpu.cpu_usage[0][-1])}'
+		out += (f'{Mv.to(y, x)}{Graphs.cpu["up"](None if cls.resized or Rollup.zoom else cpu.cpu_usage[0][-1])}{Mv.to(y + hh, x)}{Graphs.cpu["down"](None if cls.resized or Rollup.zoom else cpu.cpu_usage[0][-1])}'
 				f'{THEME.main_fg}{Mv.to(by + cy, bx + cx)}{Fx.b}{"CPU "}{Fx.ub}{Meters.cpu(cpu.cpu_usage[0][-1])}'
 				f'{THEME.gradient["cpu"][cpu.cpu_usage[0][-1]]}{cpu.cpu_usage[0][-1]:>4}{THEME.main_fg}%')
 		if cpu.got_sensors:
@@ -1587,29 +3168,34 @@ class CpuBox(Box, SubBox):
 						f'{cpu.cpu_temp[0][-1]:>4}{THEME.main_fg}°C')
 
 		cy += 1
-		for n in range(1, THREADS + 1):
-			out += f'{THEME.main_fg}{Mv.to(by + cy, bx + cx)}{Fx.b + "C" + Fx.ub if THREADS < 100 else ""}{str(n):<{2 if cls.column_size == 0 else 3}}'
-			if cls.column_size > 0:
-				out += f'{THEME.inactive_fg}{"⡀" * (5 * cls.column_size)}{Mv.l(5 * cls.column_size)}{THEME.gradient["cpu"][cpu.cpu_usage[n][-1]]}{Graphs.cores[n-1](None if cls.resized else cpu.cpu_usage[n][-1])}'
-			else:
-				out += f'{THEME.gradient["cpu"][cpu.cpu_usage[n][-1]]}'
-			out += f'{cpu.cpu_usage[n][-1]:>{3 if cls.column_size < 2 else 4}}{THEME.main_fg}%'
-			if cpu.got_sensors:
-				if cls.column_size > 1:
-					out += f'{THEME.inactive_fg} ⡀⡀⡀⡀⡀{Mv.l(5)}{THEME.gradient["temp"][100 if cpu.cpu_temp[n][-1] >= cpu.cpu_temp_crit else (cpu.cpu_temp[n][-1] * 100 // cpu.cpu_temp_crit)]}{Graphs.temps[n](None if cls.resized else cpu.cpu_temp[n][-1])}'
+		if cls.heatmap:
+			out += cls._draw_heatmap(bx, by + cy)
+		else:
+			for n in range(1, THREADS + 1):
+				out += f'{THEME.main_fg}{Mv.to(by + cy, bx + cx)}{Fx.b + "C" + Fx.ub if THREADS < 100 else ""}{str(n):<{2 if cls.column_size == 0 else 3}}'
+				if cls.column_size > 0:
+					out += f'{THEME.inactive_fg}{"⡀" * (5 * cls.column_size)}{Mv.l(5 * cls.column_size)}{THEME.gradient["cpu"][cpu.cpu_usage[n][-1]]}{Graphs.cores[n-1](None if cls.resized else cpu.cpu_usage[n][-1])}'
 				else:
-					out += f'{THEME.gradient["temp"][cpu.cpu_temp[n][-1]]}'
-				out += f'{cpu.cpu_temp[n][-1]:>4}{THEME.main_fg}°C'
-			out += f'{THEME.div_line(Symbol.v_line)}'
-			cy += 1
-			if cy == bh:
-				cc += 1; cy = 1; cx = ccw * cc
-				if cc == cls.box_columns: break
+					out += f'{THEME.gradient["cpu"][cpu.cpu_usage[n][-1]]}'
+				out += f'{cpu.cpu_usage[n][-1]:>{3 if cls.column_size < 2 else 4}}{THEME.main_fg}%'
+				if cpu.got_sensors:
+					if cls.column_size > 1:
+						out += f'{THEME.inactive_fg} ⡀⡀⡀⡀⡀{Mv.l(5)}{THEME.gradient["temp"][100 if cpu.cpu_temp[n][-1] >= cpu.cpu_temp_crit else (cpu.cpu_temp[n][-1] * 100 // cpu.cpu_temp_crit)]}{Graphs.temps[n](None if cls.resized else cpu.cpu_temp[n][-1])}'
+					else:
+						out += f'{THEME.gradient["temp"][cpu.cpu_temp[n][-1]]}'
+					out += f'{cpu.cpu_temp[n][-1]:>4}{THEME.main_fg}°C'
+				out += f'{THEME.div_line(Symbol.v_line)}'
+				cy += 1
+				if cy == bh:
+					cc += 1; cy = 1; cx = ccw * cc
+					if cc == cls.box_columns: break
 
 		if cy < bh - 1: cy = bh - 1
 
 		if cy < bh and cc < cls.box_columns:
-			if cls.column_size == 2 and cpu.got_sensors:
+			if cls.heatmap:
+				lavg = f'LAV: {" ".join(str(l) for l in cpu.load_avg):^{bw - 5}.{bw - 5}}'
+			elif cls.column_size == 2 and cpu.got_sensors:
 				lavg = f' Load AVG:  {"   ".join(str(l) for l in cpu.load_avg):^19.19}'
 			elif cls.column_size == 2 or (cls.column_size == 1 and cpu.got_sensors):
 				lavg = f'LAV: {" ".join(str(l) for l in cpu.load_avg):^14.14}'
@@ -1620,6 +3206,7 @@ class CpuBox(Box, SubBox):
 			out += f'{Mv.to(by + cy, bx + cx)}{THEME.main_fg}{lavg}{THEME.div_line(Symbol.v_line)}'
 
 		out += f'{Mv.to(y + h - 1, x + 1)}{THEME.graph_text}up {cpu.uptime}'
+		if Rollup.zoom: out += f'{Mv.to(y, x + 1)}{Rollup.names[Rollup.zoom]} avg'
 
 
 		Draw.buffer(cls.buffer, f'{out_misc}{out}{Term.fg}', only_save=Menu.active)
@@ -1685,14 +3272,16 @@ class MemBox(Box):
 	@classmethod
 	def _draw_bg(cls) -> str:
 		if cls.mini_mode: return ""
-		out: str = ""
+		key: Tuple = (cls.x, cls.y, cls.width, cls.height, cls.divider, CONFIG.show_disks, f'{THEME.mem_box}{THEME.div_line}{THEME.title}{Term.fg}{Term.bg}')
+		out: str = Box.cached("mem_bg", key)
+		if out: return out
 		out += f'{create_box(box=cls, line_color=THEME.mem_box)}'
 		if CONFIG.show_disks:
 			out += (f'{Mv.to(cls.y, cls.divider + 2)}{THEME.mem_box(Symbol.title_left)}{Fx.b}{THEME.title("disks")}{Fx.ub}{THEME.mem_box(Symbol.title_right)}'
 					f'{Mv.to(cls.y, cls.divider)}{THEME.mem_box(Symbol.div_up)}'
 					f'{Mv.to(cls.y + cls.height - 1, cls.divider)}{THEME.mem_box(Symbol.div_down)}{THEME.div_line}'
 					f'{"".join(f"{Mv.to(cls.y + i, cls.divider)}{Symbol.v_line}" for i in range(1, cls.height - 1))}')
-		return out
+		return Box.cache("mem_bg", key, out)
 
 	@classmethod
 	def _draw_fg(cls):
@@ -1704,6 +3293,7 @@ class MemBox(Box):
 		gbg: str = ""
 		gmv: str = ""
 		gli: str = ""
+		zoomed: bool = bool(Rollup.zoom) and CONFIG.mem_graphs
 		x, y, w, h = cls.x + 1, cls.y + 1, cls.width - 2, cls.height - 2
 		if cls.resized or cls.redraw:
 			cls._calc_size()
@@ -1715,13 +3305,13 @@ class MemBox(Box):
 			if cls.mem_meter > 0:
 				for name in cls.mem_names:
 					if CONFIG.mem_graphs:
-						Meters.mem[name] = Graph(cls.mem_meter, cls.graph_height, THEME.gradient[name], mem.vlist[name])
+						Meters.mem[name] = Graph(cls.mem_meter, cls.graph_height, THEME.gradient[name], Rollup.data(f'mem_{name}', mem.vlist[name]))
 					else:
 						Meters.mem[name] = Meter(mem.percent[name], cls.mem_meter, name)
 				if cls.swap_on:
 					for name in cls.swap_names:
 						if CONFIG.mem_graphs and not CONFIG.swap_disk:
-							Meters.swap[name] = Graph(cls.mem_meter, cls.graph_height, THEME.gradient[name], mem.swap_vlist[name])
+							Meters.swap[name] = Graph(cls.mem_meter, cls.graph_height, THEME.gradient[name], Rollup.data(f'swap_{name}', mem.swap_vlist[name]))
 						elif CONFIG.swap_disk and CONFIG.show_disks:
 							Meters.disks_used["__swap"] = Meter(mem.swap_percent["used"], cls.disk_meter, "used")
 							if len(mem.disks) * 3 <= h + 1:
@@ -1736,14 +3326,19 @@ class MemBox(Box):
 					if len(mem.disks) * 3 <= h + 1:
 						Meters.disks_free[name] = Meter(mem.disks[name]["free_percent"], cls.disk_meter, "free")
 			if not "g" in Key.mouse:
-				Key.mouse["g"] = [[x + cls.mem_width - 8 + i, y-1] for i in range(5)]
-			out_misc += (f'{Mv.to(y-1, x + cls.mem_width - 9)}{THEME.mem_box(Symbol.title_left)}{Fx.b if CONFIG.mem_graphs else ""}'
-				f'{THEME.hi_fg("g")}{THEME.title("raph")}{Fx.ub}{THEME.mem_box(Symbol.title_right)}')
-			if CONFIG.show_disks:
-				if not "s" in Key.mouse:
-					Key.mouse["s"] = [[x + w - 6 + i, y-1] for i in range(4)]
-				out_misc += (f'{Mv.to(y-1, x + w - 7)}{THEME.mem_box(Symbol.title_left)}{Fx.b if CONFIG.swap_disk else ""}'
-				f'{THEME.hi_fg("s")}{THEME.title("wap")}{Fx.ub}{THEME.mem_box(Symbol.title_right)}')
+				Key.mouse_set("g", x + cls.mem_width - 8, y-1, 5)
+			if CONFIG.show_disks and not "s" in Key.mouse:
+				Key.mouse_set("s", x + w - 6, y-1, 4)
+			key: Tuple = (x, y, w, cls.mem_width, CONFIG.mem_graphs, CONFIG.show_disks, CONFIG.swap_disk, f'{THEME.mem_box}{THEME.hi_fg}{THEME.title}')
+			misc: str = Box.cached("mem_buttons", key)
+			if not misc:
+				misc = (f'{Mv.to(y-1, x + cls.mem_width - 9)}{THEME.mem_box(Symbol.title_left)}{Fx.b if CONFIG.mem_graphs else ""}'
+					f'{THEME.hi_fg("g")}{THEME.title("raph")}{Fx.ub}{THEME.mem_box(Symbol.title_right)}')
+				if CONFIG.show_disks:
+					misc += (f'{Mv.to(y-1, x + w - 7)}{THEME.mem_box(Symbol.title_left)}{Fx.b if CONFIG.swap_disk else ""}'
+					f'{THEME.hi_fg("s")}{THEME.title("wap")}{Fx.ub}{THEME.mem_box(Symbol.title_right)}')
+				Box.cache("mem_buttons", key, misc)
+			out_misc += misc
 
 
 			Draw.buffer("mem_misc", out_misc, only_save=True)
@@ -1762,10 +3357,10 @@ class MemBox(Box):
 		for name in cls.mem_names:
 			if cls.mem_size > 2:
 				out += (f'{Mv.to(y+cy, x+cx)}{gli}{name.capitalize()[:None if big_mem else 5]+":":<{1 if big_mem else 6.6}}{Mv.to(y+cy, x+cx + cls.mem_width - 3 - (len(mem.string[name])))}{Fx.trans(mem.string[name])}'
-						f'{Mv.to(y+cy+1, x+cx)}{gbg}{Meters.mem[name](None if cls.resized else mem.percent[name])}{gmv}{str(mem.percent[name])+"%":>4}')
+						f'{Mv.to(y+cy+1, x+cx)}{gbg}{Meters.mem[name](None if cls.resized or zoomed else mem.percent[name])}{gmv}{str(mem.percent[name])+"%":>4}')
 				cy += 2 if not cls.graph_height else cls.graph_height + 1
 			else:
-				out += f'{Mv.to(y+cy, x+cx)}{name.capitalize():{5.5 if cls.mem_size > 1 else 1.1}} {gbg}{Meters.mem[name](None if cls.resized else mem.percent[name])}{mem.string[name][:None if cls.mem_size > 1 else -2]:>{9 if cls.mem_size > 1 else 7}}'
+				out += f'{Mv.to(y+cy, x+cx)}{name.capitalize():{5.5 if cls.mem_size > 1 else 1.1}} {gbg}{Meters.mem[name](None if cls.resized or zoomed else mem.percent[name])}{mem.string[name][:None if cls.mem_size > 1 else -2]:>{9 if cls.mem_size > 1 else 7}}'
 				cy += 1 if not cls.graph_height else cls.graph_height
 		#* Swap
 		if cls.swap_on and CONFIG.show_swap and not CONFIG.swap_disk:
@@ -1778,10 +3373,10 @@ class MemBox(Box):
 			for name in cls.swap_names:
 				if cls.mem_size > 2:
 					out += (f'{Mv.to(y+cy, x+cx)}{gli}{name.capitalize()[:None if big_mem else 5]+":":<{1 if big_mem else 6.6}}{Mv.to(y+cy, x+cx + cls.mem_width - 3 - (len(mem.swap_string[name])))}{Fx.trans(mem.swap_string[name])}'
-							f'{Mv.to(y+cy+1, x+cx)}{gbg}{Meters.swap[name](None if cls.resized else mem.swap_percent[name])}{gmv}{str(mem.swap_percent[name])+"%":>4}')
+							f'{Mv.to(y+cy+1, x+cx)}{gbg}{Meters.swap[name](None if cls.resized or zoomed else mem.swap_percent[name])}{gmv}{str(mem.swap_percent[name])+"%":>4}')
 					cy += 2 if not cls.graph_height else cls.graph_height + 1
 				else:
-					out += f'{Mv.to(y+cy, x+cx)}{name.capitalize():{5.5 if cls.mem_size > 1 else 1.1}} {gbg}{Meters.swap[name](None if cls.resized else mem.swap_percent[name])}{mem.swap_string[name][:None if cls.mem_size > 1 else -2]:>{9 if cls.mem_size > 1 else 7}}'; cy += 1 if not cls.graph_height else cls.graph_height
+					out += f'{Mv.to(y+cy, x+cx)}{name.capitalize():{5.5 if cls.mem_size > 1 else 1.1}} {gbg}{Meters.swap[name](None if cls.resized or zoomed else mem.swap_percent[name])}{mem.swap_string[name][:None if cls.mem_size > 1 else -2]:>{9 if cls.mem_size > 1 else 7}}'; cy += 1 if not cls.graph_height else cls.graph_height
 
 		if cls.graph_height > 0 and not cy == h: out += f'{Mv.to(y+cy, x+cx)}{gli}'
 
@@ -1839,8 +3434,9 @@ class NetBox(Box, SubBox):
 	@classmethod
 	def _draw_bg(cls) -> str:
 		if cls.mini_mode: return ""
-		return f'{create_box(box=cls, line_color=THEME.net_box)}\
-		{create_box(x=cls.box_x, y=cls.box_y, width=cls.box_width, height=cls.box_height, line_color=THEME.div_line, fill=False, title="Download", title2="Upload")}'
+		key: Tuple = (cls.x, cls.y, cls.width, cls.height, cls.box_x, cls.box_y, cls.box_width, cls.box_height, f'{THEME.net_box}{THEME.div_line}{THEME.title}{Term.fg}{Term.bg}')
+		return Box.cached("net_bg", key) or Box.cache("net_bg", key, f'{create_box(box=cls, line_color=THEME.net_box)}\
+		{create_box(x=cls.box_x, y=cls.box_y, width=cls.box_width, height=cls.box_height, line_color=THEME.div_line, fill=False, title="Download", title2="Upload")}')
 
 	@classmethod
 	def _draw_fg(cls):
@@ -1857,18 +3453,24 @@ class NetBox(Box, SubBox):
 		if cls.resized or cls.redraw:
 			out_misc += cls._draw_bg()
 			if not "b" in Key.mouse:
-				Key.mouse["b"] = [[x+w - len(net.nic[:10]) - 9 + i, y-1] for i in range(4)]
-				Key.mouse["n"] = [[x+w - 5 + i, y-1] for i in range(4)]
-				Key.mouse["z"] = [[x+w - len(net.nic[:10]) - 14 + i, y-1] for i in range(4)]
-
-
-			out_misc += (f'{Mv.to(y-1, x+w - 25)}{THEME.net_box}{Symbol.h_line * (10 - len(net.nic[:10]))}{Symbol.title_left}{Fx.b if reset else ""}{THEME.hi_fg("z")}{THEME.title("ero")}'
-				f'{Fx.ub}{THEME.net_box(Symbol.title_right)}{Term.fg}'
-				f'{THEME.net_box}{Symbol.title_left}{Fx.b}{THEME.hi_fg("<b")} {THEME.title(net.nic[:10])} {THEME.hi_fg("n>")}{Fx.ub}{THEME.net_box(Symbol.title_right)}{Term.fg}')
-			if w - len(net.nic[:10]) - 20 > 6:
-				if not "a" in Key.mouse: Key.mouse["a"] = [[x+w - 20 - len(net.nic[:10]) + i, y-1] for i in range(4)]
-				out_misc += (f'{Mv.to(y-1, x+w - 21 - len(net.nic[:10]))}{THEME.net_box(Symbol.title_left)}{Fx.b if net.auto_min else ""}{THEME.hi_fg("a")}{THEME.title("uto")}'
-				f'{Fx.ub}{THEME.net_box(Symbol.title_right)}{Term.fg}')
+				Key.mouse_set("b", x+w - len(net.nic[:10]) - 9, y-1, 4)
+				Key.mouse_set("n", x+w - 5, y-1, 4)
+				Key.mouse_set("z", x+w - len(net.nic[:10]) - 14, y-1, 4)
+
+
+			if w - len(net.nic[:10]) - 20 > 6 and not "a" in Key.mouse:
+				Key.mouse_set("a", x+w - 20 - len(net.nic[:10]), y-1, 4)
+			key: Tuple = (x, y, w, net.nic, reset, net.auto_min, f'{THEME.net_box}{THEME.hi_fg}{THEME.title}{Term.fg}')
+			misc: str = Box.cached("net_buttons", key)
+			if not misc:
+				misc = (f'{Mv.to(y-1, x+w - 25)}{THEME.net_box}{Symbol.h_line * (10 - len(net.nic[:10]))}{Symbol.title_left}{Fx.b if reset else ""}{THEME.hi_fg("z")}{THEME.title("ero")}'
+					f'{Fx.ub}{THEME.net_box(Symbol.title_right)}{Term.fg}'
+					f'{THEME.net_box}{Symbol.title_left}{Fx.b}{THEME.hi_fg("<b")} {THEME.title(net.nic[:10])} {THEME.hi_fg("n>")}{Fx.ub}{THEME.net_box(Symbol.title_right)}{Term.fg}')
+				if w - len(net.nic[:10]) - 20 > 6:
+					misc += (f'{Mv.to(y-1, x+w - 21 - len(net.nic[:10]))}{THEME.net_box(Symbol.title_left)}{Fx.b if net.auto_min else ""}{THEME.hi_fg("a")}{THEME.title("uto")}'
+					f'{Fx.ub}{THEME.net_box(Symbol.title_right)}{Term.fg}')
+				Box.cache("net_buttons", key, misc)
+			out_misc += misc
 			Draw.buffer("net_misc", out_misc, only_save=True)
 
 		cy = 0
@@ -1877,9 +3479,9 @@ class NetBox(Box, SubBox):
 			stats = net.stats[net.nic][direction]
 			if stats["redraw"] or cls.resized:
 				if cls.redraw: stats["redraw"] = True
-				Graphs.net[direction] = Graph(w - bw - 3, cls.graph_height[direction], THEME.gradient[direction], stats["speed"], max_value=stats["graph_top"],
+				Graphs.net[direction] = Graph(w - bw - 3, cls.graph_height[direction], THEME.gradient[direction], Rollup.data(f'net_{net.nic}_{direction}', stats["speed"], "max"), max_value=stats["graph_top"],
 					invert=False if direction == "download" else True, color_max_value=net.net_min.get(direction) if CONFIG.net_color_fixed else None)
-			out += f'{Mv.to(y if direction == "download" else y + cls.graph_height["download"], x)}{Graphs.net[direction](None if stats["redraw"] else stats["speed"][-1])}'
+			out += f'{Mv.to(y if direction == "download" else y + cls.graph_height["download"], x)}{Graphs.net[direction](None if stats["redraw"] or Rollup.zoom else stats["speed"][-1])}'
 
 			out += f'{Mv.to(by+cy, bx)}{THEME.main_fg}{cls.symbols[direction]} {strings["byte_ps"]:<10.10}{Mv.to(by+cy, bx+bw - 12)}{"(" + strings["bit_ps"] + ")":>12.12}'
 			cy += 1 if bh != 3 else 2
@@ -1923,6 +3525,8 @@ class ProcBox(Box):
 	redraw: bool = True
 	buffer: str = "proc"
 	pid_counter: Dict[int, int] = {}
+	row_cache: Dict[Tuple, Tuple[str, str]] = {}
+	row_layout: Tuple = ()
 	Box.buffers.append(buffer)
 
 	@classmethod
@@ -1948,73 +3552,79 @@ class ProcBox(Box):
 		return create_box(box=cls, line_color=THEME.proc_box)
 
 	@classmethod
-	def selector(cls, key: str, mouse_pos: Tuple[int, int] = (0, 0)):
+	def selector(cls, key: str, mouse_pos: Tuple[int, int] = (0, 0), count: int = 1) -> bool:
+		'''Move selection or scroll for key repeated count times, returns True if a redraw is needed'''
 		old: Tuple[int, int] = (cls.start, cls.selected)
+		num_procs: int = ProcCollector.snapshot.num_procs
 		new_sel: int
 		if key == "up":
-			if cls.selected == 1 and cls.start > 1:
-				cls.start -= 1
-			elif cls.selected == 1:
-				cls.selected = 0
-			elif cls.selected > 1:
-				cls.selected -= 1
+			for _ in range(count):
+				if cls.selected == 1 and cls.start > 1:
+					cls.start -= 1
+				elif cls.selected == 1:
+					cls.selected = 0
+				elif cls.selected > 1:
+					cls.selected -= 1
 		elif key == "down":
-			if cls.selected == 0 and ProcCollector.detailed and cls.last_selection:
-				cls.selected = cls.last_selection
-				cls.last_selection = 0
-			if cls.selected == cls.select_max and cls.start < ProcCollector.num_procs - cls.select_max + 1:
-				cls.start += 1
-			elif cls.selected < cls.select_max:
-				cls.selected += 1
+			for _ in range(count):
+				if cls.selected == 0 and ProcCollector.detailed and cls.last_selection:
+					cls.selected = cls.last_selection
+					cls.last_selection = 0
+				if cls.selected == cls.select_max and cls.start < num_procs - cls.select_max + 1:
+					cls.start += 1
+				elif cls.selected < cls.select_max:
+					cls.selected += 1
 		elif key == "mouse_scroll_up" and cls.start > 1:
-			cls.start -= 5
-		elif key == "mouse_scroll_down" and cls.start < ProcCollector.num_procs - cls.select_max + 1:
-			cls.start += 5
+			cls.start -= 5 * count
+		elif key == "mouse_scroll_down" and cls.start < num_procs - cls.select_max + 1:
+			cls.start += 5 * count
 		elif key == "page_up" and cls.start > 1:
-			cls.start -= cls.select_max
-		elif key == "page_down" and cls.start < ProcCollector.num_procs - cls.select_max + 1:
-			cls.start += cls.select_max
+			cls.start -= cls.select_max * count
+		elif key == "page_down" and cls.start < num_procs - cls.select_max + 1:
+			cls.start += cls.select_max * count
 		elif key == "home":
 			if cls.start > 1: cls.start = 1
 			elif cls.selected > 0: cls.selected = 0
 		elif key == "end":
-			if cls.start < ProcCollector.num_procs - cls.select_max + 1: cls.start = ProcCollector.num_procs - cls.select_max + 1
+			if cls.start < num_procs - cls.select_max + 1: cls.start = num_procs - cls.select_max + 1
 			elif cls.selected < cls.select_max: cls.selected = cls.select_max
 		elif key == "mouse_click":
 			if mouse_pos[0] > cls.x + cls.width - 4 and mouse_pos[1] > cls.current_y + 1 and mouse_pos[1] < cls.current_y + 1 + cls.select_max + 1:
 				if mouse_pos[1] == cls.current_y + 2:
 					cls.start = 1
 				elif mouse_pos[1] == cls.current_y + 1 + cls.select_max:
-					cls.start = ProcCollector.num_procs - cls.select_max + 1
+					cls.start = num_procs - cls.select_max + 1
 				else:
-					cls.start = round((mouse_pos[1] - cls.current_y) * ((ProcCollector.num_procs - cls.select_max - 2) / (cls.select_max - 2)))
+					cls.start = round((mouse_pos[1] - cls.current_y) * ((num_procs - cls.select_max - 2) / (cls.select_max - 2)))
 			else:
 				new_sel = mouse_pos[1] - cls.current_y - 1 if mouse_pos[1] >= cls.current_y - 1 else 0
 				if new_sel > 0 and new_sel == cls.selected:
-					Key.list.insert(0, "enter")
-					return
+					Key.put_back("enter")
+					return False
 				elif new_sel > 0 and new_sel != cls.selected:
 					if cls.last_selection: cls.last_selection = 0
 					cls.selected = new_sel
 		elif key == "mouse_unselect":
 			cls.selected = 0
 
-		if cls.start > ProcCollector.num_procs - cls.select_max + 1 and ProcCollector.num_procs > cls.select_max: cls.start = ProcCollector.num_procs - cls.select_max + 1
-		elif cls.start > ProcCollector.num_procs: cls.start = ProcCollector.num_procs
+		if cls.start > num_procs - cls.select_max + 1 and num_procs > cls.select_max: cls.start = num_procs - cls.select_max + 1
+		elif cls.start > num_procs: cls.start = num_procs
 		if cls.start < 1: cls.start = 1
-		if cls.selected > ProcCollector.num_procs and ProcCollector.num_procs < cls.select_max: cls.selected = ProcCollector.num_procs
+		if cls.selected > num_procs and num_procs < cls.select_max: cls.selected = num_procs
 		elif cls.selected > cls.select_max: cls.selected = cls.select_max
 		if cls.selected < 0: cls.selected = 0
 
 		if old != (cls.start, cls.selected):
 			cls.moved = True
-			Collector.collect(ProcCollector, proc_interrupt=True, redraw=True, only_draw=True)
+			return True
+		return False
 
 
 	@classmethod
 	def _draw_fg(cls):
 		proc = ProcCollector
 		if proc.proc_interrupt: return
+		snap: ProcCollector.Snapshot = proc.snapshot
 		if proc.redraw: cls.redraw = True
 		out: str = ""
 		out_misc: str = ""
@@ -2031,7 +3641,7 @@ class ProcBox(Box):
 		g_color: str = ""
 		s_len: int = 0
 		if proc.search_filter: s_len = len(proc.search_filter[:10])
-		loc_string: str = f'{cls.start + cls.selected - 1}/{proc.num_procs}'
+		loc_string: str = f'{cls.start + cls.selected - 1}/{snap.num_procs}'
 		end: str = ""
 
 		if proc.detailed:
@@ -2044,22 +3654,32 @@ class ProcBox(Box):
 			dy = cls.y + 1
 
 		if w > 67:
-			arg_len = w - 53 - (1 if proc.num_procs > cls.select_max else 0)
+			arg_len = w - 53 - (1 if snap.num_procs > cls.select_max else 0)
 			prog_len = 15
 		else:
 			arg_len = 0
-			prog_len = w - 38 - (1 if proc.num_procs > cls.select_max else 0)
+			prog_len = w - 38 - (1 if snap.num_procs > cls.select_max else 0)
 		if CONFIG.proc_tree:
 			tree_len = arg_len + prog_len + 6
 			arg_len = 0
 
+		#* Rendered rows are reused while width, columns, colors and theme stays the same
+		layout: Tuple = (w, arg_len, prog_len, CONFIG.proc_tree, CONFIG.proc_colors, CONFIG.proc_gradient, CONFIG.proc_mem_bytes,
+						THEME.current, cls.select_max, snap.num_procs > cls.select_max)
+		if layout != cls.row_layout:
+			cls.row_layout = layout
+			cls.row_cache = {}
+		row_cache: Dict[Tuple, Tuple[str, str]] = {}
+		row_key: Tuple
+		row: str
+
 		#* Buttons and titles only redrawn if needed
 		if cls.resized or cls.redraw:
 			s_len += len(CONFIG.proc_sorting)
 			if cls.resized or s_len != cls.s_len or proc.detailed:
 				cls.s_len = s_len
 				for k in ["e", "r", "c", "t", "k", "i", "enter", "left", " "]:
-					if k in Key.mouse: del Key.mouse[k]
+					Key.mouse_del(k)
 			if proc.detailed:
 				killed = proc.details["killed"]
 				main = THEME.main_fg if cls.selected == 0 and not killed else THEME.inactive_fg
@@ -2080,17 +3700,17 @@ class ProcBox(Box):
 					f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{THEME.title(proc.details["name"][:(dgw - 11)])}{Fx.ub}{THEME.proc_box(Symbol.title_right)}')
 
 				if cls.selected == 0:
-					Key.mouse["enter"] = [[dx+dw-10 + i, dy-1] for i in range(7)]
+					Key.mouse_set("enter", dx+dw-10, dy-1, 7)
 				if cls.selected == 0 and not killed:
-					Key.mouse["t"] = [[dx+2 + i, dy-1] for i in range(9)]
+					Key.mouse_set("t", dx+2, dy-1, 9)
 
 				out_misc += (f'{Mv.to(dy-1, dx+dw - 11)}{THEME.proc_box(Symbol.title_left)}{Fx.b}{title if cls.selected > 0 else THEME.title}close{Fx.ub} {main if cls.selected > 0 else THEME.main_fg}{Symbol.enter}{THEME.proc_box(Symbol.title_right)}'
 					f'{Mv.to(dy-1, dx+1)}{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}t{title}erminate{Fx.ub}{THEME.proc_box(Symbol.title_right)}')
 				if dw > 28:
-					if cls.selected == 0 and not killed and not "k" in Key.mouse: Key.mouse["k"] = [[dx + 13 + i, dy-1] for i in range(4)]
+					if cls.selected == 0 and not killed and not "k" in Key.mouse: Key.mouse_set("k", dx + 13, dy-1, 4)
 					out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}k{title}ill{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
 				if dw > 39:
-					if cls.selected == 0 and not killed and not "i" in Key.mouse: Key.mouse["i"] = [[dx + 19 + i, dy-1] for i in range(9)]
+					if cls.selected == 0 and not killed and not "i" in Key.mouse: Key.mouse_set("i", dx + 19, dy-1, 9)
 					out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}i{title}nterrupt{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
 
 				if Graphs.detailed_cpu is NotImplemented or cls.resized:
@@ -2114,8 +3734,8 @@ class ProcBox(Box):
 
 			sort_pos = x + w - len(CONFIG.proc_sorting) - 7
 			if not "left" in Key.mouse:
-				Key.mouse["left"] = [[sort_pos + i, y-1] for i in range(3)]
-				Key.mouse["right"] = [[sort_pos + len(CONFIG.proc_sorting) + 3 + i, y-1] for i in range(3)]
+				Key.mouse_set("left", sort_pos, y-1, 3)
+				Key.mouse_set("right", sort_pos + len(CONFIG.proc_sorting) + 3, y-1, 3)
 
 
 			out_misc += (f'{Mv.to(y-1, x + 8)}{THEME.proc_box(Symbol.h_line * (w - 9))}' +
@@ -2125,23 +3745,23 @@ class ProcBox(Box):
 
 
 			if w > 29 + s_len:
-				if not "e" in Key.mouse: Key.mouse["e"] = [[sort_pos - 5 + i, y-1] for i in range(4)]
+				if not "e" in Key.mouse: Key.mouse_set("e", sort_pos - 5, y-1, 4)
 				out_misc += (f'{Mv.to(y-1, sort_pos - 6)}{THEME.proc_box(Symbol.title_left)}{Fx.b if CONFIG.proc_tree else ""}'
 					f'{THEME.title("tre")}{THEME.hi_fg("e")}{Fx.ub}{THEME.proc_box(Symbol.title_right)}')
 			if w > 37 + s_len:
-				if not "r" in Key.mouse: Key.mouse["r"] = [[sort_pos - 14 + i, y-1] for i in range(7)]
+				if not "r" in Key.mouse: Key.mouse_set("r", sort_pos - 14, y-1, 7)
 				out_misc += (f'{Mv.to(y-1, sort_pos - 15)}{THEME.proc_box(Symbol.title_left)}{Fx.b if CONFIG.proc_reversed else ""}'
 					f'{THEME.hi_fg("r")}{THEME.title("everse")}{Fx.ub}{THEME.proc_box(Symbol.title_right)}')
 			if w > 47 + s_len:
-				if not "c" in Key.mouse: Key.mouse["c"] = [[sort_pos - 24 + i, y-1] for i in range(8)]
+				if not "c" in Key.mouse: Key.mouse_set("c", sort_pos - 24, y-1, 8)
 				out_misc += (f'{Mv.to(y-1, sort_pos - 25)}{THEME.proc_box(Symbol.title_left)}{Fx.b if CONFIG.proc_per_core else ""}'
 					f'{THEME.title("per-")}{THEME.hi_fg("c")}{THEME.title("ore")}{Fx.ub}{THEME.proc_box(Symbol.title_right)}')
 
-			if not "f" in Key.mouse or cls.resized: Key.mouse["f"] = [[x+9 + i, y-1] for i in range(6 if not proc.search_filter else 2 + len(proc.search_filter[-10:]))]
+			if not "f" in Key.mouse or cls.resized: Key.mouse_set("f", x+9, y-1, 6 if not proc.search_filter else 2 + len(proc.search_filter[-10:]))
 			if proc.search_filter:
-				if not "delete" in Key.mouse: Key.mouse["delete"] = [[x+12 + len(proc.search_filter[-10:]) + i, y-1] for i in range(3)]
+				if not "delete" in Key.mouse: Key.mouse_set("delete", x+12 + len(proc.search_filter[-10:]), y-1, 3)
 			elif "delete" in Key.mouse:
-				del Key.mouse["delete"]
+				Key.mouse_del("delete")
 			out_misc += (f'{Mv.to(y-1, x + 8)}{THEME.proc_box(Symbol.title_left)}{Fx.b if cls.filtering or proc.search_filter else ""}{THEME.hi_fg("f")}{THEME.title}' +
 				("ilter" if not proc.search_filter and not cls.filtering else f' {proc.search_filter[-(10 if w < 83 else w - 74):]}{(Fx.bl + "█" + Fx.ubl) if cls.filtering else THEME.hi_fg(" del")}') +
 				f'{THEME.proc_box(Symbol.title_right)}')
@@ -2153,18 +3773,18 @@ class ProcBox(Box):
 					f'{Mv.to(y+h, x+1)}{THEME.proc_box(Symbol.title_left)}{main}{Symbol.up} {Fx.b}{THEME.main_fg("select")} {Fx.ub}'
 					f'{THEME.inactive_fg if cls.selected == cls.select_max else THEME.main_fg}{Symbol.down}{THEME.proc_box(Symbol.title_right)}'
 					f'{THEME.proc_box(Symbol.title_left)}{title}{Fx.b}info {Fx.ub}{main}{Symbol.enter}{THEME.proc_box(Symbol.title_right)}')
-			if not "enter" in Key.mouse: Key.mouse["enter"] = [[x + 14 + i, y+h] for i in range(6)]
+			if not "enter" in Key.mouse: Key.mouse_set("enter", x + 14, y+h, 6)
 			if w - len(loc_string) > 34:
-				if not "t" in Key.mouse: Key.mouse["t"] = [[x + 22 + i, y+h] for i in range(9)]
+				if not "t" in Key.mouse: Key.mouse_set("t", x + 22, y+h, 9)
 				out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}t{title}erminate{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
 			if w - len(loc_string) > 40:
-				if not "k" in Key.mouse: Key.mouse["k"] = [[x + 33 + i, y+h] for i in range(4)]
+				if not "k" in Key.mouse: Key.mouse_set("k", x + 33, y+h, 4)
 				out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}k{title}ill{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
 			if w - len(loc_string) > 51:
-				if not "i" in Key.mouse: Key.mouse["i"] = [[x + 39 + i, y+h] for i in range(9)]
+				if not "i" in Key.mouse: Key.mouse_set("i", x + 39, y+h, 9)
 				out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}i{title}nterrupt{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
 			if CONFIG.proc_tree and w - len(loc_string) > 65:
-				if not " " in Key.mouse: Key.mouse[" "] = [[x + 50 + i, y+h] for i in range(12)]
+				if not " " in Key.mouse: Key.mouse_set(" ", x + 50, y+h, 12)
 				out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}spc {title}collapse{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
 
 			#* Processes labels
@@ -2174,12 +3794,12 @@ class ProcBox(Box):
 			if selected == "threads" and not CONFIG.proc_tree and not arg_len: selected = "tr"
 			if CONFIG.proc_tree:
 				label = (f'{THEME.title}{Fx.b}{Mv.to(y, x)}{" Tree:":<{tree_len-2}}' "Threads: " f'{"User:":<9}Mem%{"Cpu%":>11}{Fx.ub}{THEME.main_fg} ' +
-						(" " if proc.num_procs > cls.select_max else ""))
+						(" " if snap.num_procs > cls.select_max else ""))
 				if selected in ["pid", "program", "arguments"]: selected = "tree"
 			else:
 				label = (f'{THEME.title}{Fx.b}{Mv.to(y, x)}{"Pid:":>7} {"Program:" if prog_len > 8 else "Prg:":<{prog_len}}' + (f'{"Arguments:":<{arg_len-4}}' if arg_len else "") +
 					f'{"Threads:" if arg_len else " Tr:"} {"User:":<9}Mem%{"Cpu%":>11}{Fx.ub}{THEME.main_fg} ' +
-					(" " if proc.num_procs > cls.select_max else ""))
+					(" " if snap.num_procs > cls.select_max else ""))
 				if selected == "program" and prog_len <= 8: selected = "prg"
 			selected = selected.split(" ")[0].capitalize()
 			if CONFIG.proc_mem_bytes: label = label.replace("Mem%", "MemB")
@@ -2221,16 +3841,16 @@ class ProcBox(Box):
 				if i == 2: break
 
 		#* Checking for selection out of bounds
-		if cls.start > proc.num_procs - cls.select_max + 1 and proc.num_procs > cls.select_max: cls.start = proc.num_procs - cls.select_max + 1
-		elif cls.start > proc.num_procs: cls.start = proc.num_procs
+		if cls.start > snap.num_procs - cls.select_max + 1 and snap.num_procs > cls.select_max: cls.start = snap.num_procs - cls.select_max + 1
+		elif cls.start > snap.num_procs: cls.start = snap.num_procs
 		if cls.start < 1: cls.start = 1
-		if cls.selected > proc.num_procs and proc.num_procs < cls.select_max: cls.selected = proc.num_procs
+		if cls.selected > snap.num_procs and snap.num_procs < cls.select_max: cls.selected = snap.num_procs
 		elif cls.selected > cls.select_max: cls.selected = cls.select_max
 		if cls.selected < 0: cls.selected = 0
 
 		#* Start iteration over all processes and info
 		cy = 1
-		for n, (pid, items) in enumerate(proc.processes.items(), start=1):
+		for n, (pid, items) in enumerate(snap.processes.items(), start=1):
 			if n < cls.start: continue
 			l_count += 1
 			if l_count == cls.selected:
@@ -2238,21 +3858,8 @@ class ProcBox(Box):
 				cls.selected_pid = pid
 			else: is_selected = False
 
-			indent, name, cmd, threads, username, mem, mem_b, cpu = [items.get(v, d) for v, d in [("indent", ""), ("name", ""), ("cmd", ""), ("threads", 0), ("username", "?"), ("mem", 0.0), ("mem_b", 0), ("cpu", 0.0)]]
+			name, cmd, threads, username, mem, mem_b, cpu, indent = items[:8]
 
-			if CONFIG.proc_tree:
-				arg_len = 0
-				offset = tree_len - len(f'{indent}{pid}')
-				if offset < 1: offset = 0
-				indent = f'{indent:.{tree_len - len(str(pid))}}'
-				if offset - len(name) > 12:
-					cmd = cmd.split(" ")[0].split("/")[-1]
-					if not cmd.startswith(name):
-						offset = len(name)
-						arg_len = tree_len - len(f'{indent}{pid} {name} ') + 2
-						cmd = f'({cmd[:(arg_len-4)]})'
-			else:
-				offset = prog_len - 1
 			if cpu > 1.0 or pid in Graphs.pid_cpu:
 				if pid not in Graphs.pid_cpu:
 					Graphs.pid_cpu[pid] = Graph(5, 1, None, [0])
@@ -2264,61 +3871,87 @@ class ProcBox(Box):
 				else:
 					cls.pid_counter[pid] = 0
 
-			end = f'{THEME.main_fg}{Fx.ub}' if CONFIG.proc_colors else Fx.ub
 			if cls.selected > cy: calc = cls.selected - cy
 			elif cls.selected > 0 and cls.selected <= cy: calc = cy - cls.selected
 			else: calc = cy
-			if CONFIG.proc_colors and not is_selected:
-				vals = []
-				for v in [int(cpu), int(mem), int(threads // 3)]:
-					if CONFIG.proc_gradient:
-						val = ((v if v <= 100 else 100) + 100) - calc * 100 // cls.select_max
-						vals += [f'{THEME.gradient["proc_color" if val < 100 else "process"][val if val < 100 else val - 100]}']
-					else:
-						vals += [f'{THEME.gradient["process"][v if v <= 100 else 100]}']
-				c_color, m_color, t_color = vals
+
+			#* Gradient position only changes the colors when proc_gradient is set, so scrolling reuses rows otherwise
+			row_key = (pid, items, calc if CONFIG.proc_gradient and not is_selected else 0, is_selected)
+			if row_key in cls.row_cache:
+				row, c_color = row_cache[row_key] = cls.row_cache[row_key]
 			else:
-				c_color = m_color = t_color = Fx.b
-			if CONFIG.proc_gradient and not is_selected:
-				g_color = f'{THEME.gradient["proc"][calc * 100 // cls.select_max]}'
-			if is_selected:
-				c_color = m_color = t_color = g_color = end = ""
-				out += f'{THEME.selected_bg}{THEME.selected_fg}{Fx.b}'
-
-			#* Creates one line for a process with all gathered information
-			out += (f'{Mv.to(y+cy, x)}{g_color}{indent}{pid:>{(1 if CONFIG.proc_tree else 7)}} ' +
-				f'{c_color}{name:<{offset}.{offset}} {end}' +
-				(f'{g_color}{cmd:<{arg_len}.{arg_len-1}}' if arg_len else "") +
-				t_color + (f'{threads:>4} ' if threads < 1000 else "999> ") + end +
-				g_color + (f'{username:<9.9}' if len(username) < 10 else f'{username[:8]:<8}+') +
-				m_color + ((f'{mem:>4.1f}' if mem < 100 else f'{mem:>4.0f} ') if not CONFIG.proc_mem_bytes else f'{floating_humanizer(mem_b, short=True):>4.4}') + end +
-				f' {THEME.inactive_fg}{"⡀"*5}{THEME.main_fg}{g_color}{c_color}' + (f' {cpu:>4.1f} ' if cpu < 100 else f'{cpu:>5.0f} ') + end +
-				(" " if proc.num_procs > cls.select_max else ""))
+				if CONFIG.proc_tree:
+					arg_len = 0
+					offset = tree_len - len(f'{indent}{pid}')
+					if offset < 1: offset = 0
+					indent = f'{indent:.{tree_len - len(str(pid))}}'
+					if offset - len(name) > 12:
+						cmd = cmd.split(" ")[0].split("/")[-1]
+						if not cmd.startswith(name):
+							offset = len(name)
+							arg_len = tree_len - len(f'{indent}{pid} {name} ') + 2
+							cmd = f'({cmd[:(arg_len-4)]})'
+				else:
+					offset = prog_len - 1
+
+				end = f'{THEME.main_fg}{Fx.ub}' if CONFIG.proc_colors else Fx.ub
+				if CONFIG.proc_colors and not is_selected:
+					vals = []
+					for v in [int(cpu), int(mem), int(threads // 3)]:
+						if CONFIG.proc_gradient:
+							val = ((v if v <= 100 else 100) + 100) - calc * 100 // cls.select_max
+							vals += [f'{THEME.gradient["proc_color" if val < 100 else "process"][val if val < 100 else val - 100]}']
+						else:
+							vals += [f'{THEME.gradient["process"][v if v <= 100 else 100]}']
+					c_color, m_color, t_color = vals
+				else:
+					c_color = m_color = t_color = Fx.b
+				if CONFIG.proc_gradient and not is_selected:
+					g_color = f'{THEME.gradient["proc"][calc * 100 // cls.select_max]}'
+				else:
+					g_color = ""
+				if is_selected:
+					c_color = m_color = t_color = end = ""
+
+				#* Creates one line for a process with all gathered information
+				row = (f'{g_color}{indent}{pid:>{(1 if CONFIG.proc_tree else 7)}} ' +
+					f'{c_color}{name:<{offset}.{offset}} {end}' +
+					(f'{g_color}{cmd:<{arg_len}.{arg_len-1}}' if arg_len else "") +
+					t_color + (f'{threads:>4} ' if threads < 1000 else "999> ") + end +
+					g_color + (f'{username:<9.9}' if len(username) < 10 else f'{username[:8]:<8}+') +
+					m_color + ((f'{mem:>4.1f}' if mem < 100 else f'{mem:>4.0f} ') if not CONFIG.proc_mem_bytes else f'{floating_humanizer(mem_b, short=True):>4.4}') + end +
+					f' {THEME.inactive_fg}{"⡀"*5}{THEME.main_fg}{g_color}{c_color}' + (f' {cpu:>4.1f} ' if cpu < 100 else f'{cpu:>5.0f} ') + end +
+					(" " if snap.num_procs > cls.select_max else ""))
+				row_cache[row_key] = (row, c_color)
+
+			if is_selected: out += f'{THEME.selected_bg}{THEME.selected_fg}{Fx.b}'
+			out += f'{Mv.to(y+cy, x)}{row}'
 
 			#* Draw small cpu graph for process if cpu usage was above 1% in the last 10 updates
 			if pid in Graphs.pid_cpu:
-				out += f'{Mv.to(y+cy, x + w - (12 if proc.num_procs > cls.select_max else 11))}{c_color if CONFIG.proc_colors else THEME.proc_misc}{Graphs.pid_cpu[pid](None if cls.moved else round(cpu))}{THEME.main_fg}'
+				out += f'{Mv.to(y+cy, x + w - (12 if snap.num_procs > cls.select_max else 11))}{c_color if CONFIG.proc_colors else THEME.proc_misc}{Graphs.pid_cpu[pid](None if cls.moved else round(cpu))}{THEME.main_fg}'
 
-			if is_selected: out += f'{Fx.ub}{Term.fg}{Term.bg}{Mv.to(y+cy, x + w - 1)}{" " if proc.num_procs > cls.select_max else ""}'
+			if is_selected: out += f'{Fx.ub}{Term.fg}{Term.bg}{Mv.to(y+cy, x + w - 1)}{" " if snap.num_procs > cls.select_max else ""}'
 
 			cy += 1
 			if cy == h: break
 		if cy < h:
 			for i in range(h-cy):
 				out += f'{Mv.to(y+cy+i, x)}{" " * w}'
+		cls.row_cache = row_cache
 
 		#* Draw scrollbar if needed
-		if proc.num_procs > cls.select_max:
+		if snap.num_procs > cls.select_max:
 			if cls.resized:
-				Key.mouse["mouse_scroll_up"] = [[x+w-2+i, y] for i in range(3)]
-				Key.mouse["mouse_scroll_down"] = [[x+w-2+i, y+h-1] for i in range(3)]
-			scroll_pos = round(cls.start * (cls.select_max - 2) / (proc.num_procs - (cls.select_max - 2)))
+				Key.mouse_set("mouse_scroll_up", x+w-2, y, 3)
+				Key.mouse_set("mouse_scroll_down", x+w-2, y+h-1, 3)
+			scroll_pos = round(cls.start * (cls.select_max - 2) / (snap.num_procs - (cls.select_max - 2)))
 			if scroll_pos < 0 or cls.start == 1: scroll_pos = 0
-			elif scroll_pos > h - 3 or cls.start >= proc.num_procs - cls.select_max: scroll_pos = h - 3
+			elif scroll_pos > h - 3 or cls.start >= snap.num_procs - cls.select_max: scroll_pos = h - 3
 			out += (f'{Mv.to(y, x+w-1)}{Fx.b}{THEME.main_fg}↑{Mv.to(y+h-1, x+w-1)}↓{Fx.ub}'
 					f'{Mv.to(y+1+scroll_pos, x+w-1)}█')
-		elif "scroll_up" in Key.mouse:
-			del Key.mouse["scroll_up"], Key.mouse["scroll_down"]
+		elif "mouse_scroll_up" in Key.mouse:
+			Key.mouse_del("mouse_scroll_up", "mouse_scroll_down")
 
 		#* Draw current selection and number of processes
 		out += (f'{Mv.to(y+h, x + w - 3 - len(loc_string))}{THEME.proc_box}{Symbol.h_line*1}{Symbol.title_left}{THEME.title}'
@@ -2358,6 +3991,7 @@ class Collector:
 	@classmethod
 	def start(cls):
 		cls.stopping = False
+		cls.collect_run.clear()
 		cls.thread = threading.Thread(target=cls._runner, args=())
 		cls.thread.start()
 		cls.started = True
@@ -2370,6 +4004,7 @@ class Collector:
 			cls.collect_queue = []
 			cls.collect_idle.set()
 			cls.collect_done.set()
+			cls.collect_run.set()
 			try:
 				cls.thread.join()
 			except:
@@ -2378,30 +4013,51 @@ class Collector:
 	@classmethod
 	def _runner(cls):
 		'''This is meant to run in it's own thread, collecting and drawing when collect_run is set'''
-		draw_buffers: List[str] = []
 		debugged: bool = False
 		try:
 			while not cls.stopping:
 				if CONFIG.draw_clock: Box.draw_clock()
-				cls.collect_run.wait(0.1)
+				cls.collect_run.wait(Box.clock_wait())	#* Sleep until collect() or the next time the clock can change
+				if cls.stopping: break
 				if not cls.collect_run.is_set():
 					continue
-				draw_buffers = []
 				cls.collect_interrupt = False
 				cls.collect_run.clear()
 				cls.collect_idle.clear()
 				cls.collect_done.clear()
 				if DEBUG and not debugged: TimeIt.start("Collect and draw")
+				collect: bool = not cls.only_draw and not REPLAY_FILE
+				full: bool = not cls.use_draw_list
+				if full and not cls.only_draw and not cls.redraw and ((REPLAY_FILE and not Recording.advance()) or (SHARE and not Share.advance())):
+					#* Nothing new to draw, redrawing would add the last sample to graphs again
+					cls.collect_queue = []
+					collect = False
 				while cls.collect_queue:
 					collector = cls.collect_queue.pop()
-					if not cls.only_draw:
+					if collect:
+						ts = time()
 						collector._collect()
+						Stats.add(f'{collector.buffer}_collect', time() - ts)
+					ts = time()
 					collector._draw()
-					if cls.use_draw_list: draw_buffers.append(collector.buffer)
+					Stats.add(f'{collector.buffer}_draw', time() - ts)
 					if cls.collect_interrupt: break
+				if collect and full and not cls.collect_interrupt:
+					if RECORD_FILE:
+						ts = time()
+						Recording.record()
+						Stats.add("record", time() - ts)
+					History.write()
+					Rollup.collect()
+					if Share.serving:
+						ts = time()
+						Daemon.publish()
+						Stats.add("share", time() - ts)
 				if DEBUG and not debugged: TimeIt.stop("Collect and draw"); debugged = True
+				if Stats.active: Stats.sample_self()
+				Stats.draw()
 				if cls.draw_now and not Menu.active and not cls.collect_interrupt:
-					if cls.use_draw_list: Draw.out(*draw_buffers)
+					if cls.use_draw_list: Draw.out(changed=True)
 					else: Draw.out()
 				cls.collect_idle.set()
 				cls.collect_done.set()
@@ -2433,6 +4089,11 @@ class Collector:
 
 		cls.collect_run.set()
 
+	@classmethod
+	def _prime(cls):
+		'''Take a baseline for values that are calculated as a rate since the previous sample, called once at start before the first _collect'''
+		pass
+
 
 class CpuCollector(Collector):
 	'''Collects cpu usage for cpu and cores, cpu frequency, load_avg, uptime and cpu temps'''
@@ -2454,6 +4115,7 @@ class CpuCollector(Collector):
 	@classmethod
 	def get_sensors(cls):
 		'''Check if we can get cpu temps and return method of getting temps'''
+		import subprocess
 		cls.sensor_method = ""
 		if SYSTEM == "MacOS":
 			try:
@@ -2473,13 +4135,18 @@ class CpuCollector(Collector):
 								cls.sensor_method = "psutil"
 								break
 			except: pass
-		if not cls.sensor_method and SYSTEM == "Linux":
+		if not cls.sensor_method and SYSTEM == "Linux" and not ProcRoot.active and not REMOTE:
 			try:
 				if which("vcgencmd") and subprocess.check_output(["vcgencmd", "measure_temp"], text=True).strip().endswith("'C"):
 					cls.sensor_method = "vcgencmd"
 			except: pass
 		cls.got_sensors = True if cls.sensor_method else False
 
+	@classmethod
+	def _prime(cls):
+		psutil.cpu_percent(percpu=False)
+		psutil.cpu_percent(percpu=True)
+
 	@classmethod
 	def _collect(cls):
 		cls.cpu_usage[0].append(round(psutil.cpu_percent(percpu=False)))
@@ -2498,7 +4165,7 @@ class CpuCollector(Collector):
 				errlog.exception(f'{e}')
 			else:
 				pass
-		cls.load_avg = [round(lavg, 2) for lavg in os.getloadavg()]
+		cls.load_avg = [round(lavg, 2) for lavg in (ProcRoot.loadavg() if ProcRoot.active else psutil.getloadavg())]
 		cls.uptime = str(timedelta(seconds=round(time()-psutil.boot_time(),0)))[:-3]
 
 		if CONFIG.check_temp and cls.got_sensors:
@@ -2569,6 +4236,7 @@ class CpuCollector(Collector):
 					CpuBox._calc_size()
 
 		else:
+			import subprocess
 			try:
 				if cls.sensor_method == "osx-cpu-temp":
 					temp = round(float(subprocess.check_output("osx-cpu-temp", text=True).strip()[:-2]))
@@ -2625,6 +4293,37 @@ class MemCollector(Collector):
 
 	buffer: str = MemBox.buffer
 
+	@classmethod
+	def _prime(cls):
+		#* Only sets disk_hist and timestamp for disk io rates, a full collect would add a duplicate first point to memory graphs
+		try:
+			io_counters = psutil.disk_io_counters(perdisk=True if SYSTEM == "Linux" else False, nowrap=True)
+		except Exception:
+			return
+		if not io_counters: return
+		for disk in psutil.disk_partitions():
+			try:
+				disk_io = cls._disk_io(disk, io_counters)
+			except:
+				continue
+			cls.disk_hist[disk.device] = (disk_io.read_bytes, disk_io.write_bytes)
+		cls.timestamp = time()
+
+	@staticmethod
+	def _disk_io(disk, io_counters) -> Any:
+		'''Returns io counters for partition disk, raises if not found'''
+		if SYSTEM == "Linux":
+			dev_name = os.path.realpath(disk.device).rsplit('/', 1)[-1]
+			if dev_name.startswith("md"):
+				try:
+					dev_name = dev_name[:dev_name.index("p")]
+				except:
+					pass
+			return io_counters[dev_name]
+		elif disk.mountpoint == "/":
+			return io_counters
+		raise Exception
+
 	@classmethod
 	def _collect(cls):
 		#* Collect memory
@@ -2635,15 +4334,7 @@ class MemCollector(Collector):
 			cls.values["cached"] = mem.active
 		cls.values["total"], cls.values["free"], cls.values["available"] = mem.total, mem.free, mem.available
 		cls.values["used"] = cls.values["total"] - cls.values["available"]
-
-		for key, value in cls.values.items():
-			cls.string[key] = floating_humanizer(value)
-			if key == "total": continue
-			cls.percent[key] = round(value * 100 / cls.values["total"])
-			if CONFIG.mem_graphs:
-				if not key in cls.vlist: cls.vlist[key] = []
-				cls.vlist[key].append(cls.percent[key])
-				if len(cls.vlist[key]) > MemBox.width: del cls.vlist[key][0]
+		cls._calc_values(cls.values, cls.string, cls.percent, cls.vlist)
 
 		#* Collect swap
 		if CONFIG.show_swap or CONFIG.swap_disk:
@@ -2655,14 +4346,7 @@ class MemCollector(Collector):
 				if not MemBox.swap_on:
 					MemBox.redraw = True
 				MemBox.swap_on = True
-				for key, value in cls.swap_values.items():
-					cls.swap_string[key] = floating_humanizer(value)
-					if key == "total": continue
-					cls.swap_percent[key] = round(value * 100 / cls.swap_values["total"])
-					if CONFIG.mem_graphs:
-						if not key in cls.swap_vlist: cls.swap_vlist[key] = []
-						cls.swap_vlist[key].append(cls.swap_percent[key])
-						if len(cls.swap_vlist[key]) > MemBox.width: del cls.swap_vlist[key][0]
+				cls._calc_values(cls.swap_values, cls.swap_string, cls.swap_percent, cls.swap_vlist)
 			else:
 				if MemBox.swap_on:
 					MemBox.redraw = True
@@ -2677,14 +4361,13 @@ class MemCollector(Collector):
 		#* Collect disks usage
 		disk_read: int = 0
 		disk_write: int = 0
-		dev_name: str
 		disk_name: str
 		filtering: Tuple = ()
 		filter_exclude: bool = False
 		io_string: str
 		u_percent: int
 		disk_list: List[str] = []
-		cls.disks = {}
+		disks: Dict[str, Dict] = {}
 
 		if CONFIG.disks_filter:
 			if CONFIG.disks_filter.startswith("exclude="):
@@ -2720,31 +4403,20 @@ class MemCollector(Collector):
 			try:
 				disk_u = psutil.disk_usage(disk.mountpoint)
 			except:
-				pass
+				disk_u = None
 
-			u_percent = round(disk_u.percent)
-			cls.disks[disk.device] = {}
-			cls.disks[disk.device]["name"] = disk_name
-			cls.disks[disk.device]["used_percent"] = u_percent
-			cls.disks[disk.device]["free_percent"] = 100 - u_percent
+			u_percent = round(getattr(disk_u, "percent", 0))
+			disks[disk.device] = {}
+			disks[disk.device]["name"] = disk_name
+			disks[disk.device]["used_percent"] = u_percent
+			disks[disk.device]["free_percent"] = 100 - u_percent
 			for name in ["total", "used", "free"]:
-				cls.disks[disk.device][name] = floating_humanizer(getattr(disk_u, name, 0))
+				disks[disk.device][name] = floating_humanizer(getattr(disk_u, name, 0))
 
 			#* Collect disk io
 			if io_counters:
 				try:
-					if SYSTEM == "Linux":
-						dev_name = os.path.realpath(disk.device).rsplit('/', 1)[-1]
-						if dev_name.startswith("md"):
-							try:
-								dev_name = dev_name[:dev_name.index("p")]
-							except:
-								pass
-						disk_io = io_counters[dev_name]
-					elif disk.mountpoint == "/":
-						disk_io = io_counters
-					else:
-						raise Exception
+					disk_io = cls._disk_io(disk, io_counters)
 					disk_read = round((disk_io.read_bytes - cls.disk_hist[disk.device][0]) / (time() - cls.timestamp))
 					disk_write = round((disk_io.write_bytes - cls.disk_hist[disk.device][1]) / (time() - cls.timestamp))
 				except:
@@ -2762,24 +4434,25 @@ class MemCollector(Collector):
 				elif disk_read + disk_write > 0:
 					io_string += f'▼▲{floating_humanizer(disk_read + disk_write, short=True)}'
 
-			cls.disks[disk.device]["io"] = io_string
+			disks[disk.device]["io"] = io_string
 
 		if CONFIG.swap_disk and MemBox.swap_on:
-			cls.disks["__swap"] = {}
-			cls.disks["__swap"]["name"] = "swap"
-			cls.disks["__swap"]["used_percent"] = cls.swap_percent["used"]
-			cls.disks["__swap"]["free_percent"] = cls.swap_percent["free"]
+			disks["__swap"] = {}
+			disks["__swap"]["name"] = "swap"
+			disks["__swap"]["used_percent"] = cls.swap_percent["used"]
+			disks["__swap"]["free_percent"] = cls.swap_percent["free"]
 			for name in ["total", "used", "free"]:
-				cls.disks["__swap"][name] = cls.swap_string[name]
-			cls.disks["__swap"]["io"] = ""
-			if len(cls.disks) > 2:
+				disks["__swap"][name] = cls.swap_string[name]
+			disks["__swap"]["io"] = ""
+			if len(disks) > 2:
 				try:
-					new = { list(cls.disks)[0] : cls.disks.pop(list(cls.disks)[0])}
-					new["__swap"] = cls.disks.pop("__swap")
-					new.update(cls.disks)
-					cls.disks = new
+					new = { list(disks)[0] : disks.pop(list(disks)[0])}
+					new["__swap"] = disks.pop("__swap")
+					new.update(disks)
+					disks = new
 				except:
 					pass
+		cls.disks = disks	#* Swapped in when complete, boxes and exports never see a half filled dict
 
 		if disk_list != cls.old_disks:
 			MemBox.redraw = True
@@ -2787,6 +4460,18 @@ class MemCollector(Collector):
 
 		cls.timestamp = time()
 
+	@staticmethod
+	def _calc_values(values: Dict[str, int], string: Dict[str, str], percent: Dict[str, int], vlist: Dict[str, List[int]]):
+		'''Set strings, percentages of total and graph values from memory or swap values'''
+		for key, value in values.items():
+			string[key] = floating_humanizer(value)
+			if key == "total": continue
+			percent[key] = round(value * 100 / values["total"])
+			if CONFIG.mem_graphs:
+				if not key in vlist: vlist[key] = []
+				vlist[key].append(percent[key])
+				if len(vlist[key]) > MemBox.width: del vlist[key][0]
+
 	@classmethod
 	def _draw(cls):
 		MemBox._draw_fg()
@@ -2842,6 +4527,13 @@ class NetCollector(Collector):
 		cls.switched = True
 		Collector.collect(NetCollector, redraw=True)
 
+	@classmethod
+	def _prime(cls):
+		#* Sets last totals and timestamp, the zero speed from the baseline is removed again
+		cls._collect()
+		for stat in cls.stats.get(cls.nic, {}).values():
+			if stat["speed"]: del stat["speed"][-1]
+
 	@classmethod
 	def _collect(cls):
 		speed: int
@@ -2867,6 +4559,8 @@ class NetCollector(Collector):
 				cls.stats[cls.nic][direction] = { "total" : value, "last" : value, "top" : 0, "graph_top" : 0, "offset" : 0, "speed" : [], "redraw" : True, "graph_raise" : 0, "graph_lower" : 7 }
 				for v in ["total", "byte_ps", "bit_ps", "top", "graph_top"]:
 					cls.strings[cls.nic][direction][v] = ""
+			for direction, speed in zip(["download", "upload"], History.restore_net(cls.nic)):
+				cls.stats[cls.nic][direction]["speed"] = speed
 
 		cls.stats[cls.nic]["download"]["total"] = io_all.bytes_recv
 		cls.stats[cls.nic]["upload"]["total"] = io_all.bytes_sent
@@ -2938,11 +4632,29 @@ class NetCollector(Collector):
 
 
 class ProcCollector(Collector):
-	'''Collects process stats'''
+	'''Collects process stats, the finished process list is published as a read only ProcCollector.Snapshot in ProcCollector.snapshot
+	* Only the process list is published this way, cpu, memory and network values are updated in place and read by the collecting thread only,
+	  Daemon.publish() and Recording.record() runs there and other threads only gets their serialized output
+	'''
+	class Row(NamedTuple):
+		name: str
+		cmd: str
+		threads: int
+		username: str
+		mem: float
+		mem_b: int
+		cpu: float
+		indent: str = ""
+		depth: int = 0
+
+	class Snapshot(NamedTuple):
+		processes: Mapping[int, "ProcCollector.Row"]
+		num_procs: int
+		timestamp: float
+
 	buffer: str = ProcBox.buffer
 	search_filter: str = ""
-	processes: Dict = {}
-	num_procs: int = 0
+	snapshot: Snapshot = Snapshot(MappingProxyType({}), 0, 0.0)
 	det_cpu: float = 0.0
 	detailed: bool = False
 	detailed_pid: Union[int, None] = None
@@ -2954,14 +4666,42 @@ class ProcCollector(Collector):
 	tree_counter: int = 0
 	p_values: List[str] = ["pid", "name", "cmdline", "num_threads", "username", "memory_percent", "cpu_percent", "cpu_times", "create_time"]
 	sort_expr: Dict = {}
-	sort_expr["pid"] = compile("p.info['pid']", "str", "eval")
-	sort_expr["program"] = compile("'' if p.info['name'] == 0.0 else p.info['name']", "str", "eval")
-	sort_expr["arguments"] = compile("' '.join(str(p.info['cmdline'])) or ('' if p.info['name'] == 0.0 else p.info['name'])", "str", "eval")
-	sort_expr["threads"] = compile("0 if p.info['num_threads'] == 0.0 else p.info['num_threads']", "str", "eval")
-	sort_expr["user"] = compile("'' if p.info['username'] == 0.0 else p.info['username']", "str", "eval")
-	sort_expr["memory"] = compile("p.info['memory_percent']", "str", "eval")
-	sort_expr["cpu lazy"] = compile("(sum(p.info['cpu_times'][:2] if not p.info['cpu_times'] == 0.0 else [0.0, 0.0]) * 1000 / (time() - p.info['create_time']))", "str", "eval")
-	sort_expr["cpu responsive"] = compile("(p.info['cpu_percent'] if CONFIG.proc_per_core else (p.info['cpu_percent'] / THREADS))", "str", "eval")
+	sort_expr["pid"] = compile("p['pid']", "str", "eval")
+	sort_expr["program"] = compile("'' if p['name'] == 0.0 else p['name']", "str", "eval")
+	sort_expr["arguments"] = compile("' '.join(str(p['cmdline'])) or ('' if p['name'] == 0.0 else p['name'])", "str", "eval")
+	sort_expr["threads"] = compile("0 if p['num_threads'] == 0.0 else p['num_threads']", "str", "eval")
+	sort_expr["user"] = compile("'' if p['username'] == 0.0 else p['username']", "str", "eval")
+	sort_expr["memory"] = compile("p['memory_percent']", "str", "eval")
+	sort_expr["cpu lazy"] = compile("(sum(p['cpu_times'][:2] if not p['cpu_times'] == 0.0 else [0.0, 0.0]) * 1000 / (time() - p['create_time']))", "str", "eval")
+	sort_expr["cpu responsive"] = compile("(p['cpu_percent'] if CONFIG.proc_per_core else (p['cpu_percent'] / THREADS))", "str", "eval")
+	scan_iter: Any = None		#* Process iterator of the scan in progress, kept when interrupted and resumed by the next collect
+	scan: List[Dict] = []		#* Process infos gathered by the scan in progress
+	infos: List[Dict] = []		#* Process infos of the last complete scan, the process list is built from these
+	scan_slice: int = 64		#* Number of processes scanned between checks for interrupts
+
+	@classmethod
+	def _prime(cls):
+		#* psutil.process_iter() keeps the Process instances, so the next call gets cpu percent since this one
+		for _ in psutil.process_iter(["cpu_percent"]): pass
+
+	@classmethod
+	def _scan(cls) -> bool:
+		'''Continue scanning processes, returns False if interrupted before done, the next call then resumes where it stopped'''
+		if cls.scan_iter is None:
+			#* memory_info is always fetched, a scan or the infos of the last one can outlive a toggle of proc_mem_bytes
+			cls.scan_iter = psutil.process_iter(cls.p_values + ["ppid", "memory_info"], 0.0)
+			cls.scan = []
+		for p in cls.scan_iter:
+			if not "ppid" in p.info:
+				try:
+					p.info["ppid"] = p.ppid()
+				except psutil.Error:
+					p.info["ppid"] = 0.0
+			cls.scan.append(p.info)
+			if len(cls.scan) % cls.scan_slice == 0 and (cls.collect_interrupt or cls.proc_interrupt):
+				return False
+		cls.infos, cls.scan, cls.scan_iter = cls.scan, [], None
+		return True
 
 	@classmethod
 	def _collect(cls):
@@ -2980,24 +4720,28 @@ class ProcCollector(Collector):
 
 		sort_cmd = cls.sort_expr[sorting]
 
+		#* Changes from the ui rebuilds the list from the last complete scan, a full collect continues the scan in progress
+		if not (cls.use_draw_list and cls.infos) and not cls._scan():
+			return
+
 		if CONFIG.proc_tree:
 			cls._tree(sort_cmd=sort_cmd, reverse=reverse, proc_per_cpu=proc_per_cpu, search=search)
 		else:
-			for p in sorted(psutil.process_iter(cls.p_values + (["memory_info"] if CONFIG.proc_mem_bytes else []), err), key=lambda p: eval(sort_cmd), reverse=reverse):
+			for p in sorted(cls.infos, key=lambda p: eval(sort_cmd), reverse=reverse):
 				if cls.collect_interrupt or cls.proc_interrupt:
 					return
-				if p.info["name"] == "idle" or p.info["name"] == err or p.info["pid"] == err:
+				if p["name"] == "idle" or p["name"] == err or p["pid"] == err:
 					continue
-				if p.info["cmdline"] == err:
-					p.info["cmdline"] = ""
-				if p.info["username"] == err:
-					p.info["username"] = ""
-				if p.info["num_threads"] == err:
-					p.info["num_threads"] = 0
+				if p["cmdline"] == err:
+					p["cmdline"] = ""
+				if p["username"] == err:
+					p["username"] = ""
+				if p["num_threads"] == err:
+					p["num_threads"] = 0
 				if search:
-					if cls.detailed and p.info["pid"] == cls.detailed_pid:
-						cls.det_cpu = p.info["cpu_percent"]
-					for value in [ p.info["name"], " ".join(p.info["cmdline"]), str(p.info["pid"]), p.info["username"] ]:
+					if cls.detailed and p["pid"] == cls.detailed_pid:
+						cls.det_cpu = p["cpu_percent"]
+					for value in [ p["name"], " ".join(p["cmdline"]), str(p["pid"]), p["username"] ]:
 						for s in search.split(","):
 							if s.strip() in value:
 								break
@@ -3005,28 +4749,20 @@ class ProcCollector(Collector):
 						break
 					else: continue
 
-				cpu = p.info["cpu_percent"] if proc_per_cpu else round(p.info["cpu_percent"] / THREADS, 2)
-				mem = p.info["memory_percent"]
-				if CONFIG.proc_mem_bytes and hasattr(p.info["memory_info"], "rss"):
-					mem_b = p.info["memory_info"].rss
+				cpu = p["cpu_percent"] if proc_per_cpu else round(p["cpu_percent"] / THREADS, 2)
+				mem = p["memory_percent"]
+				if CONFIG.proc_mem_bytes and hasattr(p.get("memory_info"), "rss"):
+					mem_b = p["memory_info"].rss
 				else:
 					mem_b = 0
 
-				cmd = " ".join(p.info["cmdline"]) or "[" + p.info["name"] + "]"
+				cmd = " ".join(p["cmdline"]) or "[" + p["name"] + "]"
 
-				out[p.info["pid"]] = {
-					"name" : p.info["name"],
-					"cmd" : cmd,
-					"threads" : p.info["num_threads"],
-					"username" : p.info["username"],
-					"mem" : mem,
-					"mem_b" : mem_b,
-					"cpu" : cpu }
+				out[p["pid"]] = cls.Row(p["name"], cmd, p["num_threads"], p["username"], mem, mem_b, cpu)
 
 				n += 1
 
-			cls.num_procs = n
-			cls.processes = out.copy()
+			cls.snapshot = cls.Snapshot(MappingProxyType(out), n, time())
 
 		if cls.detailed:
 			cls.expand = ((ProcBox.width - 2) - ((ProcBox.width - 2) // 3) - 40) // 10
@@ -3046,20 +4782,21 @@ class ProcCollector(Collector):
 					attrs.extend(["nice", "terminal"])
 					if not SYSTEM == "MacOS": attrs.extend(["io_counters"])
 
-				if not c_pid in cls.processes: attrs.extend(["pid", "name", "cmdline", "num_threads", "username", "memory_percent"])
+				row: Optional[ProcCollector.Row] = cls.snapshot.processes.get(c_pid)
+				if not row: attrs.extend(["pid", "name", "cmdline", "num_threads", "username", "memory_percent"])
 
 				cls.details = det.as_dict(attrs=attrs, ad_value="")
 				if det.parent() != None: cls.details["parent_name"] = det.parent().name()
 				else: cls.details["parent_name"] = ""
 
 				cls.details["pid"] = c_pid
-				if c_pid in cls.processes:
-					cls.details["name"] = cls.processes[c_pid]["name"]
-					cls.details["cmdline"] = cls.processes[c_pid]["cmd"]
-					cls.details["threads"] = f'{cls.processes[c_pid]["threads"]}'
-					cls.details["username"] = cls.processes[c_pid]["username"]
-					cls.details["memory_percent"] = cls.processes[c_pid]["mem"]
-					cls.details["cpu_percent"] = round(cls.processes[c_pid]["cpu"] * (1 if CONFIG.proc_per_core else THREADS))
+				if row:
+					cls.details["name"] = row.name
+					cls.details["cmdline"] = row.cmd
+					cls.details["threads"] = f'{row.threads}'
+					cls.details["username"] = row.username
+					cls.details["memory_percent"] = row.mem
+					cls.details["cpu_percent"] = round(row.cpu * (1 if CONFIG.proc_per_core else THREADS))
 				else:
 					cls.details["cmdline"] = " ".join(cls.details["cmdline"]) or "[" + cls.details["name"] + "]"
 					cls.details["threads"] = f'{cls.details["num_threads"]}'
@@ -3120,15 +4857,12 @@ class ProcCollector(Collector):
 		cls.tree_counter += 1
 		tree = defaultdict(list)
 		n: int = 0
-		for p in sorted(psutil.process_iter(cls.p_values + (["memory_info"] if CONFIG.proc_mem_bytes else []), err), key=lambda p: eval(sort_cmd), reverse=reverse):
+		for p in sorted(cls.infos, key=lambda p: eval(sort_cmd), reverse=reverse):
 			if cls.collect_interrupt: return
-			try:
-				tree[p.ppid()].append(p.pid)
-			except (psutil.NoSuchProcess, psutil.ZombieProcess):
-				pass
-			else:
-				infolist[p.pid] = p.info
-				n += 1
+			if isinstance(p["ppid"], float): continue	#* Process gone or ppid not readable
+			tree[p["ppid"]].append(p["pid"])
+			infolist[p["pid"]] = p
+			n += 1
 		if 0 in tree and 0 in tree[0]:
 			tree[0].remove(0)
 
@@ -3138,13 +4872,17 @@ class ProcCollector(Collector):
 			cont: bool = True
 			getinfo: Dict = {}
 			if cls.collect_interrupt: return
-			try:
-				name = psutil.Process(pid).name()
+			if pid in infolist and isinstance(infolist[pid]["name"], str):
+				name = infolist[pid]["name"]
 				if name == "idle": return
-			except psutil.Error:
-				pass
-				cont = False
-				name = ""
+			else:
+				try:
+					name = psutil.Process(pid).name()
+					if name == "idle": return
+				except psutil.Error:
+					pass
+					cont = False
+					name = ""
 			if pid in infolist:
 				getinfo = infolist[pid]
 
@@ -3171,7 +4909,7 @@ class ProcCollector(Collector):
 					mem = getinfo["memory_percent"]
 					if getinfo["cmdline"] == err: cmd = ""
 					else: cmd = " ".join(getinfo["cmdline"]) or "[" + getinfo["name"] + "]"
-					if CONFIG.proc_mem_bytes and hasattr(getinfo["memory_info"], "rss"):
+					if CONFIG.proc_mem_bytes and hasattr(getinfo.get("memory_info"), "rss"):
 						mem_b = getinfo["memory_info"].rss
 					else:
 						mem_b = 0
@@ -3187,27 +4925,15 @@ class ProcCollector(Collector):
 					cls.collapsed[pid] = collapse
 
 				if collapse_to and not search:
-					out[collapse_to]["threads"] += threads
-					out[collapse_to]["mem"] += mem
-					out[collapse_to]["mem_b"] += mem_b
-					out[collapse_to]["cpu"] += cpu
+					row = out[collapse_to]
+					out[collapse_to] = row._replace(threads=row.threads + threads, mem=row.mem + mem, mem_b=row.mem_b + mem_b, cpu=row.cpu + cpu)
 				else:
 					if pid in tree and len(tree[pid]) > 0:
 						if collapse:
 							inindent = inindent.replace(" ├─ ", "[+]─").replace(" └─ ", "[+]─")
 						else:
 							inindent = inindent.replace(" ├─ ", "[-]─").replace(" └─ ", "[-]─")
-					out[pid] = {
-						"indent" : inindent,
-						"name": name,
-						"cmd" : cmd,
-						"threads" : threads,
-						"username" : username,
-						"mem" : mem,
-						"mem_b" : mem_b,
-						"cpu" : cpu,
-						"depth" : depth,
-						}
+					out[pid] = cls.Row(name, cmd, threads, username, mem, mem_b, cpu, inindent, depth)
 
 			if search: collapse = False
 			elif collapse and not collapse_to:
@@ -3230,8 +4956,7 @@ class ProcCollector(Collector):
 			for pid in list(cls.collapsed):
 				if not psutil.pid_exists(pid):
 					del cls.collapsed[pid]
-		cls.num_procs = len(out)
-		cls.processes = out.copy()
+		cls.snapshot = cls.Snapshot(MappingProxyType(out), len(out), time())
 
 	@classmethod
 	def sorting(cls, key: str):
@@ -3239,7 +4964,7 @@ class ProcCollector(Collector):
 		if index >= len(CONFIG.sorting_options): index = 0
 		elif index < 0: index = len(CONFIG.sorting_options) - 1
 		CONFIG.proc_sorting = CONFIG.sorting_options[index]
-		if "left" in Key.mouse: del Key.mouse["left"]
+		Key.mouse_del("left")
 		Collector.collect(ProcCollector, interrupt=True, redraw=True)
 
 	@classmethod
@@ -3279,7 +5004,7 @@ class Menu:
 		menu_names: List[str] = list(cls.menus.keys())
 		menu_index: int = 0
 		menu_current: str = menu_names[0]
-		cls.background = f'{THEME.inactive_fg}' + Fx.uncolor(f'{Draw.saved_buffer()}') + f'{Term.fg}'
+		cls.background = f'{THEME.inactive_fg}{Draw.saved_buffer(uncolored=True)}{Term.fg}'
 
 		while not cls.close:
 			key = ""
@@ -3305,7 +5030,7 @@ class Menu:
 			if skip and redraw:
 				Draw.now(out)
 			elif not skip:
-				Draw.now(f'{cls.background}{banner}{out}')
+				Draw.now(f'{cls.background}{banner}{out}', full=True)
 			skip = redraw = False
 
 			if Key.input_wait(Timer.left(), mouse=True):
@@ -3357,11 +5082,11 @@ class Menu:
 			else:
 				Collector.collect()
 				Collector.collect_done.wait(1)
-				if CONFIG.background_update: cls.background = f'{THEME.inactive_fg}' + Fx.uncolor(f'{Draw.saved_buffer()}') + f'{Term.fg}'
+				if CONFIG.background_update: cls.background = f'{THEME.inactive_fg}{Draw.saved_buffer(uncolored=True)}{Term.fg}'
 				Timer.stamp()
 
 
-		Draw.now(f'{Draw.saved_buffer()}')
+		Draw.now(f'{Draw.saved_buffer()}', full=True)
 		cls.background = ""
 		cls.active = False
 		cls.close = False
@@ -3377,7 +5102,7 @@ class Menu:
 		cls.active = True
 		cls.resized = True
 		if not cls.background:
-			cls.background = f'{THEME.inactive_fg}' + Fx.uncolor(f'{Draw.saved_buffer()}') + f'{Term.fg}'
+			cls.background = f'{THEME.inactive_fg}{Draw.saved_buffer(uncolored=True)}{Term.fg}'
 		help_items: Dict[str, str] = {
 			"(Mouse 1)" : "Clicks buttons and selects in process list.",
 			"Selected (Mouse 1)" : "Show detailed information for selected process.",
@@ -3402,6 +5127,10 @@ class Menu:
 			"(c)" : "Toggle per-core cpu usage of processes.",
 			"(r)" : "Reverse sorting order in processes box.",
 			"(e)" : "Toggle processes tree view",
+			"(p)" : "Toggle performance stats overlay.",
+			"(v)" : "Cycle time range of cpu, memory and net graphs.",
+			"([) (])" : "Seek 1 minute back/forward in replay.",
+			"(<) (>)" : "Decrease/increase replay speed, lowest pauses.",
 			"(delete)" : "Clear any entered filter.",
 			"Selected (T, t)" : "Terminate selected process with SIGTERM - 15.",
 			"Selected (K, k)" : "Kill selected process with SIGKILL - 9.",
@@ -3448,7 +5177,7 @@ class Menu:
 			if skip and redraw:
 				Draw.now(out)
 			elif not skip:
-				Draw.now(f'{cls.background}{out_misc}{out}')
+				Draw.now(f'{cls.background}{out_misc}{out}', full=True)
 			skip = redraw = False
 
 			if Key.input_wait(Timer.left()):
@@ -3483,13 +5212,13 @@ class Menu:
 			else:
 				Collector.collect()
 				Collector.collect_done.wait(1)
-				if CONFIG.background_update: cls.background = f'{THEME.inactive_fg}' + Fx.uncolor(f'{Draw.saved_buffer()}') + f'{Term.fg}'
+				if CONFIG.background_update: cls.background = f'{THEME.inactive_fg}{Draw.saved_buffer(uncolored=True)}{Term.fg}'
 				Timer.stamp()
 
 		if main_active:
 			cls.close = False
 			return
-		Draw.now(f'{Draw.saved_buffer()}')
+		Draw.now(f'{Draw.saved_buffer()}', full=True)
 		cls.background = ""
 		cls.active = False
 		cls.close = False
@@ -3509,7 +5238,7 @@ class Menu:
 		input_val: str = ""
 		Theme.refresh()
 		if not cls.background:
-			cls.background = f'{THEME.inactive_fg}' + Fx.uncolor(f'{Draw.saved_buffer()}') + f'{Term.fg}'
+			cls.background = f'{THEME.inactive_fg}{Draw.saved_buffer(uncolored=True)}{Term.fg}'
 		option_items: Dict[str, List[str]] = {
 			"color_theme" : [
 				'Set color theme.',
@@ -3605,6 +5334,26 @@ class Menu:
 				'Custom cpu model name in cpu percentage box.',
 				'',
 				'Empty string to disable.'],
+			"cpu_layout" : [
+				'Layout of the per core list in cpu box.',
+				'',
+				'"heatmap" shows one colored cell per',
+				'thread, two per cell stacked if needed.',
+				'',
+				'"auto" switches to heatmap when all',
+				'threads doesn\'t fit in the list.',
+				'',
+				'Possible values: "auto", "list", "heatmap".'],
+			"cpu_grouping" : [
+				'Aggregated usage rows in cpu heatmap.',
+				'',
+				'Shows average usage per cpu socket, numa',
+				'node or ccx (cpus sharing a L3 cache).',
+				'',
+				'Only available on Linux.',
+				'',
+				'Possible values: "none", "socket", "numa"',
+				'and "ccx".'],
 			"disks_filter" : [
 				'Optional filter for shown disks.',
 				'',
@@ -3677,11 +5426,30 @@ class Menu:
 				'',
 				'The init screen is purely cosmetical and',
 				'slows down start to show status messages.'],
+			"persistent_history" : [
+				'Keep graph history between restarts.',
+				'',
+				'Saves cpu, memory and network graph values',
+				'to memory mapped files in the config',
+				'folder, graphs starts filled with up to',
+				'the last hour of history after a restart.',
+				'',
+				'True or False.'],
 			"update_check" : [
 				'Check for updates at start.',
 				'',
 				'Checks for latest version from:',
 				'https://github.com/aristocratos/bpytop'],
+			"sync_output" : [
+				'Synchronized output mode.',
+				'',
+				'Wraps each frame in synchronized output to',
+				'prevent tearing and half drawn boxes.',
+				'',
+				'"auto" asks the terminal at start if',
+				'supported, "on" and "off" overrides.',
+				'',
+				'Possible values: "auto", "on" and "off".'],
 			"log_level" : [
 				'Set loglevel for error.log',
 				'',
@@ -3692,6 +5460,9 @@ class Menu:
 		option_len: int = len(option_items) * 2
 		sorting_i: int = CONFIG.sorting_options.index(CONFIG.proc_sorting)
 		loglevel_i: int = CONFIG.log_levels.index(CONFIG.log_level)
+		sync_i: int = CONFIG.sync_options.index(CONFIG.sync_output)
+		layout_i: int = CONFIG.cpu_layouts.index(CONFIG.cpu_layout)
+		grouping_i: int = CONFIG.cpu_groupings.index(CONFIG.cpu_grouping)
 		color_i: int
 		while not cls.close:
 			key = ""
@@ -3736,11 +5507,17 @@ class Menu:
 						counter = f' {sorting_i + 1}/{len(CONFIG.sorting_options)}'
 					elif opt == "log_level":
 						counter = f' {loglevel_i + 1}/{len(CONFIG.log_levels)}'
+					elif opt == "sync_output":
+						counter = f' {sync_i + 1}/{len(CONFIG.sync_options)}'
+					elif opt == "cpu_layout":
+						counter = f' {layout_i + 1}/{len(CONFIG.cpu_layouts)}'
+					elif opt == "cpu_grouping":
+						counter = f' {grouping_i + 1}/{len(CONFIG.cpu_groupings)}'
 					else:
 						counter = ""
 					out += f'{Mv.to(y+1+cy, x+1)}{t_color}{Fx.b}{opt.replace("_", " ").capitalize() + counter:^24.24}{Fx.ub}{Mv.to(y+2+cy, x+1)}{v_color}'
 					if opt == selected:
-						if isinstance(value, bool) or opt in ["color_theme", "proc_sorting", "log_level"]:
+						if isinstance(value, bool) or opt in ["color_theme", "proc_sorting", "log_level", "sync_output", "cpu_layout", "cpu_grouping"]:
 							out += f'{t_color} {Symbol.left}{v_color}{d_quote + str(value) + d_quote:^20.20}{t_color}{Symbol.right} '
 						elif inputting:
 							out += f'{str(input_val)[-17:] + Fx.bl + "█" + Fx.ubl + "" + Symbol.enter:^33.33}'
@@ -3765,7 +5542,7 @@ class Menu:
 
 
 			if not skip or redraw:
-				Draw.now(f'{cls.background}{out_misc}{out}')
+				Draw.now(f'{cls.background}{out_misc}{out}', full=True)
 			skip = redraw = False
 
 			if Key.input_wait(Timer.left()):
@@ -3872,6 +5649,35 @@ class Menu:
 					CONFIG.log_level = CONFIG.log_levels[loglevel_i]
 					errlog.setLevel(getattr(logging, CONFIG.log_level))
 					errlog.info(f'Loglevel set to {CONFIG.log_level}')
+				elif key in ["left", "right"] and selected == "sync_output":
+					if key == "left":
+						sync_i -= 1
+						if sync_i < 0: sync_i = len(CONFIG.sync_options) - 1
+					elif key == "right":
+						sync_i += 1
+						if sync_i > len(CONFIG.sync_options) - 1: sync_i = 0
+					CONFIG.sync_output = CONFIG.sync_options[sync_i]
+					Term.set_sync()
+				elif key in ["left", "right"] and selected == "cpu_layout":
+					if key == "left":
+						layout_i -= 1
+						if layout_i < 0: layout_i = len(CONFIG.cpu_layouts) - 1
+					elif key == "right":
+						layout_i += 1
+						if layout_i > len(CONFIG.cpu_layouts) - 1: layout_i = 0
+					CONFIG.cpu_layout = CONFIG.cpu_layouts[layout_i]
+					Term.refresh(force=True)
+					cls.resized = False
+				elif key in ["left", "right"] and selected == "cpu_grouping":
+					if key == "left":
+						grouping_i -= 1
+						if grouping_i < 0: grouping_i = len(CONFIG.cpu_groupings) - 1
+					elif key == "right":
+						grouping_i += 1
+						if grouping_i > len(CONFIG.cpu_groupings) - 1: grouping_i = 0
+					CONFIG.cpu_grouping = CONFIG.cpu_groupings[grouping_i]
+					Term.refresh(force=True)
+					cls.resized = False
 				elif key == "up":
 					selected_int -= 1
 					if selected_int < 0: selected_int = len(option_items) - 1
@@ -3898,13 +5704,13 @@ class Menu:
 			else:
 				Collector.collect()
 				Collector.collect_done.wait(1)
-				if CONFIG.background_update: cls.background = f'{THEME.inactive_fg}' + Fx.uncolor(f'{Draw.saved_buffer()}') + f'{Term.fg}'
+				if CONFIG.background_update: cls.background = f'{THEME.inactive_fg}{Draw.saved_buffer(uncolored=True)}{Term.fg}'
 				Timer.stamp()
 
 		if main_active:
 			cls.close = False
 			return
-		Draw.now(f'{Draw.saved_buffer()}')
+		Draw.now(f'{Draw.saved_buffer()}', full=True)
 		cls.background = ""
 		cls.active = False
 		cls.close = False
@@ -3948,6 +5754,7 @@ class UpdateChecker:
 
 	@classmethod
 	def _checker(cls):
+		import urllib.request, subprocess
 		try:
 			with urllib.request.urlopen("https://github.com/aristocratos/bpytop/raw/master/bpytop.py", timeout=5) as source: # type: ignore
 				for line in source:
@@ -3976,7 +5783,6 @@ def get_cpu_name() -> str:
 	cmd_out: str = ""
 	rem_line: str = ""
 	if SYSTEM == "Linux":
-		command = "cat /proc/cpuinfo"
 		rem_line = "model name"
 	elif SYSTEM == "MacOS":
 		command ="sysctl -n machdep.cpu.brand_string"
@@ -3985,7 +5791,12 @@ def get_cpu_name() -> str:
 		rem_line = "hw.model"
 
 	try:
-		cmd_out = subprocess.check_output("LANG=C " + command, shell=True, universal_newlines=True)
+		if ProcRoot.active: cmd_out = ProcRoot.read("/proc/cpuinfo")
+		elif SYSTEM == "Linux":
+			with open("/proc/cpuinfo", "r", errors="replace") as f: cmd_out = f.read()
+		else:
+			import subprocess
+			cmd_out = subprocess.check_output("LANG=C " + command, shell=True, universal_newlines=True)
 	except:
 		pass
 	if rem_line:
@@ -4004,9 +5815,35 @@ def get_cpu_name() -> str:
 
 	return name
 
+@lru_cache(maxsize=None)
+def get_cpu_groups(kind: str) -> Tuple[Tuple[str, Tuple[int, ...]], ...]:
+	'''Group logical cpus by "socket", "numa" node or "ccx" (cpus sharing a L3 cache) from sysfs, returns an empty tuple if only one group is found'''
+	if SYSTEM != "Linux" or REPLAY_FILE or REMOTE or kind not in ["socket", "numa", "ccx"]: return ()
+	groups: Dict[int, List[int]] = {}
+	cpu_path: str = f'{PROC_ROOT}/sys/devices/system/cpu'
+	node_path: str = f'{PROC_ROOT}/sys/devices/system/node'
+	try:
+		if kind == "numa":
+			for node in sorted(int(d[4:]) for d in os.listdir(node_path) if d.startswith("node") and d[4:].isdigit()):
+				with open(f'{node_path}/node{node}/cpulist', "r") as f:
+					for part in f.read().strip().split(","):
+						if not part: continue
+						start, _, end = part.partition("-")
+						groups[node] = groups.get(node, []) + list(range(int(start), int(end or start) + 1))
+		else:
+			for n in range(THREADS):
+				with open(f'{cpu_path}/cpu{n}/topology/physical_package_id' if kind == "socket" else f'{cpu_path}/cpu{n}/cache/index3/id', "r") as f:
+					groups.setdefault(int(f.read().strip()), []).append(n)
+	except Exception as e:
+		errlog.debug(f'Unable to read cpu {kind} topology: {e}')
+		return ()
+	cpu_groups: List[Tuple[int, ...]] = [cpus for cpus in (tuple(n for n in groups[g] if n < THREADS) for g in sorted(groups)) if cpus]
+	if len(cpu_groups) < 2: return ()
+	prefix: str = {"socket" : "S", "numa" : "N", "ccx" : "X"}[kind]
+	return tuple((f'{prefix}{i}', cpus) for i, cpus in enumerate(cpu_groups))
+
 def create_box(x: int = 0, y: int = 0, width: int = 0, height: int = 0, title: str = "", title2: str = "", line_color: Color = None, title_color: Color = None, fill: bool = True, box = None) -> str:
-	'''Create a box from a box object or by given arguments'''
-	out: str = f'{Term.fg}{Term.bg}'
+	'''Create a box from a box object or by given arguments, boxes are cached by geometry, titles and colors'''
 	if not line_color: line_color = THEME.div_line
 	if not title_color: title_color = THEME.title
 
@@ -4017,6 +5854,12 @@ def create_box(x: int = 0, y: int = 0, width: int = 0, height: int = 0, title: s
 		width = box.width
 		height =box.height
 		title = box.name
+
+	return _create_box(x, y, width, height, title, title2, f'{line_color}', f'{title_color}', fill, f'{Term.fg}', f'{Term.bg}')
+
+@lru_cache(maxsize=64)
+def _create_box(x: int, y: int, width: int, height: int, title: str, title2: str, line_color: str, title_color: str, fill: bool, term_fg: str, term_bg: str) -> str:
+	out: str = f'{term_fg}{term_bg}'
 	hlines: Tuple[int, int] = (y, y + height - 1)
 
 	out += f'{line_color}'
@@ -4041,18 +5884,20 @@ def create_box(x: int = 0, y: int = 0, width: int = 0, height: int = 0, title: s
 	if title2:
 		out += f'{Mv.to(hlines[1], x + 2)}{Symbol.title_left}{title_color}{Fx.b}{title2}{Fx.ub}{line_color}{Symbol.title_right}'
 
-	return f'{out}{Term.fg}{Mv.to(y + 1, x + 1)}'
+	return f'{out}{term_fg}{Mv.to(y + 1, x + 1)}'
 
 def now_sleeping(signum, frame):
 	"""Reset terminal settings and stop background input read before putting to sleep"""
 	Key.stop()
 	Collector.stop()
 	Draw.now(Term.clear, Term.normal_screen, Term.show_cursor, Term.mouse_off, Term.mouse_direct_off, Term.title())
+	Writer.stop()
 	Term.echo(True)
 	os.kill(os.getpid(), signal.SIGSTOP)
 
 def now_awake(signum, frame):
 	"""Set terminal settings and restart background input read"""
+	Writer.start()
 	Draw.now(Term.alt_screen, Term.clear, Term.hide_cursor, Term.mouse_on, Term.title("BpyTOP"))
 	Term.echo(False)
 	Key.start()
@@ -4077,9 +5922,18 @@ def clean_quit(errcode: int = 0, errmsg: str = "", thread: bool = False):
 	if THREAD_ERROR: errcode = THREAD_ERROR
 	Key.stop()
 	Collector.stop()
+	Recording.stop()
+	History.stop()
+	Share.stop()
 	if not errcode: CONFIG.save_config()
 	Draw.now(Term.clear, Term.normal_screen, Term.show_cursor, Term.mouse_off, Term.mouse_direct_off, Term.title())
+	Writer.stop()
 	Term.echo(True)
+	errlog.debug(f'Writer: {Writer.frames} frames, {Writer.bytes_out} bytes, {Writer.dropped} dropped, max write latency {Writer.latency_max:.6f} seconds')
+	if STATS_JSON: Stats.dump()
+	if STARTUP_PROFILE and len(Startup.marks) > 1:
+		errlog.info(Startup.report())
+		print(Startup.report())
 	if errcode == 0:
 		errlog.info(f'Exiting. Runtime {timedelta(seconds=round(time() - SELF_START, 0))} \n')
 	else:
@@ -4169,6 +6023,7 @@ def units_to_bytes(value: str) -> int:
 def process_keys():
 	mouse_pos: Tuple[int, int] = (0, 0)
 	filtered: bool = False
+	moved: bool = False
 	while Key.has_key():
 		key = Key.get()
 		if key in ["mouse_scroll_up", "mouse_scroll_down", "mouse_click"]:
@@ -4260,7 +6115,15 @@ def process_keys():
 			Box.mini_mode = not Box.mini_mode
 			Draw.clear(saved=True)
 			Term.refresh(force=True)
-		elif key.lower() in ["t", "k", "i"] and (ProcBox.selected > 0 or ProcCollector.detailed):
+		elif key == "p":
+			Stats.toggle()
+		elif key == "v":
+			Rollup.cycle()
+		elif key in ["[", "]"] and REPLAY_FILE:
+			Recording.seek(-60 if key == "[" else 60)
+		elif key in ["<", ">"] and REPLAY_FILE:
+			Recording.set_speed(key)
+		elif key.lower() in ["t", "k", "i"] and not ProcRoot.active and not REPLAY_FILE and not REMOTE and (ProcBox.selected > 0 or ProcCollector.detailed):
 			pid: int = ProcBox.selected_pid if ProcBox.selected > 0 else ProcCollector.detailed_pid # type: ignore
 			if psutil.pid_exists(pid):
 				if key == "t": sig = signal.SIGTERM
@@ -4274,7 +6137,7 @@ def process_keys():
 		elif key == "delete" and ProcCollector.search_filter:
 			ProcCollector.search_filter = ""
 			Collector.collect(ProcCollector, proc_interrupt=True, redraw=True)
-		elif key == "enter":
+		elif key == "enter" and not REPLAY_FILE and not REMOTE:
 			if ProcBox.selected > 0 and ProcCollector.detailed_pid != ProcBox.selected_pid and psutil.pid_exists(ProcBox.selected_pid):
 				ProcCollector.detailed = True
 				ProcBox.last_selection = ProcBox.selected
@@ -4297,17 +6160,855 @@ def process_keys():
 			Collector.collect(ProcCollector, proc_interrupt=True, redraw=True)
 
 		elif key in ["up", "down", "mouse_scroll_up", "mouse_scroll_down", "page_up", "page_down", "home", "end", "mouse_click", "mouse_unselect"]:
-			ProcBox.selector(key, mouse_pos)
+			#* Consecutive repeats of a navigation key is handled as one move
+			count: int = Key.repeats(key) + 1 if key in ["up", "down", "mouse_scroll_up", "mouse_scroll_down", "page_up", "page_down"] else 1
+			if ProcBox.selector(key, mouse_pos, count): moved = True
+
+	#* Only one redraw of the process box for all moves in queue
+	if moved: Collector.collect(ProcCollector, proc_interrupt=True, redraw=True, only_draw=True)
+
+
+#? Benchmark ------------------------------------------------------------------------------------->
+
+class Benchmark:
+	'''Runs collectors and boxes headless against SyntheticPsutil, started with --benchmark
+	* .run() : Collect and draw BENCHMARK["frames"] frames with the default config, print per stage timings and bytes per frame and exit
+	'''
+	rows: List[Tuple[str, str, str]] = [
+		("cpu collect", "cpu_collect", "time"), ("cpu draw", "cpu_draw", "time"),
+		("mem collect", "mem_collect", "time"), ("mem draw", "mem_draw", "time"),
+		("net collect", "net_collect", "time"), ("net draw", "net_draw", "time"),
+		("proc collect", "proc_collect", "time"), ("proc draw", "proc_draw", "time"),
+		("draw out", "draw_out", "time"), ("frame total", "frame_total", "time"),
+		("cpu bytes", "cpu_bytes", "bytes"), ("mem bytes", "mem_bytes", "bytes"),
+		("net bytes", "net_bytes", "bytes"), ("proc bytes", "proc_bytes", "bytes"),
+		("frame bytes", "frame_bytes", "bytes")]
+
+	@classmethod
+	def run(cls):
+		global THEME
+		collectors: List = [CpuCollector, MemCollector, NetCollector, ProcCollector]
+		Writer.headless = True
+		Term.width, Term.height = max(80, BENCHMARK["width"]), max(24, BENCHMARK["height"])
+		#* Defaults instead of the config file, so results are comparable between machines and runs, never saved since run() exits directly
+		for key in CONFIG.keys:
+			if key != "log_level": setattr(CONFIG, key, getattr(Config, key))
+		CONFIG.proc_tree = bool(BENCHMARK["tree"])
+		THEME = Theme(CONFIG.color_theme)
+		Box.calc_sizes()
+		Box.draw_bg(now=False)
+
+		#* First sample sets the baselines for rates and graphs, not timed
+		for collector in collectors:
+			collector._collect()
+			collector._draw()
+		Draw.out()
+
+		Stats.samples = {}
+		Stats.size = max(Stats.size, BENCHMARK["frames"])
+		Stats.active = True
+		for _ in range(BENCHMARK["frames"]):
+			psutil.tick()
+			frame_start = time()
+			for collector in collectors:
+				ts = time()
+				collector._collect()
+				Stats.add(f'{collector.buffer}_collect', time() - ts)
+				ts = time()
+				collector._draw()
+				Stats.add(f'{collector.buffer}_draw', time() - ts)
+			bytes_start = Writer.bytes_out
+			ts = time()
+			Draw.out()
+			Stats.add("draw_out", time() - ts)
+			Stats.add("frame_total", time() - frame_start)
+			Stats.add("frame_bytes", Writer.bytes_out - bytes_start)
+
+		print(f'bpytop {VERSION} benchmark: {THREADS} threads, {len(psutil.processes)} processes (depth {BENCHMARK["depth"]}{", tree view" if CONFIG.proc_tree else ""}), '
+			f'{BENCHMARK["disks"]} disks, {BENCHMARK["nics"]} nics, {Term.width}x{Term.height}, {BENCHMARK["frames"]} frames, default config\n')
+		print(f'{"":<14}{"p50":>11}{"p95":>11}{"max":>11}')
+		for label, name, kind in cls.rows:
+			if kind == "time":
+				print(f'{label:<14}' + "".join(f'{value * 1000:>9.3f}ms' for value in Stats.summary(name)))
+			else:
+				print(f'{label:<14}' + "".join(f'{round(value):>11}' for value in Stats.summary(name)))
+		if STATS_JSON: Stats.dump()
+		raise SystemExit(0)
+
+#? Metrics daemon ---------------------------------------------------------------------------------->
+
+class Daemon:
+	'''Runs the collectors without any terminal output and serves the latest sample over http, started with --daemon=ADDR
+	* ADDR is a path for a unix socket or [host:]port for tcp, host defaults to 127.0.0.1
+	* GET /metrics : Prometheus text format
+	* GET /json : Latest sample as a json object
+	* GET /stream : Json lines, one line per sample until the client disconnects
+	* GET /share : Raw samples as json lines for instances attached with --share, see class Share
+	* GET /agent : Compact summary as json lines with only the values changed since the previous line, used by --hosts
+	* Each sample is serialized once and the same bytes are sent to all clients
+	* There is no authentication, /json, /share and /agent includes processes and their command lines,
+	  tcp binds to 127.0.0.1 unless another host is given and a warning is logged and printed if it isn't a loopback address
+	'''
+	proc_rows: int = 20
+	metrics: bytes = b""
+	json_line: bytes = b""
+	share_line: bytes = b""
+	share_clients: int = 0
+	agent: Dict[str, Any] = {}
+	sample: int = 0
+	updated = threading.Condition()
+	stopping: bool = False
+	server: Any = None
+	lock: Any = None
+	addr: str = ""
+
+	@staticmethod
+	def _label(value: str) -> str:
+		return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+	@classmethod
+	def snapshot(cls) -> Dict[str, Any]:
+		cpu, mem, net, procs = CpuCollector, MemCollector, NetCollector, ProcCollector.snapshot
+		out: Dict[str, Any] = {
+			"timestamp" : round(time(), 3),
+			"host" : { "name" : os.uname().nodename, "cpu_name" : CPU_NAME, "cores" : CORES, "threads" : THREADS },
+			"cpu" : {
+				"usage" : [usage[-1] if usage else 0 for usage in cpu.cpu_usage],
+				"freq" : cpu.cpu_freq,
+				"load_avg" : cpu.load_avg,
+				"boot_time" : psutil.boot_time() },
+			"mem" : mem.values.copy(),
+			"swap" : mem.swap_values.copy() if MemBox.swap_on else {},
+			"disks" : { disk["name"] : { "device" : device, "used_percent" : disk["used_percent"] } for device, disk in getattr(mem, "disks", {}).items() },
+			"net" : {},
+			"processes" : { "count" : procs.num_procs, "top" : [] } }
+		if cpu.got_sensors and cpu.cpu_temp[0]:
+			out["cpu"]["temp"] = [temp[-1] if temp else 0 for temp in cpu.cpu_temp]
+		if net.nic in net.stats:
+			out["net"] = { "nic" : net.nic }
+			for direction in ["download", "upload"]:
+				stat = net.stats[net.nic][direction]
+				out["net"][direction] = { "speed" : stat["speed"][-1] if stat["speed"] else 0, "total" : stat["total"] }
+		for pid, p in list(procs.processes.items())[:cls.proc_rows]:
+			out["processes"]["top"].append({ "pid" : pid, "name" : p.name, "user" : p.username, "threads" : p.threads, "cpu" : p.cpu, "mem" : p.mem, "mem_b" : p.mem_b })
+		return out
+
+	@staticmethod
+	def summary(snap: Dict[str, Any]) -> Dict[str, Any]:
+		'''Values shown for each host by --hosts'''
+		mem: Dict[str, int] = snap["mem"]
+		swap: Dict[str, int] = snap["swap"]
+		top: Tuple[int, Optional[ProcCollector.Row]] = max(ProcCollector.snapshot.processes.items(), key=lambda item: item[1].cpu, default=(0, None))
+		return {
+			"name" : snap["host"]["name"],
+			"interval" : CONFIG.update_ms,
+			"threads" : snap["host"]["threads"],
+			"cpu" : snap["cpu"]["usage"][0],
+			"temp" : snap["cpu"].get("temp", [None])[0],
+			"load" : snap["cpu"]["load_avg"],
+			"uptime" : CpuCollector.uptime,
+			"mem" : round(mem["used"] * 100 / mem["total"]) if mem.get("total") else 0,
+			"swap" : round(swap["used"] * 100 / swap["total"]) if swap.get("total") else None,
+			"nic" : snap["net"].get("nic", ""),
+			"down" : snap["net"]["download"]["speed"] if snap["net"] else 0,
+			"up" : snap["net"]["upload"]["speed"] if snap["net"] else 0,
+			"procs" : snap["processes"]["count"],
+			"top" : [top[0], top[1].name, round(top[1].cpu, 1)] if top[1] else [0, "", 0.0] }
+
+	@classmethod
+	def prometheus(cls, snap: Dict[str, Any]) -> str:
+		lines: List[str] = []
+		def metric(name: str, help_text: str, kind: str, values: Iterable[Tuple[str, Any]]):
+			lines.extend([f'# HELP bpytop_{name} {help_text}', f'# TYPE bpytop_{name} {kind}'])
+			lines.extend(f'bpytop_{name}{"{" + labels + "}" if labels else ""} {value}' for labels, value in values)
+
+		metric("cpu_usage_percent", "Cpu usage, cpu=\"total\" for all cpus.", "gauge",
+			((f'cpu="{"total" if n == 0 else n - 1}"', usage) for n, usage in enumerate(snap["cpu"]["usage"])))
+		if "temp" in snap["cpu"]:
+			metric("cpu_temperature_celsius", "Cpu temperature, cpu=\"total\" for package.", "gauge",
+				((f'cpu="{"total" if n == 0 else n - 1}"', temp) for n, temp in enumerate(snap["cpu"]["temp"])))
+		metric("cpu_frequency_mhz", "Current cpu frequency.", "gauge", [("", snap["cpu"]["freq"])])
+		metric("load_average", "System load average.", "gauge", ((f'period="{period}"', lavg) for period, lavg in zip(["1m", "5m", "15m"], snap["cpu"]["load_avg"])))
+		metric("boot_time_seconds", "System boot time as unix timestamp.", "gauge", [("", snap["cpu"]["boot_time"])])
+		metric("memory_bytes", "Memory by type.", "gauge", ((f'type="{name}"', value) for name, value in snap["mem"].items()))
+		if snap["swap"]:
+			metric("swap_bytes", "Swap by type.", "gauge", ((f'type="{name}"', value) for name, value in snap["swap"].items()))
+		if snap["disks"]:
+			metric("disk_used_percent", "Used space of disk.", "gauge",
+				((f'disk="{cls._label(name)}",device="{cls._label(disk["device"])}"', disk["used_percent"]) for name, disk in snap["disks"].items()))
+		if snap["net"]:
+			nic: str = cls._label(snap["net"]["nic"])
+			metric("network_speed_bytes", "Current network speed in bytes per second.", "gauge",
+				((f'nic="{nic}",direction="{direction}"', snap["net"][direction]["speed"]) for direction in ["download", "upload"]))
+			metric("network_bytes_total", "Total bytes received or sent.", "counter",
+				((f'nic="{nic}",direction="{direction}"', snap["net"][direction]["total"]) for direction in ["download", "upload"]))
+		metric("processes", "Number of processes.", "gauge", [("", snap["processes"]["count"])])
+		top: List[Tuple[str, Dict]] = [(f'pid="{p["pid"]}",name="{cls._label(p["name"])}"', p) for p in snap["processes"]["top"]]
+		metric("process_cpu_percent", "Cpu usage of top processes.", "gauge", ((labels, p["cpu"]) for labels, p in top))
+		metric("process_memory_percent", "Memory usage of top processes.", "gauge", ((labels, round(p["mem"], 2)) for labels, p in top))
+		return "\n".join(lines) + "\n"
+
+	@classmethod
+	def publish(cls):
+		snap: Dict[str, Any] = cls.snapshot()
+		metrics: bytes = cls.prometheus(snap).encode()
+		json_line: bytes = (json.dumps(snap, separators=(",", ":")) + "\n").encode()
+		share_line: bytes = Share.line() if cls.share_clients else b""
+		agent: Dict[str, Any] = cls.summary(snap)
+		with cls.updated:
+			cls.metrics, cls.json_line, cls.share_line, cls.agent = metrics, json_line, share_line, agent
+			cls.sample += 1
+			cls.updated.notify_all()
+
+	@classmethod
+	def serve(cls, addr: str):
+		'''Start serving on ADDR in a separate thread, a unix socket path is guarded by a lock file next to it
+		and raises BlockingIOError if another instance is serving on the same path'''
+		import http.server, socketserver
+		port: str
+
+		class Handler(http.server.BaseHTTPRequestHandler):
+			def do_GET(self):
+				path: str = self.path.split("?")[0]
+				if path in ["/stream", "/share", "/agent"]:
+					self._stream(path[1:])
+					return
+				if path in ["/", "/metrics"]:
+					body, content = cls.metrics, "text/plain; version=0.0.4; charset=utf-8"
+				elif path == "/json":
+					body, content = cls.json_line, "application/json"
+				else:
+					self.send_error(404)
+					return
+				self.send_response(200)
+				self.send_header("Content-Type", content)
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+
+			def _stream(self, kind: str):
+				sample: int = 0
+				line: bytes = b""
+				agent: Dict[str, Any]
+				last: Dict[str, Any] = {}
+				share: bool = kind == "share"
+				self.send_response(200)
+				self.send_header("Content-Type", "application/x-ndjson")
+				self.end_headers()
+				#* Share.line() is only called by the collecting thread, a new viewer gets the cached line of the last sample,
+				#* or the next sample if no viewer was attached when the last one was published
+				with cls.updated:
+					if share: cls.share_clients += 1
+					sample, line, agent = cls.sample, cls.share_line if share else b"", cls.agent
+				try:
+					while True:
+						if kind == "agent" and not agent: line = b""
+						elif kind == "agent":
+							#* Only values changed since the last line sent on this connection, an empty object is a heartbeat
+							line = (json.dumps({ key : value for key, value in agent.items() if not key in last or last[key] != value }, separators=(",", ":")) + "\n").encode()
+							last = agent
+						if line:
+							self.wfile.write(line)
+							self.wfile.flush()
+						with cls.updated:
+							cls.updated.wait_for(lambda: cls.sample != sample or cls.stopping)
+							if cls.stopping: return
+							sample, line, agent = cls.sample, cls.share_line if share else cls.json_line, cls.agent
+				except (BrokenPipeError, ConnectionResetError):
+					pass
+				finally:
+					if share:
+						with cls.updated:
+							cls.share_clients -= 1
+
+			def log_message(self, *args):
+				pass
+
+		if "/" in addr:
+			class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+				daemon_threads = True
+			lock = open(f'{addr}.lock', "a")
+			try:
+				fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+				if os.path.exists(addr): os.unlink(addr)
+				cls.server = UnixServer(addr, Handler)
+			except:
+				lock.close()
+				raise
+			cls.lock = lock
+		else:
+			class TCPServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+				daemon_threads = True
+				allow_reuse_address = True
+			host, _, port = addr.rpartition(":")
+			cls.server = TCPServer((host or "127.0.0.1", int(port)), Handler)
+			if not (host or "127.0.0.1") in ["localhost", "::1"] and not (host or "127.0.0.1").startswith("127."):
+				warning: str = f'Serving on {addr} without authentication, processes and their command lines are readable by anyone who can connect'
+				errlog.warning(warning)
+				print(f'WARNING!\n{warning}')
+		cls.addr = addr
+		cls.stopping = False
+		threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+		errlog.info(f'Serving on {addr}')
+
+	@classmethod
+	def shutdown(cls):
+		if not cls.server: return
+		with cls.updated:
+			cls.stopping = True
+			cls.updated.notify_all()
+		cls.server.shutdown()
+		cls.server.server_close()
+		cls.server = None
+		if cls.lock:
+			if os.path.exists(cls.addr): os.unlink(cls.addr)
+			cls.lock.close()
+			cls.lock = None
+
+	@classmethod
+	def run(cls):
+		addr: str = DAEMON
+		try:
+			cls.serve(addr)
+		except BlockingIOError:
+			print(f'ERROR!\nAnother instance is already serving on {addr}')
+			raise SystemExit(1)
+		except (OSError, ValueError) as e:
+			print(f'ERROR!\nUnable to listen on {addr}: {e}')
+			raise SystemExit(1)
+
+		#* Collectors limit history lengths and format disk io strings by box sizes
+		Box.calc_sizes()
+		if CONFIG.check_temp: CpuCollector.get_sensors()
+		cls.publish()
+		signal.signal(signal.SIGTERM, lambda signum, frame: interrupt_main())
+		try:
+			while True:
+				start: float = time()
+				for collector in [CpuCollector, MemCollector, NetCollector, ProcCollector]:
+					collector._collect()
+				cls.publish()
+				sleep(max(0.0, CONFIG.update_ms / 1000 - (time() - start)))
+		except KeyboardInterrupt:
+			pass
+		except Exception as e:
+			errlog.exception(f'Daemon stopped with exception: {e}')
+		cls.shutdown()
+		errlog.info(f'Daemon exiting. Runtime {timedelta(seconds=round(time() - SELF_START, 0))} \n')
+		raise SystemExit(0)
+
+#? Shared collection ---------------------------------------------------------------------------->
+
+class CapturePsutil:
+	'''Wraps psutil in the instance collecting for --share and --daemon, keeps the results of the calls made by the collectors
+	as plain values that are serialized by Share.line(), anything not captured is passed through to psutil'''
+	def __init__(self, real: Any):
+		self.real = real
+		self.data: Dict[str, Any] = { "usage" : {} }
+		self.fresh: Set[str] = set()
+
+	def __getattr__(self, name: str) -> Any:
+		return getattr(self.real, name)
+
+	def _keep(self, key: str, value: Any):
+		self.data[key] = value
+		self.fresh.add(key)
+
+	def cpu_percent(self, interval = None, percpu: bool = False) -> Union[float, List[float]]:
+		out = self.real.cpu_percent(interval, percpu=percpu)
+		self._keep("cpu" if percpu else "cpu_total", out)
+		return out
+
+	def cpu_freq(self, percpu: bool = False) -> Any:
+		out = self.real.cpu_freq()
+		self._keep("freq", [out.current, out.min, out.max] if hasattr(out, "current") else None)
+		return out
+
+	def boot_time(self) -> float:
+		out = self.real.boot_time()
+		self._keep("boot", out)
+		return out
+
+	def getloadavg(self) -> Tuple[float, float, float]:
+		out = self.real.getloadavg()
+		self._keep("load", list(out))
+		return out
+
+	def virtual_memory(self) -> Any:
+		out = self.real.virtual_memory()
+		self._keep("mem", [out.total, out.available, out.used, out.free, getattr(out, "cached", getattr(out, "active", 0))])
+		return out
+
+	def swap_memory(self) -> Any:
+		out = self.real.swap_memory()
+		self._keep("swap", [out.total, out.used, out.free, out.percent])
+		return out
+
+	def disk_partitions(self, all: bool = False) -> Any:
+		out = self.real.disk_partitions(all)
+		self._keep("parts", [[disk.device, disk.mountpoint, disk.fstype, disk.opts] for disk in out])
+		return out
+
+	def disk_usage(self, path: str) -> Any:
+		out = self.real.disk_usage(path)
+		self.data["usage"][path] = [out.total, out.used, out.free, out.percent]
+		self.fresh.add(f'usage:{path}')
+		return out
+
+	def disk_io_counters(self, perdisk: bool = False, nowrap: bool = True) -> Any:
+		out = self.real.disk_io_counters(perdisk=perdisk, nowrap=nowrap)
+		if out is None: self._keep("dio", None)
+		elif perdisk: self._keep("dio", { name : [io.read_bytes, io.write_bytes] for name, io in out.items() })
+		else: self._keep("dio", { "" : [out.read_bytes, out.write_bytes] })
+		return out
+
+	def net_io_counters(self, pernic: bool = False, nowrap: bool = True) -> Any:
+		out = self.real.net_io_counters(pernic=True, nowrap=nowrap)
+		self._keep("nio", { nic : [io.bytes_sent, io.bytes_recv] for nic, io in out.items() })
+		return out
+
+	def net_if_stats(self) -> Any:
+		out = self.real.net_if_stats()
+		self._keep("nif", { nic : stat.isup for nic, stat in out.items() })
+		return out
+
+	def sensors_temperatures(self) -> Any:
+		out = self.real.sensors_temperatures()
+		self._keep("temps", { name : [[entry.label, entry.current, entry.high, entry.critical] for entry in entries] for name, entries in out.items() })
+		return out
+
+	def process_iter(self, attrs = None, ad_value = None) -> Iterable[Any]:
+		#* Partial scans like ProcCollector._prime() are passed through, only full scans are captured
+		if not set(ProcCollector.p_values).issubset(attrs or []): return self.real.process_iter(attrs, ad_value)
+		return self._capture_procs(attrs, ad_value)
+
+	def _capture_procs(self, attrs, ad_value) -> Iterable[Any]:
+		'''Yields processes as they are read so ProcCollector._scan() stays interruptible, the rows are kept when the scan completes'''
+		#* Always ask for the values any viewer might need, sorting and tree building is done by each viewer
+		rows: List[List] = []
+		for p in self.real.process_iter(list(attrs) + ["ppid", "memory_info"], ad_value):
+			info = p.info
+			rss = info["memory_info"].rss if hasattr(info["memory_info"], "rss") else 0.0
+			cpu_times = list(info["cpu_times"][:2]) if hasattr(info["cpu_times"], "user") else info["cpu_times"]
+			rows.append([p.pid, info["ppid"], info["name"], info["cmdline"], info["num_threads"], info["username"],
+				info["memory_percent"], info["cpu_percent"], cpu_times, info["create_time"], rss])
+			yield p
+		self._keep("procs", rows)
+
+class SharedProcess(SyntheticProcess):
+	'''Process from a shared sample, anything not in the sample, like details or parent, is read from the live process'''
+	def __getattr__(self, name: str) -> Any:
+		return getattr(Share.real.Process(self.pid), name)
+
+class SharedPsutil(SyntheticPsutil):
+	'''Stand-in for psutil in a viewer attached with --share, serves the calls made by the collectors from the latest sample'''
+	class Temp(NamedTuple):
+		label: str
+		current: float
+		high: Optional[float]
+		critical: Optional[float]
+
+	info_keys: Tuple[str, ...] = ("name", "cmdline", "num_threads", "username", "memory_percent", "cpu_percent", "cpu_times", "create_time", "memory_info")
+
+	def __init__(self):
+		self.threads = THREADS
+		self.data: Dict[str, Any] = {}
+		self.processes: Dict[int, SyntheticProcess] = {} # type: ignore
+
+	def update(self, data: Dict[str, Any]):
+		processes: Dict[int, SyntheticProcess] = {}
+		for pid, ppid, *values in data.get("procs", []):
+			info: Dict[str, Any] = dict(zip(self.info_keys, values))
+			info["pid"] = pid
+			if isinstance(info["cpu_times"], list): info["cpu_times"] = tuple(info["cpu_times"])
+			if isinstance(info["memory_info"], int): info["memory_info"] = self.MemInfo(info["memory_info"])
+			processes[pid] = SharedProcess(pid, ppid, info)
+		self.data, self.processes = data, processes
+
+	def cpu_percent(self, interval = None, percpu: bool = False) -> Union[float, List[float]]:
+		if percpu: return self.data.get("cpu", [0.0] * self.threads)
+		return self.data.get("cpu_total", 0.0)
+
+	def cpu_freq(self, percpu: bool = False) -> Any:
+		return self.Freq(*self.data["freq"]) if self.data.get("freq") else None
+
+	def boot_time(self) -> float:
+		return self.data.get("boot", SELF_START)
+
+	def getloadavg(self) -> Tuple[float, float, float]:
+		return tuple(self.data.get("load", [0.0, 0.0, 0.0])) # type: ignore
+
+	def virtual_memory(self) -> SyntheticPsutil.Memory:
+		return self.Memory(*self.data.get("mem", [1, 1, 0, 1, 0]))
+
+	def swap_memory(self) -> SyntheticPsutil.Usage:
+		return self.Usage(*self.data.get("swap", [0, 0, 0, 0.0]))
+
+	def disk_partitions(self, all: bool = False) -> List[SyntheticPsutil.Partition]:
+		return [self.Partition(*disk) for disk in self.data.get("parts", [])]
+
+	def disk_usage(self, path: str) -> SyntheticPsutil.Usage:
+		if not path in self.data.get("usage", {}): raise OSError(f'No shared disk usage for {path}')
+		return self.Usage(*self.data["usage"][path])
+
+	def disk_io_counters(self, perdisk: bool = False, nowrap: bool = True) -> Any:
+		io_counters: Dict[str, List[int]] = self.data.get("dio") or {}
+		if not io_counters: raise ValueError("No shared disk io counters")
+		if perdisk: return { name : self.DiskIO(*io) for name, io in io_counters.items() }
+		return self.DiskIO(*io_counters[""]) if "" in io_counters else self.DiskIO(*map(sum, zip(*io_counters.values())))
+
+	def net_io_counters(self, pernic: bool = False, nowrap: bool = True) -> Dict[str, SyntheticPsutil.NetIO]:
+		return { nic : self.NetIO(*io) for nic, io in self.data.get("nio", {}).items() }
+
+	def net_if_stats(self) -> Dict[str, SyntheticPsutil.NetStat]:
+		return { nic : self.NetStat(isup) for nic, isup in self.data.get("nif", {}).items() }
+
+	def sensors_temperatures(self) -> Dict[str, List[Temp]]:
+		return { name : [self.Temp(*entry) for entry in entries] for name, entries in self.data.get("temps", {}).items() }
+
+	def Process(self, pid: Optional[int] = None) -> Any:
+		if pid is None: return Share.real.Process()
+		return super().Process(pid)
+
+class Share:
+	'''Shares one collection between all instances started with --share=SOCKET on the same host
+	* The first instance to take the lock file next to SOCKET collects and serves raw samples on GET /share of the Daemon http server,
+	  a --daemon running on the same path serves the same way
+	* Later instances attach as viewers, their collectors reads the latest sample through SharedPsutil instead of /proc and /sys,
+	  so sorting, filtering, tree state and selected nic stays local to each viewer
+	* Viewers draws when a sample arrives and one of them takes over collection if the serving instance exits
+	* SOCKET given as [host:]port attaches to a --daemon on another host, without election or take over,
+	  processes of the other host can't be inspected or signaled
+	'''
+	real: Any = psutil
+	capture: CapturePsutil
+	shared: SharedPsutil
+	serving: bool = False
+	attached: bool = False
+	lost: bool = False
+	sock: Any = None
+	pending: Optional[Dict[str, Any]] = None
+	lock = threading.Lock()
+	timeout: float = 5.0
+
+	@classmethod
+	def start(cls) -> Any:
+		'''Returns the stand-in for psutil to be used by the collectors'''
+		cls.capture = CapturePsutil(cls.real)
+		cls.shared = SharedPsutil()
+		if SHARE and not cls._elect():
+			print(f'ERROR!\nUnable to attach to or serve on {SHARE}, see {CONFIG_DIR}/error.log')
+			raise SystemExit(1)
+		return cls.shared if cls.attached else cls.capture
+
+	@classmethod
+	def _elect(cls) -> bool:
+		'''Attach to a running server or become the server, retries while another instance holds the lock without listening yet'''
+		if REMOTE: return cls._attach()
+		end: float = time() + cls.timeout
+		while time() < end:
+			if cls._attach(): return True
+			try:
+				Daemon.serve(SHARE)
+			except BlockingIOError:
+				sleep(0.1)
+				continue
+			except OSError as e:
+				errlog.exception(f'Unable to serve on {SHARE}: {e}')
+				return False
+			cls.serving = True
+			return True
+		errlog.error(f'Timed out attaching to {SHARE}')
+		return False
+
+	@classmethod
+	def connect(cls, addr: str, path: str) -> Tuple[Any, Any]:
+		'''Connect to a unix socket path or [host:]port and request a json lines stream, returns socket and stream positioned at the first line'''
+		import socket
+		host: str
+		port: str
+		if "/" in addr:
+			sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+			sock.settimeout(cls.timeout)
+		else:
+			host, _, port = addr.rpartition(":")
+			sock = socket.create_connection((host or "127.0.0.1", int(port)), timeout=cls.timeout)
+		try:
+			if "/" in addr: sock.connect(addr)
+			sock.sendall(f'GET {path} HTTP/1.0\r\n\r\n'.encode())
+			stream = sock.makefile("rb")
+			if not b" 200 " in stream.readline():
+				raise ValueError(f'Server didn\'t accept {path} request')
+			while stream.readline() not in [b"\r\n", b""]: pass
+		except:
+			sock.close()
+			raise
+		return sock, stream
+
+	@classmethod
+	def _attach(cls) -> bool:
+		sock: Any = None
+		try:
+			sock, stream = cls.connect(SHARE, "/share")
+			#* The first sample can be one update away if no other viewer was attached
+			sock.settimeout(cls.timeout + CONFIG.update_ms / 1000)
+			cls.shared.update(json.loads(stream.readline()))
+		except (OSError, ValueError) as e:
+			if REMOTE or not isinstance(e, (FileNotFoundError, ConnectionError)): errlog.warning(f'Unable to attach to {SHARE}: {e}')
+			if sock: sock.close()
+			return False
+		sock.settimeout(None)
+		cls.sock, cls.attached, cls.lost, cls.pending = sock, True, False, None
+		threading.Thread(target=cls._reader, args=(stream,), daemon=True).start()
+		errlog.info(f'Attached to {SHARE}')
+		return True
+
+	@classmethod
+	def _reader(cls, stream: Any):
+		try:
+			for line in stream:
+				data = json.loads(line)
+				with cls.lock:
+					cls.pending = data
+				Timer.finish()
+		except (OSError, ValueError) as e:
+			errlog.warning(f'Lost connection to {SHARE}: {e}')
+		cls.lost = True
+		Timer.finish()
+
+	@classmethod
+	def advance(cls) -> bool:
+		'''Called by the collector thread before a full update, swaps in the latest sample and returns False if nothing new arrived'''
+		global psutil
+		if not cls.attached: return True
+		if cls.lost and REMOTE:
+			#* Keep showing the last sample from the other host and retry on next update
+			cls.sock.close()
+			return cls._attach()
+		if cls.lost:
+			cls.sock.close()
+			cls.attached = False
+			if cls._elect():
+				errlog.info(f'{"Attached to new server" if cls.attached else "Took over serving"} on {SHARE}')
+			else:
+				errlog.warning(f'Collecting without sharing')
+			psutil = cls.shared if cls.attached else cls.capture
+			return True
+		with cls.lock:
+			data, cls.pending = cls.pending, None
+		if data is None: return False
+		cls.shared.update(data)
+		return True
+
+	@classmethod
+	def line(cls) -> bytes:
+		'''Serialize the values captured since last call, values the collectors didn't ask for are collected here
+		since viewers might have other boxes, disks or sensors enabled, only called from the collecting thread through Daemon.publish()'''
+		capture: CapturePsutil = cls.capture
+		with cls.lock:
+			for name, key in [("virtual_memory", "mem"), ("swap_memory", "swap"), ("disk_partitions", "parts"), ("disk_io_counters", "dio"), ("net_io_counters", "nio"),
+					("net_if_stats", "nif"), ("boot_time", "boot"), ("cpu_freq", "freq"), ("getloadavg", "load"), ("sensors_temperatures", "temps")]:
+				if key in capture.fresh or not hasattr(cls.real, name): continue
+				try:
+					if name == "disk_io_counters": capture.disk_io_counters(perdisk=SYSTEM == "Linux")
+					else: getattr(capture, name)()
+				except Exception:
+					pass
+			mountpoints: List[str] = [disk[1] for disk in capture.data.get("parts", []) if not disk[2] in MemCollector.excludes]
+			for path in mountpoints:
+				if f'usage:{path}' in capture.fresh: continue
+				try: capture.disk_usage(path)
+				except Exception: capture.data["usage"].pop(path, None)
+			capture.data["usage"] = { path : usage for path, usage in capture.data["usage"].items() if path in mountpoints }
+			if not "cpu" in capture.data:
+				capture.cpu_percent(percpu=False)
+				capture.cpu_percent(percpu=True)
+			if not "procs" in capture.data:
+				for _ in capture.process_iter(ProcCollector.p_values, 0.0): pass
+			capture.fresh.clear()
+			return (json.dumps(capture.data, separators=(",", ":")) + "\n").encode()
+
+	@classmethod
+	def stop(cls):
+		if cls.serving: Daemon.shutdown()
+		if cls.attached and cls.sock: cls.sock.close()
+		cls.serving = cls.attached = False
+
+#? Remote hosts ---------------------------------------------------------------------------------->
+
+class Fleet:
+	'''Summary grid of hosts running --daemon=[host:]port as agents, started with --hosts=ADDR,ADDR...
+	* Keeps one persistent connection per host to GET /agent, each line only holds the values changed since the previous line
+	* Draws once per update_ms no matter how many hosts sent updates, a host is shown as down if it's silent for stale seconds
+	  or three of its own update intervals if longer
+	* (Enter) or clicking a selected host runs a full view of it as bpytop --share=ADDR and returns to the grid when it quits
+	'''
+	hosts: Dict[str, Dict[str, Any]] = {}
+	selected: int = 0
+	offset: int = 0
+	stale: float = 10.0
+	retry: float = 5.0
+	stopping = threading.Event()
+	resized: bool = True
+	background: str = ""
+	meters: Dict[str, Meter] = {}
+	rows: int = 0
+
+	@classmethod
+	def _stale(cls, host: Dict[str, Any]) -> float:
+		'''Seconds without a line before host is considered down, agents sends one line per update of their own'''
+		return max(cls.stale, host.get("interval", 0) * 3 / 1000)
+
+	@classmethod
+	def _reader(cls, addr: str):
+		host: Dict[str, Any] = cls.hosts[addr]
+		while not cls.stopping.is_set():
+			sock: Any = None
+			try:
+				sock, stream = Share.connect(addr, "/agent")
+				sock.settimeout(cls._stale(host))
+				host["error"] = ""
+				for line in stream:
+					host.update(json.loads(line))
+					host["seen"] = time()
+					sock.settimeout(cls._stale(host))
+					if cls.stopping.is_set(): break
+			except (OSError, ValueError) as e:
+				host["error"] = f'{e}'
+			if sock: sock.close()
+			host["seen"] = 0.0
+			cls.stopping.wait(cls.retry)
+
+	@classmethod
+	def run(cls):
+		global THEME
+		for addr in HOSTS:
+			cls.hosts[addr] = { "name" : addr, "seen" : 0.0, "error" : "connecting" }
+			threading.Thread(target=cls._reader, args=(addr,), daemon=True).start()
+		Writer.start()
+		Draw.now(Term.alt_screen, Term.clear, Term.hide_cursor, Term.mouse_on, Term.title("BpyTOP"))
+		Term.echo(False)
+		try:
+			THEME = Theme(CONFIG.color_theme)
+		except Exception as e:
+			errlog.exception(f'{e}')
+			clean_quit(1, errmsg=f'Error loading theme! See {CONFIG_DIR}/error.log for more information.')
+		signal.signal(signal.SIGINT, quit_sigint)
+		signal.signal(signal.SIGWINCH, lambda signum, frame: cls.resize())
+		Key.start()
+		update: float = 0.0
+		while True:
+			if time() >= update:
+				update = time() + CONFIG.update_ms / 1000
+				cls._draw()
+			if Key.input_wait(update - time()):
+				while Key.has_key():
+					cls._key(Key.get())
+				cls._draw()
+
+	@classmethod
+	def resize(cls):
+		cls.resized = True
+		Key.break_wait()
 
+	@classmethod
+	def _key(cls, key: str):
+		if key in ["q", "escape"]:
+			cls.stopping.set()
+			clean_quit()
+		elif key in ["up", "mouse_scroll_up"]:
+			cls.selected = max(0, cls.selected - 1)
+		elif key in ["down", "mouse_scroll_down"]:
+			cls.selected = min(len(HOSTS) - 1, cls.selected + 1)
+		elif key == "page_up":
+			cls.selected = max(0, cls.selected - cls.rows)
+		elif key == "page_down":
+			cls.selected = min(len(HOSTS) - 1, cls.selected + cls.rows)
+		elif key == "home":
+			cls.selected = 0
+		elif key == "end":
+			cls.selected = len(HOSTS) - 1
+		elif key == "mouse_click":
+			_, my = Key.get_mouse()
+			row: int = cls.offset + my - 3
+			if my < 3 or row >= min(len(HOSTS), cls.offset + cls.rows): return
+			if row == cls.selected: cls.drill(HOSTS[row])
+			else: cls.selected = row
+		elif key == "enter":
+			cls.drill(HOSTS[cls.selected])
+
+	@classmethod
+	def drill(cls, addr: str):
+		'''Hand the terminal over to a full view of host at addr and take it back when it exits'''
+		Key.stop()
+		Draw.now(Term.clear, Term.normal_screen, Term.show_cursor, Term.mouse_off, Term.mouse_direct_off, Term.title())
+		Writer.stop()
+		Term.echo(True)
+		import subprocess
+		try:
+			subprocess.call([sys.executable, os.path.realpath(__file__), f'--share={addr}'] + (["--debug"] if DEBUG else []))
+		except Exception as e:
+			errlog.exception(f'Unable to start full view of {addr}: {e}')
+		Writer.start()
+		Draw.now(Term.alt_screen, Term.clear, Term.hide_cursor, Term.mouse_on, Term.title("BpyTOP"))
+		Term.echo(False)
+		Key.start()
+		cls.resized = True
+
+	@classmethod
+	def _draw(cls):
+		if cls.resized:
+			Term.width, Term.height = os.get_terminal_size()
+			cls.rows = max(1, Term.height - 4)
+			mw: int = max(5, min(20, (Term.width - 100) // 2))
+			cls.meters = { "cpu" : Meter(0, mw, "cpu"), "mem" : Meter(0, mw, "used") }
+			cls.background = (f'{Term.clear}{create_box(1, 1, Term.width, Term.height, "hosts", f"↑ select ↓  ↲ full view  q quit", line_color=THEME.proc_box)}'
+				f'{Mv.to(2, 3)}{THEME.title}{Fx.b}{"Host:":<18} {"Cpu:":<{mw + 5}} {"Mem:":<{mw + 5}} {"Load:":>6} {"Download:":>10} {"Upload:":>10} {"Procs:":>6}  Top process:{Fx.ub}')
+			Draw.now(cls.background)
+			cls.resized = False
+		mw = cls.meters["cpu"].width
+		if cls.selected < cls.offset: cls.offset = cls.selected
+		elif cls.selected >= cls.offset + cls.rows: cls.offset = cls.selected - cls.rows + 1
+		top_w: int = max(8, Term.width - 71 - mw * 2)
+		out: str = ""
+		y: int = 2
+		for n, addr in enumerate(HOSTS[cls.offset:cls.offset + cls.rows], start=cls.offset):
+			host = cls.hosts[addr]
+			y += 1
+			out += f'{Mv.to(y, 2)}{THEME.selected_bg if n == cls.selected else ""}{THEME.selected_fg if n == cls.selected else THEME.main_fg} '
+			if time() - host["seen"] > cls._stale(host):
+				out += f'{host["name"][:18]:<18} {(THEME.inactive_fg if n != cls.selected else "")}{"down: " + host["error"] if host["error"] else "down":<{Term.width - 23}.{Term.width - 23}}'
+			else:
+				cpu: int = host.get("cpu", 0)
+				mem: int = host.get("mem", 0)
+				top: List = host.get("top") or [0, "", 0.0]
+				out += (f'{host["name"][:18]:<18} {cls.meters["cpu"](cpu)}{THEME.selected_fg if n == cls.selected else THEME.main_fg}{cpu:>4}% '
+					f'{cls.meters["mem"](mem)}{THEME.selected_fg if n == cls.selected else THEME.main_fg}{mem:>4}% '
+					f'{host.get("load", [0.0])[0]:>6.2f} {floating_humanizer(host.get("down", 0), per_second=True, short=True):>10} '
+					f'{floating_humanizer(host.get("up", 0), per_second=True, short=True):>10} {host.get("procs", 0):>6}  '
+					f'{top[1][:top_w - 8]:<{max(0, top_w - 8)}} {top[2]:>5}%')
+			out += f' {Term.bg}'
+		for _ in range(y, 2 + cls.rows):
+			y += 1
+			out += f'{Mv.to(y, 2)}{" " * (Term.width - 2)}'
+		Draw.now(out)
 
 #? Pre main -------------------------------------------------------------------------------------->
 
 
-CPU_NAME: str = get_cpu_name()
+Startup.mark("classes")
+CPU_NAME: str = Recording.cpu_name if REPLAY_FILE else REMOTE["cpu_name"] if REMOTE else get_cpu_name()
+Startup.mark("cpu name")
 
 
 if __name__ == "__main__":
 
+	if BENCHMARK: Benchmark.run()
+	if HOSTS: Fleet.run()
+	if DAEMON or SHARE: psutil = Share.start()
+	if DAEMON: Daemon.run()
+	if RECORD_FILE: Recording.start(RECORD_FILE)
+
 	#? Init -------------------------------------------------------------------------------------->
 	if DEBUG: TimeIt.start("Init")
 
@@ -4318,6 +7019,45 @@ if __name__ == "__main__":
 		initbg_up: Graph
 		initbg_down: Graph
 		resized = False
+		threads: List[threading.Thread] = []
+		error: Any = None
+		primed: bool = False
+		prime_time: float = 0.1
+
+		@classmethod
+		def prime(cls):
+			'''Probe sensors and collect the primed first sample in background threads while the theme is built'''
+			if REPLAY_FILE:
+				CpuCollector.got_sensors = Recording.got_sensors
+				return
+			#* Left set by the forced Term.refresh() before collection started, would stop the primed process scan before it's published
+			Collector.collect_interrupt = Collector.proc_interrupt = False
+			if CONFIG.check_temp: cls.threads.append(threading.Thread(target=CpuCollector.get_sensors))
+			cls.threads.append(threading.Thread(target=cls._first_sample))
+			for thread in cls.threads: thread.start()
+
+		@classmethod
+		def _first_sample(cls):
+			'''Baseline followed by a short second sample, so the first frame shows real cpu, process, disk and network rates'''
+			try:
+				if not Share.attached:
+					ts: float = time()
+					for collector in Collector.__subclasses__():
+						collector._prime()
+					sleep(max(0.0, cls.prime_time - (time() - ts)))
+				for collector in Collector.__subclasses__():
+					collector._collect()
+			except Exception as e:
+				cls.error = e
+
+		@classmethod
+		def primed_wait(cls):
+			'''Wait for sensor probe and first sample, temps are collected here if sensors was found after cpu was sampled'''
+			for thread in cls.threads: thread.join()
+			if cls.error: raise cls.error
+			cls.primed = bool(cls.threads)
+			if cls.primed and CpuCollector.got_sensors and not CpuCollector.cpu_temp[0]:
+				CpuCollector._collect_temps()
 
 		@staticmethod
 		def fail(err):
@@ -4366,7 +7106,7 @@ if __name__ == "__main__":
 			cls.running = False
 			if not CONFIG.show_init: return
 			if cls.resized:
-				Draw.now(Term.clear)
+				Draw.now(Term.clear, full=True)
 			else:
 				cls.draw_bg(10)
 			Draw.clear("initbg", "banner", "init", saved=True)
@@ -4374,21 +7114,30 @@ if __name__ == "__main__":
 			del cls.initbg_up, cls.initbg_down, cls.initbg_data, cls.initbg_colors
 
 
+	#? Start a separate thread for writing to the terminal
+	Writer.start()
+
 	#? Switch to alternate screen, clear screen, hide cursor, enable mouse reporting and disable input echo
 	Draw.now(Term.alt_screen, Term.clear, Term.hide_cursor, Term.mouse_on, Term.title("BpyTOP"))
 	Term.echo(False)
+	if CONFIG.sync_output == "auto": Term.detect_sync()
+	Term.set_sync()
 	Term.refresh(force=True)
 	if CONFIG.update_check: UpdateChecker.run()
+	Startup.mark("terminal")
 
 	#? Draw banner and init status
 	if CONFIG.show_init:
 		Init.success(start=True)
 
-	#? Load theme
+	#? Load theme while sensors are probed and the first sample is collected
 	if CONFIG.show_init:
-		Draw.buffer("+init!", f'{Mv.restore}{Fx.trans("Loading theme and creating colors... ")}{Mv.save}')
+		Draw.buffer("+init!", f'{Mv.restore}{Fx.trans("Loading theme and collecting data... ")}{Mv.save}')
 	try:
+		Box.calc_sizes()
+		Init.prime()
 		THEME: Theme = Theme(CONFIG.color_theme)
+		Startup.mark("theme")
 	except Exception as e:
 		Init.fail(e)
 	else:
@@ -4398,9 +7147,12 @@ if __name__ == "__main__":
 	if CONFIG.show_init:
 		Draw.buffer("+init!", f'{Mv.restore}{Fx.trans("Doing some maths and drawing... ")}{Mv.save}')
 	try:
-		if CONFIG.check_temp: CpuCollector.get_sensors()
+		Init.primed_wait()
+		Startup.mark("first sample")
 		Box.calc_sizes()
+		History.restore()
 		Box.draw_bg(now=False)
+		Startup.mark("boxes")
 	except Exception as e:
 		Init.fail(e)
 	else:
@@ -4414,6 +7166,7 @@ if __name__ == "__main__":
 		signal.signal(signal.SIGCONT, now_awake)	#* Resume
 		signal.signal(signal.SIGINT, quit_sigint)	#* Ctrl-C
 		signal.signal(signal.SIGWINCH, Term.refresh) #* Terminal resized
+		Startup.mark("signals")
 	except Exception as e:
 		Init.fail(e)
 	else:
@@ -4424,6 +7177,7 @@ if __name__ == "__main__":
 		Draw.buffer("+init!", f'{Mv.restore}{Fx.trans("Starting input reader thread... ")}{Mv.save}')
 	try:
 		Key.start()
+		Startup.mark("input")
 	except Exception as e:
 		Init.fail(e)
 	else:
@@ -4443,8 +7197,7 @@ if __name__ == "__main__":
 	if CONFIG.show_init:
 		Draw.buffer("+init!", f'{Mv.restore}{Fx.trans("Collecting data and drawing... ")}{Mv.save}')
 	try:
-		Collector.collect(draw_now=False)
-		pass
+		Collector.collect(draw_now=False, only_draw=Init.primed)
 	except Exception as e:
 		Init.fail(e)
 	else:
@@ -4464,6 +7217,7 @@ if __name__ == "__main__":
 	Init.done()
 	Term.refresh()
 	Draw.out(clear=True)
+	Startup.mark("first frame")
 	if CONFIG.draw_clock:
 		Box.clock_on = True
 	if DEBUG: TimeIt.stop("Init")